@@ -170,6 +170,8 @@ class ShapeHolder(ViewableItem):
         tuple(Type[afem.topology.entities.Shape])
     :param afem.topology.entities.Shape shape: The shape.
     """
+    _loader = None
+    _held_shape = None
 
     def __init__(self, expected_type, shape=None):
         super(ShapeHolder, self).__init__()
@@ -177,10 +179,32 @@ class ShapeHolder(ViewableItem):
             self._types = expected_type
         else:
             self._types = (expected_type,)
+        self._loader = None
         self._shape = None
         if shape is not None:
             self.set_shape(shape)
 
+    def _get_shape(self):
+        # Load a deferred shape on first access
+        if self._loader is not None:
+            loader, self._loader = self._loader, None
+            self.set_shape(loader())
+        return self._held_shape
+
+    def _set_shape(self, shape):
+        self._held_shape = shape
+
+    _shape = property(_get_shape, _set_shape)
+
+    @property
+    def is_loaded(self):
+        """
+        :return: *True* if the shape has been loaded, *False* if it is
+            deferred until first access.
+        :rtype: bool
+        """
+        return self._loader is None
+
     @property
     def shape(self):
         """
@@ -229,4 +253,17 @@ class ShapeHolder(ViewableItem):
                                                       expected))
             logger.warning(msg)
 
+        self._loader = None
         self._shape = shape
+
+    def set_shape_loader(self, loader):
+        """
+        Defer loading the shape until it is first accessed. This is used by
+        lazy model readers so that shapes are only retrieved when needed.
+
+        :param loader: A function with no arguments that returns the shape.
+        :type loader: collections.Callable
+
+        :return: None.
+        """
+        self._loader = loader
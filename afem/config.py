@@ -17,19 +17,48 @@
 # License along with this library; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
 import logging
+import os
 import sys
 
-# Initialize logger.
-with open('afem.log', 'w') as log:
-    log.write('-----------------------------\n')
-    log.write('AFEM LOGGING FILE INITIALIZED\n')
-    log.write('-----------------------------\n')
+
+class _LazyFileHandler(logging.FileHandler):
+    """
+    File handler that creates the log file when the first record is emitted
+    rather than when the handler is created.
+    """
+
+    def __init__(self, fn):
+        super(_LazyFileHandler, self).__init__(fn, 'w', delay=True)
+
+    def _open(self):
+        stream = super(_LazyFileHandler, self)._open()
+        stream.write('-----------------------------\n')
+        stream.write('AFEM LOGGING FILE INITIALIZED\n')
+        stream.write('-----------------------------\n')
+        return stream
+
+
+# Initialize logger. The log file is only created on first use and can be
+# changed or disabled using the AFEM_LOG_FILE environment variable.
 logger = logging.getLogger('afem')
 logger.setLevel(logging.INFO)
-_fh = logging.FileHandler('afem.log')
 _fmt = logging.Formatter('%(levelname)s: %(message)s')
-_fh.setFormatter(_fmt)
-logger.addHandler(_fh)
+_fh = None
+
+
+def _set_log_file(fn):
+    global _fh
+    if _fh is not None:
+        logger.removeHandler(_fh)
+        _fh.close()
+        _fh = None
+    if fn:
+        _fh = _LazyFileHandler(fn)
+        _fh.setFormatter(_fmt)
+        logger.addHandler(_fh)
+
+
+_set_log_file(os.environ.get('AFEM_LOG_FILE', 'afem.log'))
 
 # Dictionary for units
 units_dict = {'i': 'INCH',
@@ -92,6 +121,19 @@ class Settings(object):
         chdlr.setFormatter(_fmt)
         logger.addHandler(chdlr)
 
+    @staticmethod
+    def set_log_file(fn='afem.log'):
+        """
+        Set the file the logger writes to. The file is created and any
+        existing content is overwritten when the first message is logged.
+
+        :param fn: The filename. If *None* then logging to a file is disabled.
+        :type fn: str or None
+
+        :return: None.
+        """
+        _set_log_file(fn)
+
     @staticmethod
     def set_loggging_level(level='info'):
         """
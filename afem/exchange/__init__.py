@@ -16,6 +16,7 @@
 # You should have received a copy of the GNU Lesser General Public
 # License along with this library; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+from afem.exchange.abm import *
 from afem.exchange.iges import *
 from afem.exchange.step import *
 from afem.exchange.stl import *
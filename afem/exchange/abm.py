@@ -0,0 +1,315 @@
+# This file is part of AFEM which provides an engineering toolkit for airframe
+# finite element modeling during conceptual design.
+#
+# Copyright (C) 2016-2018  Laughlin Research, LLC (info@laughlinresearch.com)
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+import json
+import struct
+
+from numpy import (argsort, ascontiguousarray, dtype, fromfile, int32, memmap,
+                   prod, searchsorted, zeros)
+
+__all__ = ["export_abm", "BinaryMesh"]
+
+# Format identifier, array alignment, and version
+_MAGIC = b'AFEMABM\x00'
+_ALIGN = 64
+_VERSION = 1
+
+
+def export_abm(the_mesh, fn, parts=None, metadata=None):
+    """
+    Export the 2-D elements of a mesh to a compact binary file. The file
+    contains raw node, element, group, and property arrays that are aligned
+    so they can be memory-mapped when read using :class:`.BinaryMesh`. A JSON
+    header at the end of the file describes the arrays, the part groups, and
+    the metadata.
+
+    :param afem.smesh.meshes.Mesh the_mesh: The mesh.
+    :param str fn: The filename.
+    :param parts: The parts to export as element groups. The JSON
+        serializable entries of the part metadata are stored as group
+        properties.
+    :type parts: collections.Sequence(afem.structure.entities.Part)
+    :param dict metadata: Additional JSON serializable metadata to store.
+
+    :return: *True* if done, *False* if not.
+    :rtype: bool
+
+    :raise ValueError: If a part has elements that are not in the mesh.
+    """
+    nids, xyz = the_mesh.ds.node_arrays()
+    eids, conn = the_mesh.ds.face_arrays()
+
+    # Element groups as rows into the element arrays
+    names = []
+    properties = {}
+    group_rows = []
+    group_offsets = [0]
+    pids = zeros(eids.size, dtype=int32)
+    if parts:
+        sorter = argsort(eids)
+        for i, part in enumerate(parts):
+            part_eids, _ = part.submesh.ds.face_arrays()
+            indx = searchsorted(eids, part_eids, sorter=sorter)
+            is_found = indx < eids.size
+            rows = sorter[indx[is_found]]
+            if not is_found.all() or (eids[rows] != part_eids).any():
+                msg = 'Part elements not found in the mesh: {}'
+                raise ValueError(msg.format(part.name))
+            names.append(part.name)
+            properties[part.name] = _json_dict(part.metadata)
+            group_rows += rows.tolist()
+            group_offsets.append(len(group_rows))
+            pids[rows] = i + 1
+
+    arrays = [('nids', nids.astype('<i8')),
+              ('xyz', xyz.astype('<f8')),
+              ('eids', eids.astype('<i8')),
+              ('conn', conn.astype('<i8')),
+              ('pids', pids.astype('<i4')),
+              ('group_rows', _as_array(group_rows, '<i8')),
+              ('group_offsets', _as_array(group_offsets, '<i8'))]
+
+    with open(fn, 'wb') as fout:
+        fout.write(_MAGIC)
+        fout.write(b'\0' * (_ALIGN - len(_MAGIC)))
+
+        array_info = {}
+        offset = _ALIGN
+        for name, array in arrays:
+            array = ascontiguousarray(array)
+            array_info[name] = {'dtype': array.dtype.str,
+                                'shape': list(array.shape),
+                                'offset': offset}
+            array.tofile(fout)
+            nbytes = array.nbytes
+            pad = -nbytes % _ALIGN
+            fout.write(b'\0' * pad)
+            offset += nbytes + pad
+
+        header = {'version': _VERSION,
+                  'arrays': array_info,
+                  'groups': names,
+                  'properties': properties,
+                  'metadata': _json_dict(metadata or {})}
+        header = json.dumps(header).encode('utf-8')
+        fout.write(header)
+
+        # Location of the header
+        fout.seek(len(_MAGIC))
+        fout.write(struct.pack('<QQ', offset, len(header)))
+
+    return True
+
+
+class BinaryMesh(object):
+    """
+    Read a binary mesh file written by :func:`.export_abm`. The arrays are
+    memory-mapped by default so opening a file does not read the data.
+
+    :param str fn: The filename.
+    :param bool mmap: Option to memory-map the arrays. If *False* then the
+        arrays are read into memory.
+
+    :raise ValueError: If the file is not a binary mesh file.
+    """
+
+    def __init__(self, fn, mmap=True):
+        with open(fn, 'rb') as fin:
+            if fin.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError('Not a binary mesh file: {}'.format(fn))
+            offset, size = struct.unpack('<QQ', fin.read(16))
+            fin.seek(offset)
+            header = json.loads(fin.read(size).decode('utf-8'))
+
+            arrays = {}
+            for name, info in header['arrays'].items():
+                dtype_ = dtype(str(info['dtype']))
+                shape = tuple(info['shape'])
+                if prod(shape) == 0:
+                    arrays[name] = zeros(shape, dtype=dtype_)
+                elif mmap:
+                    arrays[name] = memmap(fn, dtype_, 'r', info['offset'],
+                                          shape)
+                else:
+                    fin.seek(info['offset'])
+                    count = int(prod(shape))
+                    arrays[name] = fromfile(fin, dtype_, count).reshape(shape)
+
+        self._header = header
+        self._arrays = arrays
+        self._groups = list(header['groups'])
+
+    @property
+    def version(self):
+        """
+        :return: The file format version.
+        :rtype: int
+        """
+        return self._header['version']
+
+    @property
+    def metadata(self):
+        """
+        :return: The file metadata.
+        :rtype: dict
+        """
+        return self._header['metadata']
+
+    @property
+    def num_nodes(self):
+        """
+        :return: Number of nodes.
+        :rtype: int
+        """
+        return self._arrays['nids'].shape[0]
+
+    @property
+    def num_elms(self):
+        """
+        :return: Number of elements.
+        :rtype: int
+        """
+        return self._arrays['eids'].shape[0]
+
+    @property
+    def nids(self):
+        """
+        :return: The node ID's.
+        :rtype: numpy.ndarray
+        """
+        return self._arrays['nids']
+
+    @property
+    def xyz(self):
+        """
+        :return: The node locations as an array of shape (n, 3).
+        :rtype: numpy.ndarray
+        """
+        return self._arrays['xyz']
+
+    @property
+    def eids(self):
+        """
+        :return: The element ID's.
+        :rtype: numpy.ndarray
+        """
+        return self._arrays['eids']
+
+    @property
+    def conn(self):
+        """
+        :return: The element connectivity as an array of shape (m, 4) of node
+            ID's. Triangles are padded with zeros.
+        :rtype: numpy.ndarray
+        """
+        return self._arrays['conn']
+
+    @property
+    def pids(self):
+        """
+        :return: The group index of each element starting at one. Elements
+            that do not belong to a group have a value of zero.
+        :rtype: numpy.ndarray
+        """
+        return self._arrays['pids']
+
+    @property
+    def group_names(self):
+        """
+        :return: The group names.
+        :rtype: list(str)
+        """
+        return list(self._groups)
+
+    @property
+    def groups(self):
+        """
+        :return: Dictionary where the key is the group name and the value is
+            an array of element ID's.
+        :rtype: dict
+        """
+        return dict([(name, self.group_elements(name)[0])
+                     for name in self._groups])
+
+    def properties(self, name):
+        """
+        Get the properties of a group.
+
+        :param str name: The group name.
+
+        :return: The group properties.
+        :rtype: dict
+
+        :raise KeyError: If the group is not found.
+        """
+        return self._header['properties'][name]
+
+    def group_rows(self, name):
+        """
+        Get the rows of the element arrays that belong to a group.
+
+        :param str name: The group name.
+
+        :return: The row indices.
+        :rtype: numpy.ndarray
+
+        :raise KeyError: If the group is not found.
+        """
+        try:
+            i = self._groups.index(name)
+        except ValueError:
+            raise KeyError('Group not found: {}'.format(name))
+        offsets = self._arrays['group_offsets']
+        return self._arrays['group_rows'][offsets[i]:offsets[i + 1]]
+
+    def group_elements(self, name):
+        """
+        Get the element ID's and connectivity of a group.
+
+        :param str name: The group name.
+
+        :return: The element ID's and connectivity.
+        :rtype: tuple(numpy.ndarray)
+
+        :raise KeyError: If the group is not found.
+        """
+        rows = self.group_rows(name)
+        return self.eids[rows], self.conn[rows]
+
+
+def _as_array(values, dtype_):
+    """
+    Convert a list of values to an array of the given type.
+    """
+    array = zeros(len(values), dtype=dtype_)
+    array[:] = values
+    return array
+
+
+def _json_dict(data):
+    """
+    Return the entries of the dictionary that can be serialized to JSON.
+    """
+    out = {}
+    for key, value in data.items():
+        try:
+            json.dumps({key: value})
+        except (TypeError, ValueError):
+            continue
+        out[key] = value
+    return out
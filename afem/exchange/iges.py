@@ -19,6 +19,8 @@
 from OCCT.IFSelect import IFSelect_RetDone
 from OCCT.IGESControl import IGESControl_Reader, IGESControl_Writer
 from OCCT.Interface import Interface_Static
+from OCCT.TCollection import TCollection_HAsciiString
+from OCCT.TransferBRep import TransferBRep
 
 from afem.config import Settings, units_dict
 from afem.topology.entities import Shape
@@ -79,6 +81,31 @@ class IgesWrite(object):
         """
         return self._writer.AddGeom(geom)
 
+    def set_name(self, shape, name):
+        """
+        Set the label of the IGES entity for the given shape. The shape(s)
+        should be added before naming them.
+
+        :param afem.topology.entities.Shape shape: The shape.
+        :param str name: The name.
+
+        :return: *True* if name is set, *False* otherwise.
+        :rtype: bool
+
+        .. note::
+
+            The IGES format limits entity labels to eight characters, so
+            longer names may be truncated by other CAD systems.
+        """
+        fp = self._writer.TransferProcess()
+        mapper = TransferBRep.ShapeMapper_(fp, shape.object)
+        item = fp.FindTransient(mapper)
+        if not item:
+            return False
+
+        item.SetLabel(TCollection_HAsciiString(name))
+        return True
+
     def write(self, fn='afem.igs'):
         """
         Write the IGES file.
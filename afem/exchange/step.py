@@ -16,13 +16,19 @@
 # You should have received a copy of the GNU Lesser General Public
 # License along with this library; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+import json
+
 from OCCT.IFSelect import (IFSelect_RetError,
                            IFSelect_RetDone)
 from OCCT.Interface import Interface_Static
 from OCCT.STEPConstruct import STEPConstruct
 from OCCT.STEPControl import (STEPControl_AsIs, STEPControl_Writer,
                               STEPControl_Reader)
+from OCCT.StepRepr import StepRepr_RepresentationItem
 from OCCT.TCollection import TCollection_HAsciiString
+from OCCT.TopLoc import TopLoc_Location
+from OCCT.TopoDS import TopoDS_Iterator
+from OCCT.TransferBRep import TransferBRep
 
 from afem.config import Settings, units_dict
 from afem.topology.entities import Shape
@@ -132,11 +138,16 @@ class StepWrite(object):
 
 class StepRead(object):
     """
-    Read a STEP file.
+    Read a STEP file. The names of the STEP entities are indexed by their
+    shape after the transfer so that names of shapes and sub-shapes can be
+    found without querying the transfer reader.
 
     :param str fn: The file to read.
     """
 
+    # Upper limit for the shape hash code used in the name index
+    _hash_max = 2147483647
+
     def __init__(self, fn):
         self._reader = STEPControl_Reader()
         self._tr = self._reader.WS().TransferReader()
@@ -150,10 +161,17 @@ class StepRead(object):
         Interface_Static.SetCVal_("xstep.cascade.unit", Settings.units)
 
         # Transfer
+        self._shape = None
         nroots = self._reader.TransferRoots()
         if nroots > 0:
             self._shape = Shape.wrap(self._reader.OneShape())
 
+        # Index the names of the transferred entities
+        self._named = []
+        self._index = {}
+        self._located = None
+        self._build_index()
+
     @property
     def object(self):
         """
@@ -180,7 +198,112 @@ class StepRead(object):
         :return: The name or None if not found.
         :rtype: str or None
         """
-        item = self._tr.EntityFromShapeResult(shape.object, 1)
-        if not item:
+        i = self._find(shape.object)
+        if i is None:
             return None
-        return item.Name().ToCString()
+        return self._named[i][1]
+
+    def metadata_from_shape(self, shape):
+        """
+        Attempt to extract the name for the STEP entity that corresponds to the
+        shape and decode it as JSON metadata.
+
+        :param afem.topology.entities.Shape shape: The shape.
+
+        :return: The metadata or None if not found or if the name is not
+            valid JSON.
+        :rtype: dict or None
+        """
+        name = self.name_from_shape(shape)
+        if not name:
+            return None
+        try:
+            return json.loads(name)
+        except ValueError:
+            return None
+
+    def named_shapes(self, shape_type=None):
+        """
+        Iterate over all the transferred shapes and sub-shapes that have a
+        name in the order they were transferred. Shapes are located as they
+        are in the main shape, so a shape used more than once in an assembly
+        is given once for each location.
+
+        :param OCCT.TopAbs.TopAbs_ShapeEnum shape_type: Option to only include
+            shapes of this type.
+
+        :return: Yield the shape and its name.
+        :rtype: collections.Iterable(tuple(afem.topology.entities.Shape, str))
+        """
+        if self._located is None:
+            self._located = self._locate()
+        for (shape, name), located in zip(self._named, self._located):
+            if shape_type is not None and shape.shape_type != shape_type:
+                continue
+            for shape_ in located or [shape]:
+                yield shape_, name
+
+    def _build_index(self):
+        """
+        Build the name index in a single pass over the transfer results.
+        Shapes are indexed without their location so located instances of the
+        same shape share a name.
+        """
+        tp = self._tr.TransientProcess()
+        for i in range(1, tp.NbMapped() + 1):
+            item = tp.Mapped(i)
+            if not isinstance(item, StepRepr_RepresentationItem):
+                continue
+            if item.Name() is None:
+                continue
+            name = item.Name().ToCString()
+            if not name:
+                continue
+            shape = TransferBRep.ShapeResult_(tp, item)
+            if shape.IsNull():
+                continue
+            shape = shape.Located(TopLoc_Location())
+            code = shape.HashCode(self._hash_max)
+            indices = self._index.setdefault(code, [])
+            if any(self._named[j][0].object.IsPartner(shape)
+                   for j in indices):
+                continue
+            indices.append(len(self._named))
+            self._named.append((Shape.wrap(shape), name))
+
+    def _find(self, shape):
+        """
+        Find the index of the named shape that is a partner of the shape.
+        """
+        shape = shape.Located(TopLoc_Location())
+        code = shape.HashCode(self._hash_max)
+        for i in self._index.get(code, []):
+            if self._named[i][0].object.IsPartner(shape):
+                return i
+        return None
+
+    def _locate(self):
+        """
+        Find the located instances of the named shapes by traversing the main
+        shape. Locations are accumulated from the parent shapes.
+        """
+        located = [[] for _ in self._named]
+        if self._shape is None or not self._index:
+            return located
+
+        stack = [self._shape.object]
+        while stack:
+            shape = stack.pop()
+            i = self._find(shape)
+            if i is not None and not any(other.IsSame(shape)
+                                         for other in located[i]):
+                located[i].append(shape)
+            children = []
+            it = TopoDS_Iterator(shape)
+            while it.More():
+                children.append(it.Value())
+                it.Next()
+            stack += reversed(children)
+
+        return [[Shape.wrap(shape) for shape in shapes]
+                for shapes in located]
@@ -16,26 +16,232 @@
 # You should have received a copy of the GNU Lesser General Public
 # License along with this library; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+from collections import OrderedDict
+
+from OCCT.BRep import BRep_Tool
+from OCCT.BRepMesh import BRepMesh_IncrementalMesh
+from OCCT.BRepTools import BRepTools
 from OCCT.StlAPI import StlAPI_Writer
+from OCCT.TopAbs import TopAbs_REVERSED
+from OCCT.TopLoc import TopLoc_Location
+from numpy import array, concatenate, cross, float32, zeros
+from numpy.linalg import norm
+
+from afem.topology.entities import Compound
 
-__all__ = ["StlWrite"]
+__all__ = ["StlWrite", "TessellateShape", "tessellate_parts",
+           "write_binary_stl"]
 
 
 class StlWrite(StlAPI_Writer):
     """
     Export shape to STL file.
+
+    :param bool ascii_mode: If *True*, the STL file is written in ASCII
+        format. If *False*, it is written in binary format.
     """
 
-    def __init__(self):
+    def __init__(self, ascii_mode=True):
         super(StlWrite, self).__init__()
+        self.SetASCIIMode(ascii_mode)
 
-    def write(self, shape, fn):
+    def write(self, shape, fn, linear_deflection=None, angular_deflection=0.5,
+              parallel=True):
         """
         Converts shape to STL format and writes to a file.
-        
+
         :param afem.topology.entities.Shape shape: The shape.
         :param str fn: The filename.
-         
+        :param float linear_deflection: If provided, the shape is tessellated
+            using this linear deflection before writing. Existing
+            triangulations that satisfy the deflection are reused.
+        :param float angular_deflection: The angular deflection in radians.
+        :param bool parallel: Option to tessellate the faces in parallel.
+
         :return: None.
         """
+        if linear_deflection is not None:
+            TessellateShape(shape, linear_deflection, angular_deflection,
+                            parallel=parallel)
         self.Write(shape.object, fn)
+
+
+class TessellateShape(object):
+    """
+    Tessellate the faces of a shape. The triangulation is stored on the faces
+    of the shape, so if the shape already has a triangulation that satisfies
+    the linear deflection it is reused and the shape is not meshed again.
+
+    :param afem.topology.entities.Shape shape: The shape.
+    :param float linear_deflection: The linear deflection.
+    :param float angular_deflection: The angular deflection in radians.
+    :param bool relative: Option to make the linear deflection relative to
+        the size of each edge.
+    :param bool parallel: Option to tessellate the faces in parallel.
+    """
+
+    def __init__(self, shape, linear_deflection=0.01, angular_deflection=0.5,
+                 relative=False, parallel=True):
+        self._shape = shape
+        self._is_reused = BRepTools.Triangulation_(shape.object,
+                                                   linear_deflection)
+        if self._is_reused:
+            self._is_done = True
+            return
+
+        tool = BRepMesh_IncrementalMesh(shape.object, linear_deflection,
+                                        relative, angular_deflection,
+                                        parallel)
+        self._is_done = tool.IsDone()
+
+    @property
+    def is_done(self):
+        """
+        :return: *True* if done, *False* if not.
+        :rtype: bool
+        """
+        return self._is_done
+
+    @property
+    def is_reused(self):
+        """
+        :return: *True* if an existing triangulation was reused, *False* if
+            the shape was tessellated.
+        :rtype: bool
+        """
+        return self._is_reused
+
+    @property
+    def shape(self):
+        """
+        :return: The tessellated shape.
+        :rtype: afem.topology.entities.Shape
+        """
+        return self._shape
+
+    def triangles(self):
+        """
+        Get the triangulation of all faces as arrays. The nodes of each face
+        are transformed by the face location and triangles of reversed faces
+        are flipped so that their normals point outward.
+
+        :return: The node coordinates as an array of shape (n, 3) and the
+            triangles as an array of shape (m, 3) containing zero-based
+            indices into the node array.
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        """
+        return _shape_triangles(self._shape)
+
+    def write_stl(self, fn, name=''):
+        """
+        Write the triangulation to a binary STL file.
+
+        :param str fn: The filename.
+        :param str name: The name written to the file header.
+
+        :return: None.
+        """
+        xyz, tri = self.triangles()
+        write_binary_stl(fn, xyz, tri, name)
+
+
+def tessellate_parts(parts, linear_deflection=0.01, angular_deflection=0.5,
+                     relative=False, parallel=True):
+    """
+    Tessellate the shapes of the parts together and get the triangulation of
+    each part as arrays. The faces of all parts are tessellated in a single
+    call so that they can be processed in parallel.
+
+    :param collections.Sequence(afem.structure.entities.Part) parts: The
+        parts.
+    :param float linear_deflection: The linear deflection.
+    :param float angular_deflection: The angular deflection in radians.
+    :param bool relative: Option to make the linear deflection relative to
+        the size of each edge.
+    :param bool parallel: Option to tessellate the faces in parallel.
+
+    :return: Dictionary where the key is the part and the value is the node
+        and triangle arrays of the part as described in
+        :meth:`.TessellateShape.triangles`.
+    :rtype: collections.OrderedDict
+    """
+    shapes = [part.shape for part in parts]
+    TessellateShape(Compound.by_shapes(shapes), linear_deflection,
+                    angular_deflection, relative, parallel)
+
+    results = OrderedDict()
+    for part in parts:
+        results[part] = _shape_triangles(part.shape)
+    return results
+
+
+def write_binary_stl(fn, xyz, tri, name=''):
+    """
+    Write triangles to a binary STL file.
+
+    :param str fn: The filename.
+    :param numpy.ndarray xyz: The node coordinates as an array of shape
+        (n, 3).
+    :param numpy.ndarray tri: The triangles as an array of shape (m, 3)
+        containing zero-based indices into the node array.
+    :param str name: The name written to the file header.
+
+    :return: None.
+    """
+    xyz = array(xyz, dtype=float)
+    tri = array(tri, dtype=int).reshape(-1, 3)
+
+    v = xyz[tri]
+    normals = cross(v[:, 1] - v[:, 0], v[:, 2] - v[:, 0])
+    lengths = norm(normals, axis=1)
+    lengths[lengths == 0.] = 1.
+    normals /= lengths[:, None]
+
+    data = zeros(tri.shape[0], dtype=[('normal', '<f4', (3,)),
+                                      ('vertices', '<f4', (3, 3)),
+                                      ('attr', '<u2')])
+    data['normal'] = normals.astype(float32)
+    data['vertices'] = v.astype(float32)
+
+    header = name.encode('ascii', 'replace')[:80].ljust(80, b' ')
+    with open(fn, 'wb') as fout:
+        fout.write(header)
+        fout.write(array([tri.shape[0]], dtype='<u4').tobytes())
+        fout.write(data.tobytes())
+
+
+def _shape_triangles(shape):
+    """
+    Collect the triangulation of the faces of a shape into arrays.
+    """
+    xyz, tri = [], []
+    nnodes = 0
+    for face in shape.faces:
+        loc = TopLoc_Location()
+        poly = BRep_Tool.Triangulation_(face.object, loc)
+        if poly is None:
+            continue
+        trsf = loc.Transformation()
+
+        nodes = poly.Nodes()
+        fxyz = []
+        for i in range(1, poly.NbNodes() + 1):
+            p = nodes.Value(i).Transformed(trsf)
+            fxyz.append((p.X(), p.Y(), p.Z()))
+
+        triangles = poly.Triangles()
+        ftri = []
+        for i in range(1, poly.NbTriangles() + 1):
+            t = triangles.Value(i)
+            ftri.append((t.Value(1), t.Value(2), t.Value(3)))
+        ftri = array(ftri, dtype=int).reshape(-1, 3) - 1 + nnodes
+        if face.object.Orientation() == TopAbs_REVERSED:
+            ftri = ftri[:, [0, 2, 1]]
+
+        xyz.append(array(fxyz, dtype=float).reshape(-1, 3))
+        tri.append(ftri)
+        nnodes += len(fxyz)
+
+    if not xyz:
+        return zeros((0, 3), dtype=float), zeros((0, 3), dtype=int)
+    return concatenate(xyz), concatenate(tri)
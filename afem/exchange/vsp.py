@@ -17,6 +17,12 @@
 # License along with this library; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
 import json
+import os
+import shutil
+import tempfile
+import time
+from hashlib import md5
+from multiprocessing import Pool
 
 from OCCT.BRepBuilderAPI import (BRepBuilderAPI_MakeFace,
                                  BRepBuilderAPI_MakeWire)
@@ -26,12 +32,13 @@ from OCCT.ShapeUpgrade import ShapeUpgrade_SplitSurface
 
 from afem.adaptor.entities import AdaptorCurve
 from afem.config import logger
+from afem.exchange.brep import read_brep, write_brep
 from afem.exchange.step import StepRead
 from afem.exchange.xde import XdeDocument
 from afem.geometry import utils as geom_utils
 from afem.geometry.create import (PointFromParameter, NurbsSurfaceByInterp,
                                   NurbsCurveByPoints, NurbsCurveByApprox)
-from afem.geometry.entities import Geometry
+from afem.geometry.entities import Geometry, Surface
 from afem.occ import utils as occ_utils
 from afem.oml.entities import Body
 from afem.topology.check import CheckShape
@@ -40,7 +47,7 @@ from afem.topology.fix import FixShape
 from afem.topology.modify import *
 from afem.topology.props import *
 
-__all__ = ["ImportVSP"]
+__all__ = ["ImportVSP", "ImportVSPCache"]
 
 
 class ImportVSP(object):
@@ -64,18 +71,27 @@ class ImportVSP(object):
         surface. This method is experimental.
     :param float tol: Tolerance for approximation if *bspline_restrict* or
         *reloft* is *True*.
+    :param int nprocs: Number of worker processes used to process the
+        components. If *None* then the number of CPUs is used. If 1 then the
+        components are processed in this process.
+    :param cache: A cache of processed imports. If a STEP file with the same
+        content was imported before using the same options, the bodies are
+        loaded from the cache rather than processed again.
+    :type cache: afem.exchange.vsp.ImportVSPCache or None
 
     :raise TypeError: If a file is provided but the extension is not recognized
         or supported.
     """
 
     def __init__(self, fn=None, divide_closed=True, bspline_restrict=False,
-                 reloft=False, tol=0.01):
+                 reloft=False, tol=0.01, nprocs=1, cache=None):
         self._bodies = {}
         self._divide = divide_closed
         self._restrict = bspline_restrict
         self._reloft = reloft
         self._tol = tol
+        self._nprocs = nprocs
+        self._cache = cache
         self._invalid = []
 
         if fn is not None:
@@ -151,19 +167,47 @@ class ImportVSP(object):
         """
         return self._bodies.copy()
 
-    def import_step(self, fn):
+    def import_step(self, fn, nprocs=None):
         """
         Import a STEP file generated by the OpenVSP version that has been
         modified to include metadata.
 
         :param str fn: The full path to the file.
+        :param int nprocs: Number of worker processes used to process the
+            components. If *None* then the value provided during
+            initialization is used. If 1 then the components are processed in
+            this process. The components are sewn and processed independently
+            in the workers and the results are assembled in the order they
+            appear in the STEP file.
 
         :return: None.
         """
+        if nprocs is None:
+            nprocs = self._nprocs
+
+        # Check the cache
+        if self._cache is not None:
+            options = {'divide_closed': self._divide,
+                       'bspline_restrict': self._restrict,
+                       'reloft': self._reloft,
+                       'tol': self._tol}
+            key = self._cache.key(fn, options)
+            cached = self._cache.load(key)
+            if cached is not None:
+                bodies, invalid = cached
+                self._invalid += invalid
+                self._bodies.update(bodies)
+                return None
+
         # Store data as dictionaries.
         bodies = {}
+        invalid_shapes = []
         indx = 0
 
+        # Components to process as (name, type, compound, sref ID)
+        components = []
+        names = set()
+
         # Dictionaries to attach wing reference surfaces to wing bodies using
         # reference surface ID as the key.
         wing_bodies = {}
@@ -189,13 +233,8 @@ class ImportVSP(object):
             if not name:
                 indx += 1
                 comp_name = '.'.join(['Body', str(indx)])
-                msg = ' '.join(['---Processing OpenVSP component:', comp_name])
-                logger.info(msg)
-                solid, invalid = _build_solid(compound, self._divide)
-                self._invalid += invalid
-                if solid is not None:
-                    body = Body(solid, comp_name)
-                    bodies[comp_name] = body
+                components.append((comp_name, 'solid', compound, None))
+                names.add(comp_name)
                 continue
             metadata = json.loads(name)
 
@@ -231,42 +270,50 @@ class ImportVSP(object):
                 continue
 
             comp_name = metadata['m_Name']
-            if comp_name in bodies:
+            if comp_name in names:
                 indx += 1
                 comp_name = '.'.join([comp_name, str(indx)])
-
-            # Process component.
-            msg = ' '.join(['---Processing OpenVSP component:', comp_name])
-            logger.info(msg)
+            names.add(comp_name)
 
             # Wing
             if metadata['m_Type'] == 5 and metadata['m_SurfType'] != 99:
-                wing, invalid = _process_wing(compound, self._divide,
-                                              self._restrict, self._tol,
-                                              self._reloft, comp_name)
-                self._invalid += invalid
-                if wing is not None:
-                    bodies[comp_name] = wing
-                    sref_id = metadata['Sref ID']
-                    wing_bodies[sref_id] = wing
+                components.append((comp_name, 'wing', compound,
+                                   metadata['Sref ID']))
 
             # Fuselage
             elif metadata['m_Type'] in [4, 9]:
-                fuse, invalid = _process_fuse(compound, self._divide,
-                                              comp_name)
-                self._invalid += invalid
-                if fuse is not None:
-                    bodies[comp_name] = fuse
-                    sref_id = metadata['Sref ID']
-                    fuselage_bodies[sref_id] = fuse
+                components.append((comp_name, 'fuse', compound,
+                                   metadata['Sref ID']))
 
             # Unknown
             else:
-                solid, invalid = _build_solid(compound, self._divide)
-                self._invalid += invalid
-                if solid:
-                    body = Body(solid, comp_name)
-                    bodies[comp_name] = body
+                components.append((comp_name, 'solid', compound, None))
+
+        # Process components
+        options = (self._divide, self._restrict, self._tol, self._reloft)
+        if nprocs == 1:
+            results = []
+            for comp_name, type_, compound, _ in components:
+                msg = ' '.join(['---Processing OpenVSP component:',
+                                comp_name])
+                logger.info(msg)
+                results.append(_process_component(type_, compound, comp_name,
+                                                  *options))
+        else:
+            results = _process_components_parallel(components, options,
+                                                   nprocs)
+
+        # Assemble in the original order
+        for (comp_name, type_, _, sref_id), (body, invalid) in zip(components,
+                                                                   results):
+            invalid_shapes += invalid
+            if body is None:
+                continue
+            bodies[comp_name] = body
+            if type_ == 'wing':
+                wing_bodies[sref_id] = body
+            elif type_ == 'fuse':
+                fuselage_bodies[sref_id] = body
 
         # Attach wing reference surfaces to the bodies.
         for sref_id in wing_bodies:
@@ -289,6 +336,9 @@ class ImportVSP(object):
 
         # Update
         self._bodies.update(bodies)
+        self._invalid += invalid_shapes
+        if self._cache is not None:
+            self._cache.save(key, fn, bodies, invalid_shapes)
 
     def export_step(self, fn, label_solids=True, label_faces=False,
                     names=None):
@@ -486,6 +536,231 @@ class ImportVSP(object):
         return sref
 
 
+class ImportVSPCache(object):
+    """
+    Cache of processed OpenVSP imports. Each entry is stored as a binary XDE
+    document in the cache directory and is identified by a key computed from
+    the content of the STEP file and the import options. The Body shapes,
+    colors, reference surfaces, surfaces stored in the Body metadata, and the
+    invalid shapes are saved.
+
+    :param str path: The cache directory. It is created if it does not exist.
+    :param int max_size: The maximum total size of the cache in bytes. When
+        exceeded, the least recently used entries are removed. If *None* then
+        the size is not limited.
+    """
+
+    _version = 1
+
+    def __init__(self, path, max_size=None):
+        self._path = path
+        self._max_size = max_size
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        self._index_fn = os.path.join(path, 'index.json')
+        if os.path.isfile(self._index_fn):
+            with open(self._index_fn, 'r') as fin:
+                self._index = json.load(fin)
+        else:
+            self._index = {}
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    @property
+    def path(self):
+        """
+        :return: The cache directory.
+        :rtype: str
+        """
+        return self._path
+
+    @property
+    def max_size(self):
+        """
+        :return: The maximum total size of the cache in bytes.
+        :rtype: int or None
+        """
+        return self._max_size
+
+    @property
+    def size(self):
+        """
+        :return: The total size of the cache entries in bytes.
+        :rtype: int
+        """
+        return sum([entry['size'] for entry in self._index.values()])
+
+    def key(self, fn, options):
+        """
+        Compute the key of an import.
+
+        :param str fn: The STEP file.
+        :param dict options: The import options.
+
+        :return: The key.
+        :rtype: str
+        """
+        hash_ = md5()
+        with open(fn, 'rb') as fin:
+            for chunk in iter(lambda: fin.read(1 << 20), b''):
+                hash_.update(chunk)
+        txt = json.dumps([self._version, options], sort_keys=True)
+        hash_.update(txt.encode('utf-8'))
+        return hash_.hexdigest()
+
+    def load(self, key):
+        """
+        Load a cache entry.
+
+        :param str key: The key.
+
+        :return: Dictionary of Body instances where the key is the component
+            name and the list of invalid shapes. Returns *None* if the key is
+            not in the cache.
+        :rtype: tuple(dict, list(afem.topology.entities.Shape)) or None
+        """
+        if key not in self._index:
+            return None
+        fn = self._filename(key)
+        if not os.path.isfile(fn):
+            self.remove(key)
+            return None
+
+        doc = XdeDocument(True)
+        doc.open(fn)
+        index = doc.index
+
+        bodies = {}
+        for name, label in index.by_type('Body'):
+            body = Body(label.shape, name)
+            color = label.color
+            if color is not None:
+                body.set_color(color.Red(), color.Green(), color.Blue())
+            bodies[name] = body
+        for name, label in index.by_type('SREF'):
+            bodies[name].set_sref(label.shape.surface)
+        for name, label in index.by_type('METADATA'):
+            bodies[name].metadata.set(label.comment, label.shape.surface)
+        invalid = [label.shape for _, label in index.by_type('INVALID')]
+
+        logger.info('Loaded OpenVSP import from cache: {}'.format(key))
+        self._index[key]['time'] = time.time()
+        self._write_index()
+        return bodies, invalid
+
+    def save(self, key, source, bodies, invalid=()):
+        """
+        Save a cache entry. The least recently used entries are removed if
+        the maximum size is exceeded.
+
+        :param str key: The key.
+        :param str source: The STEP file the entry was imported from.
+        :param dict bodies: Dictionary of Body instances where the key is the
+            component name.
+        :param collections.Sequence(afem.topology.entities.Shape) invalid: The
+            invalid shapes found during import.
+
+        :return: *True* if saved, *False* if not.
+        :rtype: bool
+        """
+        doc = XdeDocument(True)
+        for name, body in bodies.items():
+            label = doc.add_shape(body.shape, name, False)
+            label.set_string('Body')
+            if body.color is not None:
+                label.set_color(body.color)
+            if body.sref is not None:
+                label = doc.add_shape(Face.by_surface(body.sref), name, False)
+                label.set_string('SREF')
+            for mkey in sorted(body.metadata):
+                srf = body.metadata[mkey]
+                if not isinstance(srf, Surface):
+                    continue
+                label = doc.add_shape(Face.by_surface(srf), name, False)
+                label.set_string('METADATA')
+                label.set_comment(mkey)
+        for shape in invalid:
+            label = doc.add_shape(shape, 'Invalid', False)
+            label.set_string('INVALID')
+
+        fn = self._filename(key)
+        status = doc.save_as(fn)
+        if not status:
+            return False
+
+        self._index[key] = {'source': os.path.abspath(source),
+                            'size': os.path.getsize(fn),
+                            'time': time.time()}
+        self._evict()
+        self._write_index()
+        return True
+
+    def remove(self, key):
+        """
+        Remove a cache entry.
+
+        :param str key: The key.
+
+        :return: None.
+        """
+        self._index.pop(key, None)
+        fn = self._filename(key)
+        if os.path.isfile(fn):
+            os.remove(fn)
+        self._write_index()
+
+    def invalidate(self, source):
+        """
+        Remove all cache entries imported from a STEP file.
+
+        :param str source: The STEP file.
+
+        :return: The number of removed entries.
+        :rtype: int
+        """
+        source = os.path.abspath(source)
+        keys = [key for key, entry in self._index.items()
+                if entry['source'] == source]
+        for key in keys:
+            self.remove(key)
+        return len(keys)
+
+    def clear(self):
+        """
+        Remove all cache entries.
+
+        :return: None.
+        """
+        for key in list(self._index.keys()):
+            self.remove(key)
+
+    def _filename(self, key):
+        return os.path.join(self._path, key + '.xbf')
+
+    def _evict(self):
+        # Remove least recently used entries until within the size limit
+        if self._max_size is None:
+            return None
+        keys = sorted(self._index, key=lambda k: self._index[k]['time'])
+        total = self.size
+        for key in keys:
+            if total <= self._max_size:
+                break
+            total -= self._index[key]['size']
+            self._index.pop(key)
+            fn = self._filename(key)
+            if os.path.isfile(fn):
+                os.remove(fn)
+
+    def _write_index(self):
+        with open(self._index_fn, 'w') as fout:
+            json.dump(self._index, fout)
+
+
 def _build_solid(compound, divide_closed):
     """
     Try to build a solid from the OpenVSP compound of faces.
@@ -604,7 +879,7 @@ def _process_wing(compound, divide_closed, bspline_restrict, tol, reloft,
         solid, invalid = _build_solid(compound, divide_closed)
 
     if not solid:
-        return None
+        return None, invalid
 
     if bspline_restrict:
         solid = _bspline_restrict(solid, tol)
@@ -624,6 +899,88 @@ def _process_wing(compound, divide_closed, bspline_restrict, tol, reloft,
     return wing, invalid
 
 
+def _process_component(type_, compound, name, divide_closed,
+                       bspline_restrict, tol, reloft):
+    # Process a single component based on its type.
+    if type_ == 'wing':
+        return _process_wing(compound, divide_closed, bspline_restrict, tol,
+                             reloft, name)
+    if type_ == 'fuse':
+        return _process_fuse(compound, divide_closed, name)
+
+    solid, invalid = _build_solid(compound, divide_closed)
+    if solid is None:
+        return None, invalid
+    return Body(solid, name), invalid
+
+
+def _process_component_file(args):
+    # Process a single component read from a BREP file in a worker process.
+    # The results are written to BREP files next to the input file since OCC
+    # types cannot be sent between processes. Surfaces in the metadata are
+    # written as faces.
+    type_, fn, name, options = args
+    logger.info(' '.join(['---Processing OpenVSP component:', name]))
+    compound = read_brep(fn)
+    body, invalid = _process_component(type_, compound, name, *options)
+
+    base = os.path.splitext(fn)[0]
+    if invalid:
+        write_brep(Compound.by_shapes(invalid), base + '_invalid.brep')
+    if body is None:
+        return False, [], len(invalid)
+
+    write_brep(body.shape, base + '_solid.brep')
+    keys = []
+    for key in sorted(body.metadata):
+        srf = body.metadata[key]
+        if not isinstance(srf, Surface):
+            continue
+        fn_srf = '{}_srf{}.brep'.format(base, len(keys))
+        write_brep(Face.by_surface(srf), fn_srf)
+        keys.append(key)
+    return True, keys, len(invalid)
+
+
+def _process_components_parallel(components, options, nprocs):
+    # Process the components in a pool of worker processes and rebuild the
+    # bodies in the same order as the input.
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        args = []
+        for i, (name, type_, compound, _) in enumerate(components):
+            fn = os.path.join(tmp_dir, 'comp{}.brep'.format(i))
+            write_brep(compound, fn)
+            args.append((type_, fn, name, options))
+
+        pool = Pool(nprocs)
+        try:
+            outputs = pool.map(_process_component_file, args)
+        finally:
+            pool.close()
+            pool.join()
+
+        results = []
+        for (_, fn, name, _), (is_done, keys, ninvalid) in zip(args,
+                                                               outputs):
+            base = os.path.splitext(fn)[0]
+            invalid = []
+            if ninvalid > 0:
+                cmp = read_brep(base + '_invalid.brep')
+                invalid = list(cmp.shape_iter)
+            if not is_done:
+                results.append((None, invalid))
+                continue
+            body = Body(read_brep(base + '_solid.brep'), name)
+            for i, key in enumerate(keys):
+                fn_srf = '{}_srf{}.brep'.format(base, i)
+                body.metadata.set(key, read_brep(fn_srf).surface)
+            results.append((body, invalid))
+        return results
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
 def _process_fuse(compound, divide_closed, name):
     # For VSP fuselages, the longitudinal direction is u, and the
     # circumferential direction is v.
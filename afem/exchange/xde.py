@@ -16,6 +16,9 @@
 # You should have received a copy of the GNU Lesser General Public
 # License along with this library; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+from collections import OrderedDict
+from functools import partial
+
 from OCCT.BinXCAFDrivers import BinXCAFDrivers
 from OCCT.IFSelect import IFSelect_RetError
 from OCCT.Interface import Interface_Static
@@ -26,10 +29,13 @@ from OCCT.STEPConstruct import STEPConstruct
 from OCCT.TCollection import (TCollection_ExtendedString,
                               TCollection_AsciiString,
                               TCollection_HAsciiString)
-from OCCT.TDF import TDF_ChildIterator, TDF_Label, TDF_LabelSequence
-from OCCT.TDataStd import TDataStd_Name, TDataStd_AsciiString
+from OCCT.TDF import (TDF_ChildIterator, TDF_Label, TDF_LabelSequence,
+                      TDF_Tool)
+from OCCT.TDataStd import (TDataStd_Name, TDataStd_AsciiString,
+                           TDataStd_Comment)
 from OCCT.TDocStd import TDocStd_Document
 from OCCT.TNaming import TNaming_NamedShape
+from OCCT.TopLoc import TopLoc_Location
 from OCCT.XCAFApp import XCAFApp_Application
 from OCCT.XCAFDoc import XCAFDoc_DocumentTool, XCAFDoc_Color
 from OCCT.XmlXCAFDrivers import XmlXCAFDrivers
@@ -37,7 +43,7 @@ from OCCT.XmlXCAFDrivers import XmlXCAFDrivers
 from afem.config import units_dict, Settings
 from afem.topology.entities import Shape
 
-__all__ = ["XdeDocument", "XdeLabel"]
+__all__ = ["XdeDocument", "XdeLabel", "XdeLabelIndex"]
 
 
 class XdeDocument(object):
@@ -77,6 +83,7 @@ class XdeDocument(object):
 
     def _init_tool(self):
         self._tool = XCAFDoc_DocumentTool.ShapeTool_(self._doc.Main())
+        self._index = None
 
     @property
     def main_label(self):
@@ -94,6 +101,19 @@ class XdeDocument(object):
         """
         return XdeLabel(XCAFDoc_DocumentTool.ShapesLabel_(self._doc.Main()))
 
+    @property
+    def index(self):
+        """
+        :return: An index of the top-level shape labels by name, type, and
+            shape. The index is built on first access by reading only the
+            name and string attributes of each label and is then kept up to
+            date as shapes are added and removed and labels are renamed.
+        :rtype: afem.exchange.xde.XdeLabelIndex
+        """
+        if self._index is None:
+            self._index = XdeLabelIndex(self.shapes_label)
+        return self._index
+
     def open(self, fn):
         """
         Open a document.
@@ -264,9 +284,16 @@ class XdeDocument(object):
         :return: The shape label if found, *None* otherwise.
         :rtype: afem.exchange.xde.XdeLabel
         """
+        if not find_instance:
+            label = self.index.by_shape(shape)
+            if label is not None:
+                return label
         label = self._tool.FindShape(shape.object, find_instance)
         if not label:
             return None
+        # Only top-level labels belong to the index
+        if self._tool.IsTopLevel(label):
+            return XdeLabel(label, self._index)
         return XdeLabel(label)
 
     def new_shape(self):
@@ -276,7 +303,10 @@ class XdeDocument(object):
         :return: The label.
         :rtype: afem.exchange.xde.XdeLabel
         """
-        return XdeLabel(self._tool.NewShape())
+        label = XdeLabel(self._tool.NewShape())
+        if self._index is not None:
+            self._index.add(label)
+        return label
 
     def set_shape(self, label, shape):
         """
@@ -288,6 +318,8 @@ class XdeDocument(object):
         :return: None.
         """
         self._tool.SetShape(label.object, shape.object)
+        if self._index is not None:
+            self._index.update(label)
 
     def add_shape(self, shape, name=None, make_assy=True):
         """
@@ -301,6 +333,8 @@ class XdeDocument(object):
         :rtype: afem.exchange.xde.XdeLabel
         """
         label = XdeLabel(self._tool.AddShape(shape.object, make_assy))
+        if self._index is not None:
+            self._index.add(label)
         if name is not None:
             label.set_name(name)
         return label
@@ -317,7 +351,10 @@ class XdeDocument(object):
             a free or top-level shape.
         :rtype: bool
         """
-        return self._tool.RemoveShape(label.object, remove_completely)
+        status = self._tool.RemoveShape(label.object, remove_completely)
+        if status and self._index is not None:
+            self._index.remove(label)
+        return status
 
     def get_shapes(self):
         """
@@ -328,7 +365,7 @@ class XdeDocument(object):
         """
         labels = TDF_LabelSequence()
         self._tool.GetShapes(labels)
-        return [XdeLabel(label) for label in labels]
+        return [XdeLabel(label, self._index) for label in labels]
 
     def get_shape_by_name(self, name):
         """
@@ -340,9 +377,10 @@ class XdeDocument(object):
         :return: The label or *None* if not found.
         :rtype: afem.exchange.xde.XdeLabel or None
         """
-        for label in self.get_shapes():
-            if label.name == name:
-                return label
+        labels = self.index.by_name(name)
+        if not labels:
+            return None
+        return labels[0][1]
 
     def find_subshape(self, label, shape):
         """
@@ -378,6 +416,19 @@ class XdeDocument(object):
         label.set_name(name)
         return label
 
+    def shape_loader(self, label):
+        """
+        Create a function that retrieves the shape of the label when called.
+        The function keeps a reference to this document so that it stays
+        open until the shape is loaded.
+
+        :param afem.exchange.xde.XdeLabel label: The label.
+
+        :return: A function with no arguments that returns the shape.
+        :rtype: collections.Callable
+        """
+        return partial(_load_label_shape, self, label)
+
     def set_auto_naming(self, mode):
         """
         Set the option to auto-name shape labels. This only applies to
@@ -396,10 +447,14 @@ class XdeLabel(object):
     Wrapper class for OpenCASCADE TDF_Label.
 
     :param OCCT.TDF.TDF_Label: The label.
+    :param afem.exchange.xde.XdeLabelIndex index: The index this label
+        belongs to, if any. The index is updated when the name or string of
+        the label is set.
     """
 
-    def __init__(self, label):
+    def __init__(self, label, index=None):
         self._label = label
+        self._index = index
 
     @property
     def object(self):
@@ -417,6 +472,17 @@ class XdeLabel(object):
         """
         return self._label.Tag()
 
+    @property
+    def entry(self):
+        """
+        :return: The label entry (e.g., "0:1:1:1"). The entry is unique
+            within the document and is kept when the document is saved.
+        :rtype: str
+        """
+        entry = TCollection_AsciiString()
+        TDF_Tool.Entry_(self._label, entry)
+        return entry.ToCString()
+
     @property
     def depth(self):
         """
@@ -509,6 +575,18 @@ class XdeLabel(object):
             return string.Get().ToCString()
         return None
 
+    @property
+    def comment(self):
+        """
+        :return: The label comment.
+        :rtype: str or None
+        """
+        comment = TDataStd_Comment()
+        status, comment = self._label.FindAttribute(comment.GetID_(), comment)
+        if status:
+            return comment.Get().ToExtString()
+        return None
+
     @property
     def color(self):
         """
@@ -586,6 +664,10 @@ class XdeLabel(object):
         """
         txt = TCollection_ExtendedString(name)
         TDataStd_Name.Set_(self._label, txt)
+        if self._index is not None:
+            self._index.update(self)
+        else:
+            _mark_untracked(self)
 
     def set_string(self, string):
         """
@@ -597,6 +679,21 @@ class XdeLabel(object):
         """
         txt = TCollection_AsciiString(string)
         TDataStd_AsciiString.Set_(self._label, txt)
+        if self._index is not None:
+            self._index.update(self)
+        else:
+            _mark_untracked(self)
+
+    def set_comment(self, comment):
+        """
+        Set label comment.
+
+        :param str comment: The comment.
+
+        :return: None.
+        """
+        txt = TCollection_ExtendedString(comment)
+        TDataStd_Comment.Set_(self._label, txt)
 
     def set_color(self, color):
         """
@@ -607,3 +704,315 @@ class XdeLabel(object):
         :return: None.
         """
         XCAFDoc_Color.Set_(self._label, color)
+
+
+class XdeLabelIndex(object):
+    """
+    Index of the children of a label by name, type, and shape. The type is
+    the string attribute of the label (e.g., the part type). Labels added to
+    the index keep a reference to it so that setting their name or string
+    updates the index. If the name or string of a label without this
+    reference is set, the index is rebuilt on its next lookup. The shapes
+    are only read the first time a label is looked up by shape.
+
+    :param afem.exchange.xde.XdeLabel label: The parent label. If provided,
+        its children are added to the index.
+    """
+
+    # Upper limit for the shape hash code
+    _hash_max = 2147483647
+
+    # Number of name or string edits of labels not linked to an index by
+    # label depth
+    _untracked = {}
+
+    def __init__(self, label=None):
+        self._parent = label
+        self._depth = None
+        if label is not None:
+            self._depth = label.depth + 1
+        self._synced = self._untracked_count()
+        self._reset()
+        if label is not None:
+            for child in label.children_iter:
+                self.add(child)
+
+    def __len__(self):
+        self._check()
+        return len(self._records)
+
+    @property
+    def names(self):
+        """
+        :return: The unique names in the order they were added.
+        :rtype: list(str)
+        """
+        self._check()
+        names = OrderedDict()
+        for name, _, _ in self._records.values():
+            if name is not None:
+                names[name] = None
+        return list(names.keys())
+
+    @property
+    def records(self):
+        """
+        :return: List of (name, type, label) tuples of all the labels in the
+            order they were added.
+        :rtype: list(tuple(str, str, afem.exchange.xde.XdeLabel))
+        """
+        self._check()
+        return list(self._records.values())
+
+    @property
+    def types(self):
+        """
+        :return: The unique types.
+        :rtype: list(str)
+        """
+        self._check()
+        return list(self._by_type.keys())
+
+    def add(self, label):
+        """
+        Add a label to the index. Labels without a name are tracked so they
+        are indexed once named, but are not returned by name or type.
+
+        :param afem.exchange.xde.XdeLabel label: The label.
+
+        :return: None.
+        """
+        entry = label.entry
+        if entry in self._records:
+            self.remove(label)
+        label._index = self
+        name = label.name
+        type_ = label.string
+        self._records[entry] = (name, type_, label)
+        self._order[entry] = self._count
+        self._count += 1
+        if name is not None:
+            self._by_name.setdefault(name, []).append(entry)
+            self._by_type.setdefault(type_, []).append(entry)
+        if self._by_shape is not None:
+            self._add_shape(entry, label)
+
+    def remove(self, label):
+        """
+        Remove a label from the index.
+
+        :param afem.exchange.xde.XdeLabel label: The label.
+
+        :return: None.
+        """
+        entry = label.entry
+        record = self._records.pop(entry, None)
+        if record is None:
+            return None
+        del self._order[entry]
+        name, type_, indexed = record
+        indexed._index = None
+        label._index = None
+        if name is not None:
+            _remove_entry(self._by_name, name, entry)
+            _remove_entry(self._by_type, type_, entry)
+        self._remove_shape(entry)
+
+    def update(self, label):
+        """
+        Update the name, type, and shape of a label in the index. The label
+        keeps its position in the index.
+
+        :param afem.exchange.xde.XdeLabel label: The label.
+
+        :return: None.
+        """
+        entry = label.entry
+        if entry not in self._records:
+            if (self._parent is None or
+                    label.father.is_equal(self._parent)):
+                self.add(label)
+            return None
+        name, type_, label = self._records[entry]
+        if name is not None:
+            _remove_entry(self._by_name, name, entry)
+            _remove_entry(self._by_type, type_, entry)
+        name, type_ = label.name, label.string
+        self._records[entry] = (name, type_, label)
+        if name is not None:
+            _insert_entry(self._by_name, name, entry, self._order)
+            _insert_entry(self._by_type, type_, entry, self._order)
+        if self._by_shape is not None:
+            self._remove_shape(entry)
+            self._add_shape(entry, label)
+
+    def by_name(self, name):
+        """
+        Get the labels with a given name.
+
+        :param str name: The name.
+
+        :return: List of (type, label) tuples.
+        :rtype: list(tuple(str, afem.exchange.xde.XdeLabel))
+        """
+        self._check()
+        return [self._records[entry][1:]
+                for entry in self._by_name.get(name, [])]
+
+    def by_type(self, type_):
+        """
+        Get the labels with a given type.
+
+        :param str type_: The type.
+
+        :return: List of (name, label) tuples.
+        :rtype: list(tuple(str, afem.exchange.xde.XdeLabel))
+        """
+        self._check()
+        return [(self._records[entry][0], self._records[entry][2])
+                for entry in self._by_type.get(type_, [])]
+
+    def by_shape(self, shape):
+        """
+        Get the first label whose shape shares the same TShape with the given
+        shape. Locations and orientations may differ.
+
+        :param afem.topology.entities.Shape shape: The shape.
+
+        :return: The label or *None* if not found.
+        :rtype: afem.exchange.xde.XdeLabel or None
+        """
+        self._check()
+        if self._by_shape is None:
+            self._by_shape = {}
+            for entry, (_, _, label) in self._records.items():
+                self._add_shape(entry, label)
+
+        shape = shape.object.Located(TopLoc_Location())
+        code = shape.HashCode(self._hash_max)
+        for entry in self._by_shape.get(code, []):
+            label = self._records[entry][2]
+            if label.shape.object.IsPartner(shape):
+                return label
+        return None
+
+    def find(self, name, type_):
+        """
+        Find the first label with the given name and type.
+
+        :param str name: The name.
+        :param str type_: The type.
+
+        :return: The label or *None* if not found.
+        :rtype: afem.exchange.xde.XdeLabel or None
+        """
+        for label_type, label in self.by_name(name):
+            if label_type == type_:
+                return label
+        return None
+
+    def _reset(self):
+        """
+        Clear the index.
+        """
+        # Records of (name, type, label) by entry in the order they were added
+        self._records = OrderedDict()
+        self._order = {}
+        self._count = 0
+        self._by_name = {}
+        self._by_type = {}
+        self._by_shape = None
+        self._shape_codes = {}
+
+    def _untracked_count(self):
+        """
+        Number of untracked edits that may affect the index.
+        """
+        if self._depth is None:
+            return sum(self._untracked.values())
+        return self._untracked.get(self._depth, 0)
+
+    def _check(self):
+        """
+        Rebuild the index if labels that may belong to it were edited without
+        it. The children of the parent label are indexed again or, if there
+        is no parent, the existing records are updated.
+        """
+        count = self._untracked_count()
+        if count == self._synced:
+            return None
+        self._synced = count
+        if self._parent is None:
+            for _, _, label in list(self._records.values()):
+                self.update(label)
+            return None
+        self._reset()
+        for child in self._parent.children_iter:
+            self.add(child)
+
+    def _add_shape(self, entry, label):
+        """
+        Add the shape of the label to the shape index.
+        """
+        shape = label.shape
+        if shape is None or shape.is_null:
+            return None
+        shape = shape.object.Located(TopLoc_Location())
+        code = shape.HashCode(self._hash_max)
+        self._by_shape.setdefault(code, []).append(entry)
+        self._shape_codes[entry] = code
+
+    def _remove_shape(self, entry):
+        """
+        Remove the shape of the label from the shape index.
+        """
+        code = self._shape_codes.pop(entry, None)
+        if code is not None:
+            _remove_entry(self._by_shape, code, entry)
+
+
+def _mark_untracked(label):
+    """
+    Record that the name or string of a label not linked to an index was
+    edited.
+    """
+    depth = label.depth
+    counts = XdeLabelIndex._untracked
+    counts[depth] = counts.get(depth, 0) + 1
+
+
+def _remove_entry(entries_by_key, key, entry):
+    """
+    Remove an entry from the index by key.
+    """
+    entries = entries_by_key.get(key)
+    if entries is None:
+        return None
+    if entry in entries:
+        entries.remove(entry)
+    if not entries:
+        del entries_by_key[key]
+
+
+def _insert_entry(entries_by_key, key, entry, order):
+    """
+    Insert an entry into the index by key keeping the order the labels were
+    added in.
+    """
+    entries = entries_by_key.setdefault(key, [])
+    pos = order[entry]
+    if not entries or order[entries[-1]] < pos:
+        entries.append(entry)
+        return None
+    for i, other in enumerate(entries):
+        if order[other] > pos:
+            entries.insert(i, entry)
+            return None
+    entries.append(entry)
+
+
+def _load_label_shape(doc, label):
+    """
+    Get the shape of a label. The document is passed to keep it alive.
+    """
+    return label.shape
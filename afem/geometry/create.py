@@ -32,7 +32,7 @@ from OCCT.GeomPlate import GeomPlate_BuildAveragePlane
 from OCCT.TColStd import TColStd_Array1OfInteger, TColStd_Array1OfReal
 from OCCT.TColgp import TColgp_Array1OfPnt
 from OCCT.gce import gce_MakeCirc
-from OCCT.gp import gp_Ax3, gp_Pln, gp_Quaternion, gp_Trsf
+from OCCT.gp import gp_Ax3, gp_Pln, gp_Pnt, gp_Quaternion, gp_Trsf
 from OCCT.gp import gp_Extrinsic_XYZ
 from numpy import array, cross, mean, zeros
 from numpy.linalg import norm
@@ -64,7 +64,8 @@ __all__ = ["PointByXYZ", "PointByArray",
            "PlanesAlongCurveByDistance", "PlanesBetweenPlanesByNumber",
            "PlanesBetweenPlanesByDistance",
            "PlanesAlongCurveAndSurfaceByDistance",
-           "NurbsSurfaceByInterp", "NurbsSurfaceByApprox"]
+           "NurbsSurfaceByInterp", "NurbsSurfaceByApprox",
+           "NurbsSurfaceByFit"]
 
 
 # POINT -----------------------------------------------------------------------
@@ -208,22 +209,19 @@ class PointsAlongCurveByNumber(object):
         self._is_done = tool.IsDone()
         self._npts = 0
         self._prms = []
-        self._pnts = []
+        self._pnts = PointArray()
+        self._pnt_list = None
         self._ds = None
 
         if self._is_done:
             self._npts = tool.NbPoints()
-            for i in range(1, self._npts + 1):
-                u = tool.Parameter(i)
-                p = adp_crv.eval(u)
-                self._pnts.append(p)
-                self._prms.append(u)
+            self._prms = [tool.Parameter(i) for i in range(1, self._npts + 1)]
+            self._pnts = _eval_points(adp_crv, self._prms)
 
         # Point spacing
         self._ds = None
         if self._npts > 1:
-            ds = self._pnts[0].distance(self._pnts[1])
-            self._ds = ds
+            self._ds = float(norm(self._pnts.xyz[1] - self._pnts.xyz[0]))
 
     @property
     def npts(self):
@@ -239,6 +237,17 @@ class PointsAlongCurveByNumber(object):
         :return: The points.
         :rtype: list(afem.geometry.entities.Point)
         """
+        if self._pnt_list is None:
+            self._pnt_list = self._pnts.to_list()
+        return self._pnt_list
+
+    @property
+    def point_array(self):
+        """
+        :return: The points as an array. Points are only created when
+            accessed.
+        :rtype: afem.geometry.entities.PointArray
+        """
         return self._pnts
 
     @property
@@ -266,7 +275,7 @@ class PointsAlongCurveByNumber(object):
         """
         if self.npts < 3:
             return []
-        return self._pnts[1:-1]
+        return self.points[1:-1]
 
 
 class PointsAlongCurveByDistance(object):
@@ -329,22 +338,15 @@ class PointsAlongCurveByDistance(object):
 
         # Gather results
         npts = ua.NbPoints()
-        pnts = []
-        prms = []
-        for i in range(1, npts + 1):
-            u = ua.Parameter(i)
-            p = adp_crv.eval(u)
-            pnts.append(p)
-            prms.append(u)
         self._npts = npts
-        self._prms = prms
-        self._pnts = pnts
+        self._prms = [ua.Parameter(i) for i in range(1, npts + 1)]
+        self._pnts = _eval_points(adp_crv, self._prms)
+        self._pnt_list = None
 
         # Point spacing
         self._ds = None
         if npts > 1:
-            ds = pnts[0].distance(pnts[1])
-            self._ds = ds
+            self._ds = float(norm(self._pnts.xyz[1] - self._pnts.xyz[0]))
 
     @property
     def npts(self):
@@ -360,6 +362,17 @@ class PointsAlongCurveByDistance(object):
         :return: The points.
         :rtype: list(afem.geometry.entities.Point)
         """
+        if self._pnt_list is None:
+            self._pnt_list = self._pnts.to_list()
+        return self._pnt_list
+
+    @property
+    def point_array(self):
+        """
+        :return: The points as an array. Points are only created when
+            accessed.
+        :rtype: afem.geometry.entities.PointArray
+        """
         return self._pnts
 
     @property
@@ -387,7 +400,7 @@ class PointsAlongCurveByDistance(object):
         """
         if self.npts < 3:
             return []
-        return self._pnts[1:-1]
+        return self.points[1:-1]
 
 
 # DIRECTION -------------------------------------------------------------------
@@ -1939,6 +1952,153 @@ class NurbsSurfaceByApprox(object):
         return self._tol2d_reached
 
 
+class NurbsSurfaceByFit(object):
+    """
+    Create a NURBS surface by least squares fitting of a grid of points.
+    Each row of the grid is typically a section sampled with the same number
+    of points. The surface is fit one direction at a time using sparse
+    B-spline least squares systems, first along the rows and then across
+    them. In each direction the fewest control points that reach half the
+    tolerance are found by bisection, so the distance from the points to the
+    surface does not exceed *tol*. This scales much better than
+    :class:`.NurbsSurfaceByApprox` for dense section data.
+
+    :param pnts: Grid of points with shape (nrows, ncols, 3). The
+        u-direction of the surface is along each row and the v-direction is
+        across the rows.
+    :type pnts: collections.Sequence(collections.Sequence(point_like)) or
+        numpy.ndarray
+    :param int p: Degree in u-direction. The parameter will be adjusted if
+        the number of points in a row does not support the desired degree.
+    :param int q: Degree in v-direction. The parameter will be adjusted if
+        the number of rows does not support the desired degree.
+    :param float tol: The tolerance.
+    :param OCCT.Approx.Approx_ParametrizationType parm_type: Parametrization
+        type.
+
+    :raise ValueError: If the points are not a grid with at least two rows
+        and two columns.
+    """
+
+    def __init__(self, pnts, p=3, q=3, tol=1.0e-3,
+                 parm_type=Approx_ChordLength):
+        rows = []
+        for row in pnts:
+            xyz = occ_utils.to_np_xyz(row)
+            if xyz is None:
+                xyz = [CheckGeom.to_point(pij).xyz for pij in row]
+            rows.append(xyz)
+        qp = array(rows, dtype=float)
+        if qp.ndim != 3 or qp.shape[0] < 2 or qp.shape[1] < 2:
+            msg = 'Points must be a grid with at least two rows and columns.'
+            raise ValueError(msg)
+
+        nrows, ncols = qp.shape[0:2]
+        p = min(int(p), ncols - 1)
+        q = min(int(q), nrows - 1)
+
+        # Parameters are averaged over the rows and columns
+        if parm_type == Approx_IsoParametric:
+            parm_func = geom_utils.uniform_parameters
+            uprms = parm_func(ncols, 0., 1.)
+            vprms = parm_func(nrows, 0., 1.)
+        else:
+            if parm_type == Approx_ChordLength:
+                parm_func = geom_utils.chord_parameters
+            else:
+                parm_func = geom_utils.centripetal_parameters
+            uprms = mean([parm_func(row, 0., 1.) for row in qp], axis=0)
+            vprms = mean([parm_func(qp[:, j], 0., 1.) for j in
+                          range(ncols)], axis=0)
+
+        # Fit the rows in the u-direction and then fit the resulting control
+        # points in the v-direction
+        tol = float(tol)
+        cp, uk, _ = geom_utils.lsq_fit_min(uprms, qp.transpose((1, 0, 2)), p,
+                                           tol / 2.)
+        cp, vk, _ = geom_utils.lsq_fit_min(vprms, cp.transpose((1, 0, 2)), q,
+                                           tol / 2.)
+        cp = cp.transpose((1, 0, 2))
+        nu, nv = cp.shape[0:2]
+
+        # Distance from the points to the surface
+        au = geom_utils.collocation_matrix(uprms, nu - 1, p, uk)
+        av = geom_utils.collocation_matrix(vprms, nv - 1, q, vk)
+        s = au.dot(cp.reshape(nu, -1)).reshape(ncols, nv, 3)
+        s = av.dot(s.transpose((1, 0, 2)).reshape(nv, -1))
+        s = s.reshape(nrows, ncols, 3)
+        self._max_error = float(norm(s - qp, axis=-1).max())
+
+        # Create surface
+        tcol_poles = occ_utils.to_tcolgp_array2_pnt(cp)
+        tcol_uknots, tcol_umult = _to_knots_and_mults(uk)
+        tcol_vknots, tcol_vmult = _to_knots_and_mults(vk)
+        s = Geom_BSplineSurface(tcol_poles, tcol_uknots, tcol_vknots,
+                                tcol_umult, tcol_vmult, p, q, False, False)
+        self._s = NurbsSurface(s)
+        self._npoles = (nu, nv)
+        self._prms = (uprms, vprms)
+
+    @property
+    def surface(self):
+        """
+        :return: The NURBS surface.
+        :rtype: afem.geometry.entities.NurbsSurface
+        """
+        return self._s
+
+    @property
+    def parameters(self):
+        """
+        :return: The parameters of the points along the rows and across the
+            rows.
+        :rtype: tuple(numpy.ndarray)
+        """
+        return self._prms
+
+    @property
+    def max_error(self):
+        """
+        :return: Maximum distance between the points and the surface at the
+            point parameters.
+        :rtype: float
+        """
+        return self._max_error
+
+    @property
+    def npoles(self):
+        """
+        :return: Number of control points in the u- and v-directions.
+        :rtype: tuple(int)
+        """
+        return self._npoles
+
+
+def _eval_points(adp_crv, prms):
+    """
+    Evaluate points on a curve adaptor into a point array.
+    """
+    crv = adp_crv.object
+    p = gp_Pnt()
+    xyz = zeros((len(prms), 3))
+    for i, u in enumerate(prms):
+        crv.D0(u, p)
+        xyz[i] = p.X(), p.Y(), p.Z()
+    return PointArray(xyz)
+
+
+def _to_knots_and_mults(uk):
+    """
+    Convert a knot vector to OCC knots and multiplicities.
+    """
+    tcol_knot_seq = occ_utils.to_tcolstd_array1_real(uk)
+    n = BSplCLib.KnotsLength_(tcol_knot_seq, False)
+    tcol_knots = TColStd_Array1OfReal(1, n)
+    tcol_mult = TColStd_Array1OfInteger(1, n)
+    BSplCLib.Knots_(tcol_knot_seq, tcol_knots, tcol_mult, False)
+    return tcol_knots, tcol_mult
+
+
 if __name__ == "__main__":
     import doctest
 
@@ -36,10 +36,13 @@ from OCCT.GeomAdaptor import GeomAdaptor_Curve, GeomAdaptor_Surface
 from OCCT.GeomLib import GeomLib_IsPlanarSurface
 from OCCT.TColStd import (TColStd_Array1OfInteger, TColStd_Array1OfReal,
                           TColStd_Array2OfReal)
-from OCCT.TColgp import TColgp_Array1OfPnt, TColgp_Array2OfPnt
+from OCCT.TColgp import (TColgp_Array1OfPnt, TColgp_Array1OfPnt2d,
+                         TColgp_Array2OfPnt)
 from OCCT.gp import (gp_Ax1, gp_Ax2, gp_Ax3, gp_Dir, gp_Pnt, gp_Pnt2d,
                      gp_Vec2d, gp_Dir2d, gp_Vec)
-from numpy import add, array, float64, subtract, ones
+from numpy import (add, array, asarray, float64, integer, ndarray, ones,
+                   subtract, zeros)
+from numpy.linalg import norm
 
 from afem.base.entities import ViewableItem
 from afem.geometry import utils as geom_utils
@@ -48,7 +51,8 @@ from afem.occ import utils as occ_utils
 
 __all__ = ["Geometry2D", "Point2D", "Vector2D", "Direction2D",
            "Curve2D", "NurbsCurve2D",
-           "Geometry", "Point", "Direction", "Vector", "Axis1", "Axis3",
+           "Geometry", "Point", "Direction", "Vector", "PointArray",
+           "VectorArray", "Axis1", "Axis3",
            "Curve", "Line", "Circle", "Ellipse", "NurbsCurve", "TrimmedCurve",
            "Surface", "Plane", "NurbsSurface"]
 
@@ -886,6 +890,26 @@ class NurbsCurve2D(Curve2D):
         self.object.KnotSequence(tcol_knot_seq)
         return occ_utils.to_np_from_tcolstd_array1_real(tcol_knot_seq)
 
+    @property
+    def cp(self):
+        """
+        :return: Control points.
+        :rtype: numpy.ndarray
+        """
+        tcol_array = TColgp_Array1OfPnt2d(1, self.object.NbPoles())
+        self.object.Poles(tcol_array)
+        return occ_utils.to_np_from_tcolgp_array1_pnt2d(tcol_array)
+
+    @property
+    def w(self):
+        """
+        :return: Weights of control points.
+        :rtype: numpy.ndarray
+        """
+        tcol_array = TColStd_Array1OfReal(1, self.object.NbPoles())
+        self.object.Weights(tcol_array)
+        return occ_utils.to_np_from_tcolstd_array1_real(tcol_array)
+
     def set_domain(self, u1=0., u2=1.):
         """
         Reparameterize the knot vector between *u1* and *u2*.
@@ -919,6 +943,29 @@ class NurbsCurve2D(Curve2D):
         self.object.Segment(u1, u2)
         return True
 
+    @classmethod
+    def by_data(cls, cp, knots, mult, p, weights=None, is_periodic=False):
+        """
+        Create a 2-D NURBS curve by data.
+
+        :param collections.Sequence(point2d_like) cp: Control points.
+        :param collections.Sequence(float) knots: Knot vector.
+        :param collections.Sequence(int) mult: Multiplicities of knot vector.
+        :param int p: Degree.
+        :param collections.Sequence(float) weights: Weights of control points.
+        :param bool is_periodic: Flag for periodicity.
+        """
+        tcol_cp = occ_utils.to_tcolgp_array1_pnt2d(cp)
+        tcol_knots = occ_utils.to_tcolstd_array1_real(knots)
+        tcol_mult = occ_utils.to_tcolstd_array1_integer(mult)
+        if weights is None:
+            weights = [1.] * tcol_cp.Length()
+        tcol_weights = occ_utils.to_tcolstd_array1_real(weights)
+
+        geom_crv = Geom2d_BSplineCurve(tcol_cp, tcol_weights, tcol_knots,
+                                       tcol_mult, p, is_periodic)
+        return cls(geom_crv)
+
 
 # 3-D -------------------------------------------------------------------------
 # Types derived from OpenCASCADE geometric processor (gp) package.
@@ -1635,6 +1682,206 @@ class Vector(gp_Vec):
         return cls(p1, p2)
 
 
+class _XYZArray(object):
+    """
+    Base class for arrays of 3-D entities stored in a single NumPy buffer.
+    """
+
+    _item_type = None
+
+    def __init__(self, xyz=()):
+        xyz = asarray(xyz, dtype=float64)
+        if xyz.size == 0:
+            xyz = xyz.reshape(0, 3)
+        if xyz.ndim != 2 or xyz.shape[1] != 3:
+            msg = 'Array must have shape (n, 3).'
+            raise ValueError(msg)
+        self._xyz = xyz
+
+    def __str__(self):
+        return '{0}({1} items)'.format(self.__class__.__name__, len(self))
+
+    def __repr__(self):
+        return '{0}({1} items)'.format(self.__class__.__name__, len(self))
+
+    def __array__(self, dtype=float64, copy=False, order=None, subok=False,
+                  ndmin=0):
+        if dtype is None:
+            dtype = float64
+        if copy:
+            return array(self._xyz, dtype=dtype, order=order, ndmin=ndmin)
+        return asarray(self._xyz, dtype=dtype)
+
+    def __len__(self):
+        return self._xyz.shape[0]
+
+    def __iter__(self):
+        for xyz in self._xyz:
+            yield self._item_type(*xyz)
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, integer)):
+            return self._item_type(*self._xyz[item])
+        return self.__class__(self._xyz[item])
+
+    def __setitem__(self, item, value):
+        self._xyz[item] = asarray(value, dtype=float64)
+
+    @property
+    def xyz(self):
+        """
+        :return: The underlying array of shape (n, 3). This is not a copy.
+        :rtype: numpy.ndarray
+        """
+        return self._xyz
+
+    def copy(self):
+        """
+        Return a new copy of the array.
+
+        :return: New array.
+        """
+        return self.__class__(self._xyz.copy())
+
+    def to_list(self):
+        """
+        Create a new entity for each item.
+
+        :return: List of entities.
+        :rtype: list
+        """
+        return [self._item_type(*xyz) for xyz in self._xyz]
+
+    @classmethod
+    def by_entities(cls, entities):
+        """
+        Create an array from a collection of entities.
+
+        :param entities: The entities. If this is an array or another array
+            container no per-item conversion is done.
+        :type entities: collections.Sequence or numpy.ndarray
+
+        :return: The new array.
+        """
+        if isinstance(entities, (ndarray, _XYZArray)):
+            return cls(array(entities, dtype=float64))
+        xyz = zeros((len(entities), 3), dtype=float64)
+        for i, entity in enumerate(entities):
+            if isinstance(entity, (gp_Pnt, gp_Vec)):
+                xyz[i] = entity.X(), entity.Y(), entity.Z()
+            else:
+                xyz[i] = entity[0], entity[1], entity[2]
+        return cls(xyz)
+
+
+class PointArray(_XYZArray):
+    """
+    Array of 3-D points stored in a single NumPy buffer of shape (n, 3).
+    Items are returned as new :class:`.Point` instances only when accessed,
+    so changing a returned point does not change the array. Slices share the
+    buffer with the original array.
+
+    :param array_like xyz: The point coordinates.
+
+    Usage:
+
+    >>> from afem.geometry import PointArray
+    >>> pnts = PointArray([(0., 0., 0.), (1., 0., 0.)])
+    >>> pnts[1]
+    Point(1.000, 0.000, 0.000)
+    """
+
+    _item_type = Point
+
+    def distances(self, other):
+        """
+        Compute the distance from each point to another point.
+
+        :param point_like other: The other point.
+
+        :return: The distances.
+        :rtype: numpy.ndarray
+        """
+        return norm(self._xyz - asarray(other, dtype=float64), axis=1)
+
+    def translate(self, v):
+        """
+        Translate all the points along the vector.
+
+        :param vector_like v: The translation vector.
+
+        :return: *True* if translated.
+        :rtype: bool
+        """
+        self._xyz += asarray(v, dtype=float64)
+        return True
+
+    @classmethod
+    def by_points(cls, pnts):
+        """
+        Create an array from points.
+
+        :param collections.Sequence(point_like) pnts: The points.
+
+        :return: The new array.
+        :rtype: afem.geometry.entities.PointArray
+        """
+        return cls.by_entities(pnts)
+
+
+class VectorArray(_XYZArray):
+    """
+    Array of 3-D vectors stored in a single NumPy buffer of shape (n, 3).
+    Items are returned as new :class:`.Vector` instances only when accessed,
+    so changing a returned vector does not change the array. Slices share
+    the buffer with the original array.
+
+    :param array_like xyz: The vector components.
+    """
+
+    _item_type = Vector
+
+    @property
+    def mag(self):
+        """
+        :return: The magnitude of each vector.
+        :rtype: numpy.ndarray
+        """
+        return norm(self._xyz, axis=1)
+
+    def normalize(self):
+        """
+        Normalize all the vectors. Vectors of zero length are not changed.
+
+        :return: None.
+        """
+        mag = self.mag
+        mag[mag == 0.] = 1.
+        self._xyz /= mag[:, None]
+
+    def scale(self, scale):
+        """
+        Scale all the vectors.
+
+        :param float scale: Scaling value.
+
+        :return: None.
+        """
+        self._xyz *= scale
+
+    @classmethod
+    def by_vectors(cls, vectors):
+        """
+        Create an array from vectors.
+
+        :param collections.Sequence(vector_like) vectors: The vectors.
+
+        :return: The new array.
+        :rtype: afem.geometry.entities.VectorArray
+        """
+        return cls.by_entities(vectors)
+
+
 class Axis1(gp_Ax1):
     """
     Axis in 3-D space derived from ``gp_Ax1``.
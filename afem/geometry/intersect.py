@@ -16,28 +16,47 @@
 # You should have received a copy of the GNU Lesser General Public
 # License along with this library; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
-from OCCT.BRepBuilderAPI import BRepBuilderAPI_MakeEdge
+import os
+import shutil
+import tempfile
+from multiprocessing import Pool
+
+from OCCT.BRep import BRep_Builder, BRep_Tool
+from OCCT.BRepBuilderAPI import (BRepBuilderAPI_MakeEdge,
+                                 BRepBuilderAPI_MakeFace)
+from OCCT.BRepTools import BRepTools
+from OCCT.BndLib import BndLib_AddSurface
+from OCCT.Bnd import Bnd_Box
 from OCCT.Extrema import Extrema_ExtPC
+from OCCT.Geom import Geom_RectangularTrimmedSurface
 from OCCT.GeomAPI import GeomAPI_IntCS
+from OCCT.GeomAdaptor import GeomAdaptor_HSurface, GeomAdaptor_Surface
 from OCCT.GeomInt import GeomInt_IntSS
 from OCCT.IntTools import IntTools_EdgeEdge
 from OCCT.ShapeFix import ShapeFix_ShapeTolerance
 from OCCT.TopAbs import TopAbs_VERTEX
-from numpy import float64, inf, mean, sqrt, zeros
-from scipy.spatial import KDTree
+from OCCT.TopoDS import TopoDS, TopoDS_Compound, TopoDS_Iterator, TopoDS_Shape
+from numpy import (array, concatenate, diff, float64, inf, linspace, mean,
+                   sqrt, zeros)
+from numpy.linalg import norm
+from scipy.spatial import cKDTree
 
 from afem.adaptor.entities import AdaptorCurve
+from afem.config import logger
 from afem.geometry.check import CheckGeom
-from afem.geometry.entities import Curve, Point
+from afem.geometry.entities import Curve, Point, Plane
 
 __all__ = ["CurveIntersector", "IntersectCurveCurve",
            "IntersectCurveSurface", "SurfaceIntersector",
-           "IntersectSurfaceSurface"]
+           "IntersectSurfaceSurface", "IntersectSurfaceSurfaces",
+           "CurveSetIndex"]
 
 
 class CurveIntersector(object):
     """
-    Base class for handling curve intersection methods and results.
+    Base class for handling curve intersection methods and results. The
+    intersection points are stored in a KD-tree for nearest point queries.
+    Nearest curve queries are handled by :class:`.CurveSetIndex`.
     """
 
     def __init__(self, c1, c2):
@@ -58,7 +77,7 @@ class CurveIntersector(object):
             for i in range(npts):
                 data[i] = results[i][1]
             self._results = results
-            self._kdt = KDTree(data)
+            self._kdt = cKDTree(data)
 
     @property
     def npts(self):
@@ -130,6 +149,27 @@ class CurveIntersector(object):
         d, i = self._kdt.query(p0.xyz, 1, 0., 2, distance_upper_bound)
         return d, i
 
+    def query_points(self, pnts, distance_upper_bound=inf):
+        """
+        Find the intersection result nearest to each of the provided points.
+
+        :param collections.Sequence(point_like) pnts: Points to search from.
+        :param float distance_upper_bound: Return only results within this
+            distance.
+
+        :return: Distances to the nearest intersection results and their
+            indices (d, i). A point without a result within the distance has
+            an infinite distance and an index equal to the number of
+            results. Returns (None, None) if no results are available.
+        :rtype: tuple(numpy.ndarray)
+        """
+        if not self.success:
+            return None, None
+        xyz = array([CheckGeom.to_point(p).xyz for p in pnts],
+                    dtype=float64).reshape(-1, 3)
+        d, i = self._kdt.query(xyz, 1, 0., 2, distance_upper_bound)
+        return d, i
+
 
 class IntersectCurveCurve(CurveIntersector):
     """
@@ -221,6 +261,7 @@ class SurfaceIntersector(object):
 
     def __init__(self):
         self._crvs = []
+        self._index = None
 
     @property
     def ncrvs(self):
@@ -257,17 +298,42 @@ class SurfaceIntersector(object):
         """
         return self._crvs[indx - 1]
 
+    @property
+    def curve_index(self):
+        """
+        :return: The index of the intersection curves used for nearest curve
+            queries. It is built on first access.
+        :rtype: afem.geometry.intersect.CurveSetIndex
+        """
+        if self._index is None:
+            self._index = CurveSetIndex(self._crvs)
+        return self._index
+
     def curve_nearest_point(self, pnt):
         """
-        Get the index of the intersection curve that is nearest to the given
-        reference point.
+        Get the intersection curve that is nearest to the given reference
+        point.
 
         :param point_like pnt: Reference point.
 
-        :return: Index of curve nearest point.
-        :rtype: int
+        :return: The curve nearest the point. Returns *None* if there are no
+            curves.
+        :rtype: afem.geometry.entities.Curve or None
         """
-        return _curve_nearest_point(pnt, self._crvs)
+        return self.curve_index.nearest_curve(pnt)
+
+    def curves_nearest_points(self, pnts):
+        """
+        Get the intersection curve that is nearest to each of the given
+        reference points.
+
+        :param collections.Sequence(point_like) pnts: Reference points.
+
+        :return: The curve nearest each point.
+        :rtype: list(afem.geometry.entities.Curve)
+        """
+        indices, _ = self.curve_index.query(pnts)
+        return [self._crvs[i] for i in indices]
 
 
 class IntersectSurfaceSurface(SurfaceIntersector):
@@ -306,45 +372,397 @@ class IntersectSurfaceSurface(SurfaceIntersector):
         return self._tol3d
 
 
-def _distance_point_to_curve(point, curve):
+class IntersectSurfaceSurfaces(object):
     """
-    Find the minimum distance between a point and a curve.
+    Batch surface-surface intersection of one reference surface with many
+    tool surfaces. The adaptor and bounding box of the reference surface are
+    computed once and shared by all tools, and tools whose bounding box does
+    not intersect the bounding box of the reference surface are skipped.
+
+    :param afem.geometry.entities.Surface srf: The reference surface.
+    :param collections.Sequence(afem.geometry.entities.Surface) tools: The
+        tool surfaces.
+    :param itol: Intersection tolerance. Provide a sequence to use a
+        different tolerance for each tool.
+    :type itol: float or collections.Sequence(float)
+    :param bool approx: Approximate intersection curves.
+    :param int nprocs: Number of worker processes. If 1 then the tools are
+        intersected in this process. If *None* then the number of CPUs is
+        used. Surfaces are sent to the workers as faces, so bounded surfaces
+        are restored from the parameter bounds of the face.
+
+    Usage:
+
+    >>> from afem.geometry import PlaneByAxes
+    >>> srf = PlaneByAxes(axes='xy').plane
+    >>> tools = [PlaneByAxes((x, 0., 0.), 'yz').plane for x in (1., 2.)]
+    >>> ssi = IntersectSurfaceSurfaces(srf, tools)
+    >>> [r.ncrvs for r in ssi.results]
+    [1, 1]
     """
-    # OCC extrema.
-    adp_crv = AdaptorCurve.to_adaptor(curve)
-    ext_pc = Extrema_ExtPC(point, adp_crv.object)
-    if not ext_pc.IsDone():
-        return None
 
-    # Find the minimum result.
-    n_ext = ext_pc.NbExt()
-    for i in range(1, n_ext + 1):
-        if ext_pc.IsMin(i):
-            d = ext_pc.SquareDistance(i)
-            return sqrt(d)
+    def __init__(self, srf, tools, itol=1.0e-7, approx=True, nprocs=1):
+        tools = list(tools)
+        try:
+            itols = [float(tol) for tol in itol]
+        except TypeError:
+            itols = [itol] * len(tools)
+        if len(itols) != len(tools):
+            raise ValueError('The number of tolerances does not match the '
+                             'number of tools.')
+
+        # Bounding box of the reference surface shared by all tools
+        box = Bnd_Box()
+        BndLib_AddSurface.Add_(GeomAdaptor_Surface(srf.object), 0., box)
+
+        # Skip tools whose bounding box does not intersect the surface
+        indices = []
+        self._is_skipped = []
+        for tool, tol in zip(tools, itols):
+            if isinstance(tool, Plane):
+                is_out = box.IsOut(tool.gp_pln)
+            else:
+                tool_box = Bnd_Box()
+                BndLib_AddSurface.Add_(GeomAdaptor_Surface(tool.object), tol,
+                                       tool_box)
+                is_out = box.IsOut(tool_box)
+            if not is_out:
+                indices.append(len(self._is_skipped))
+            self._is_skipped.append(is_out)
+
+        jobs = [(tools[i], itols[i]) for i in indices]
+        if nprocs == 1:
+            hsrf = GeomAdaptor_HSurface(srf.object)
+            results = [_intersect_adaptor(hsrf, tool.object, tol, approx)
+                       for tool, tol in jobs]
+        else:
+            results = _intersect_parallel(srf, jobs, approx, nprocs)
+
+        self._results = [_SurfaceIntersection([], 0.) for _ in tools]
+        for i, (crvs, tol3d) in zip(indices, results):
+            self._results[i] = _SurfaceIntersection(crvs, tol3d)
+
+    @property
+    def ntools(self):
+        """
+        :return: Number of tools.
+        :rtype: int
+        """
+        return len(self._results)
+
+    @property
+    def results(self):
+        """
+        :return: The intersection results of each tool. Each result provides
+            the intersection curves and the tolerance reached.
+        :rtype: list(afem.geometry.intersect.SurfaceIntersector)
+        """
+        return self._results
+
+    @property
+    def curves(self):
+        """
+        :return: The intersection curves of each tool.
+        :rtype: list(list(afem.geometry.entities.Curve))
+        """
+        return [result.curves for result in self._results]
+
+    @property
+    def tol3d(self):
+        """
+        :return: Tolerance reached for the 3-D intersection curves of each
+            tool.
+        :rtype: list(float)
+        """
+        return [result.tol3d for result in self._results]
+
+    @property
+    def is_skipped(self):
+        """
+        :return: Flags indicating if the tool was skipped because its bounding
+            box does not intersect the reference surface.
+        :rtype: list(bool)
+        """
+        return list(self._is_skipped)
+
+
+class _SurfaceIntersection(SurfaceIntersector):
+    """
+    Result of a single intersection in a batch.
+    """
+
+    def __init__(self, crvs, tol3d):
+        super(_SurfaceIntersection, self).__init__()
+        self._crvs = crvs
+        self._tol3d = tol3d
+
+    @property
+    def tol3d(self):
+        """
+        :return: Tolerance reached for 3-D intersection curves.
+        :rtype: float
+        """
+        return self._tol3d
+
+
+def _intersect_adaptor(hsrf, tool, itol, approx):
+    """
+    Intersect the adaptor of the reference surface with a tool surface.
+    """
+    ssi = GeomInt_IntSS()
+    ssi.Perform(hsrf, GeomAdaptor_HSurface(tool), itol, approx, False, False)
+    if not ssi.IsDone():
+        return [], 0.
+    crvs = [Curve.wrap(ssi.Line(i)) for i in range(1, ssi.NbLines() + 1)]
+    return crvs, ssi.TolReached3d()
+
+
+def _intersect_parallel(srf, jobs, approx, nprocs):
+    """
+    Intersect the reference surface with the tools in worker processes.
+    """
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        ref_fn = os.path.join(tmp_dir, 'ref.brep')
+        _write_surface(srf.object, ref_fn)
+        args = []
+        for i, (tool, tol) in enumerate(jobs):
+            fn = os.path.join(tmp_dir, 'tool{}.brep'.format(i))
+            _write_surface(tool.object, fn)
+            args.append((ref_fn, fn, tol, approx))
+
+        pool = Pool(nprocs)
+        try:
+            outputs = pool.map(_intersect_file, args)
+        finally:
+            pool.close()
+            pool.join()
+
+        results = []
+        for (_, fn, _, _), tol3d in zip(args, outputs):
+            shape = TopoDS_Shape()
+            BRepTools.Read_(shape, fn + '.out', BRep_Builder())
+            crvs = []
+            it = TopoDS_Iterator(shape)
+            while it.More():
+                edge = TopoDS.Edge_(it.Value())
+                hcrv, _, _ = BRep_Tool.Curve_(edge, 0., 0.)
+                crvs.append(Curve.wrap(hcrv))
+                it.Next()
+            results.append((crvs, tol3d))
+        return results
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _intersect_file(args):
+    """
+    Intersect surfaces read from BREP files and write the curves as edges.
+    Used by the worker processes of IntersectSurfaceSurfaces.
+    """
+    ref_fn, tool_fn, itol, approx = args
+    hsrf = GeomAdaptor_HSurface(_read_surface(ref_fn))
+    crvs, tol3d = _intersect_adaptor(hsrf, _read_surface(tool_fn), itol,
+                                     approx)
+
+    builder = BRep_Builder()
+    cmp = TopoDS_Compound()
+    builder.MakeCompound(cmp)
+    for crv in crvs:
+        edge = BRepBuilderAPI_MakeEdge(crv.object)
+        if not edge.IsDone():
+            logger.warning('Failed to transfer an intersection curve.')
+            continue
+        builder.Add(cmp, edge.Edge())
+    BRepTools.Write_(cmp, tool_fn + '.out')
+    return tol3d
+
+
+def _write_surface(hsrf, fn):
+    """
+    Write a surface to a BREP file as a face.
+    """
+    face = BRepBuilderAPI_MakeFace(hsrf, 1.0e-7).Face()
+    BRepTools.Write_(face, fn)
+
+
+def _read_surface(fn):
+    """
+    Read a surface written as a face. The surface is trimmed to the
+    parameter bounds of the face if they are finite.
+    """
+    shape = TopoDS_Shape()
+    BRepTools.Read_(shape, fn, BRep_Builder())
+    face = TopoDS.Face_(shape)
+    hsrf = BRep_Tool.Surface_(face)
+    u1, u2, v1, v2 = BRepTools.UVBounds_(face, 0., 0., 0., 0.)
+    if max(abs(u1), abs(u2), abs(v1), abs(v2)) < 1.0e100:
+        hsrf = Geom_RectangularTrimmedSurface(hsrf, u1, u2, v1, v2)
+    return hsrf
+
+
+class CurveSetIndex(object):
+    """
+    Index of a set of curves for nearest curve queries. Each curve is
+    approximated by a polyline and the polyline points of all curves are
+    stored in a single KD-tree. A query uses the KD-tree to select the curves
+    that could be nearest to a point and then computes the exact distance
+    only to those curves. Curves with infinite parameter bounds are always
+    checked exactly.
+
+    :param curves: The curves.
+    :type curves: collections.Sequence(afem.geometry.entities.Curve or
+        afem.adaptor.entities.AdaptorCurve or afem.topology.entities.Edge or
+        afem.topology.entities.Wire)
+    :param int npts: Number of polyline points for each curve.
+
+    Usage:
+
+    >>> from afem.geometry import NurbsCurveByPoints
+    >>> c1 = NurbsCurveByPoints([(0., 0., 0.), (10., 0., 0.)]).curve
+    >>> c2 = NurbsCurveByPoints([(0., 5., 0.), (10., 5., 0.)]).curve
+    >>> index = CurveSetIndex([c1, c2])
+    >>> index.query([(5., 1., 0.), (5., 4., 0.)])[0]
+    [0, 1]
+    """
+
+    def __init__(self, curves, npts=50):
+        self._curves = list(curves)
+        self._adaptors = [AdaptorCurve.to_adaptor(c) for c in self._curves]
+
+        xyz, owners = [], []
+        self._unbounded = []
+        self._pad = 0.
+        for i, adp in enumerate(self._adaptors):
+            u1, u2 = adp.u1, adp.u2
+            if max(abs(u1), abs(u2)) >= 1.0e100:
+                self._unbounded.append(i)
+                continue
+            pnts = array([adp.eval(u).xyz for u in linspace(u1, u2, npts)])
+            if npts > 1:
+                self._pad = max(self._pad, norm(diff(pnts, axis=0),
+                                                axis=1).max())
+            xyz.append(pnts)
+            owners += [i] * npts
+
+        self._owners = array(owners, dtype=int)
+        self._tree = None
+        if xyz:
+            self._tree = cKDTree(concatenate(xyz))
 
-    return None
+    def __len__(self):
+        return len(self._curves)
+
+    @property
+    def curves(self):
+        """
+        :return: The curves.
+        :rtype: list
+        """
+        return self._curves
 
+    def query(self, pnts):
+        """
+        Find the nearest curve to each point.
 
-def _curve_nearest_point(point, curves):
+        :param collections.Sequence(point_like) pnts: The points.
+
+        :return: The index of the nearest curve and the distance to it for
+            each point. The index is -1 and the distance is infinite if no
+            curve could be found.
+        :rtype: tuple(list(int), list(float))
+        """
+        pnts = [CheckGeom.to_point(p) for p in pnts]
+        indices = [-1] * len(pnts)
+        dists = [inf] * len(pnts)
+        if not pnts or not self._curves:
+            return indices, dists
+
+        # Candidates are the curves with a polyline point within the distance
+        # to the nearest polyline point plus the largest polyline segment
+        if self._tree is not None:
+            xyz = array([p.xyz for p in pnts])
+            d0, i0 = self._tree.query(xyz)
+            candidates = self._tree.query_ball_point(xyz, d0 + self._pad)
+        else:
+            d0, i0 = [inf] * len(pnts), [None] * len(pnts)
+            candidates = [[] for _ in pnts]
+
+        for k, p in enumerate(pnts):
+            owners = set(self._owners[candidates[k]])
+            owners.update(self._unbounded)
+            if len(owners) == 1:
+                indices[k] = owners.pop()
+                dists[k] = _distance_point_to_adaptor(p, self._adaptors[
+                    indices[k]])
+                if dists[k] is None:
+                    dists[k] = d0[k]
+                continue
+            for i in sorted(owners):
+                d = _distance_point_to_adaptor(p, self._adaptors[i])
+                if d is None:
+                    continue
+                if d < dists[k]:
+                    dists[k] = d
+                    indices[k] = i
+            if indices[k] < 0 and i0[k] is not None:
+                indices[k] = int(self._owners[i0[k]])
+                dists[k] = d0[k]
+
+        return indices, dists
+
+    def nearest(self, pnt):
+        """
+        Find the index of the nearest curve to a point.
+
+        :param point_like pnt: The point.
+
+        :return: The index of the nearest curve or -1 if not found.
+        :rtype: int
+        """
+        return self.query([pnt])[0][0]
+
+    def nearest_curve(self, pnt):
+        """
+        Find the nearest curve to a point.
+
+        :param point_like pnt: The point.
+
+        :return: The nearest curve or *None* if not found.
+        """
+        i = self.nearest(pnt)
+        if i < 0:
+            return None
+        return self._curves[i]
+
+
+def _distance_point_to_adaptor(point, adp_crv):
     """
-    Find the curve nearest to the point.
+    Find the minimum distance between a point and a curve adaptor.
     """
-    ncrvs = len(curves)
-    if ncrvs == 0:
+    # OCC extrema.
+    ext_pc = Extrema_ExtPC(point, adp_crv.object)
+    if not ext_pc.IsDone():
+        return None
+
+    # Find the minimum result.
+    dmin = None
+    for i in range(1, ext_pc.NbExt() + 1):
+        d = ext_pc.SquareDistance(i)
+        if dmin is None or d < dmin:
+            dmin = d
+
+    # Check the ends of bounded curves
+    for u in (adp_crv.u1, adp_crv.u2):
+        if abs(u) >= 1.0e100:
+            continue
+        d = point.SquareDistance(adp_crv.eval(u))
+        if dmin is None or d < dmin:
+            dmin = d
+
+    if dmin is None:
         return None
-    if ncrvs == 1:
-        return curves[0]
-
-    cmin = curves[0]
-    dmin = _distance_point_to_curve(point, cmin)
-    for c in curves[1:]:
-        di = _distance_point_to_curve(point, c)
-        if di < dmin:
-            dmin = di
-            cmin = c
-
-    return cmin
+    return sqrt(dmin)
 
 
 if __name__ == "__main__":
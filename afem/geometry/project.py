@@ -21,14 +21,20 @@ from math import sqrt
 from OCCT.Extrema import (Extrema_ExtPC, Extrema_ExtCC, Extrema_POnCurv,
                           Extrema_ExtPS, Extrema_ExtCS, Extrema_POnSurf)
 from OCCT.GeomProjLib import GeomProjLib
+from OCCT.gp import gp_Pnt, gp_Vec
+from numpy import (abs as np_abs, arange, array, asarray, clip, einsum,
+                   float64, isfinite, linspace, minimum, mod, ndarray, where,
+                   zeros)
+from numpy.linalg import norm
+from scipy.spatial import cKDTree
 
 from afem.adaptor.entities import AdaptorCurve, AdaptorSurface
 from afem.geometry.check import CheckGeom
-from afem.geometry.entities import Curve, Line
+from afem.geometry.entities import Curve, Line, Point, PointArray
 
 __all__ = ["PointProjector", "ProjectPointToCurve",
-           "ProjectPointToSurface", "CurveProjector", "ProjectCurveToPlane",
-           "ProjectCurveToSurface"]
+           "ProjectPointsToCurve", "ProjectPointToSurface", "CurveProjector",
+           "ProjectCurveToPlane", "ProjectCurveToSurface"]
 
 
 class PointProjector(object):
@@ -194,6 +200,214 @@ class ProjectPointToCurve(PointProjector):
             pnt.set_xyz(self.nearest_point)
 
 
+class ProjectPointsToCurve(object):
+    """
+    Project many points to the same curve. A polyline approximation of the
+    curve provides a starting parameter for each point and the parameters of
+    all the points are then refined together by Newton iterations. The
+    Newton updates are computed on arrays, but the curve and its
+    derivatives are still evaluated one point at a time. Points that do not
+    converge to an orthogonal projection are projected individually with
+    :class:`.ProjectPointToCurve`. As with :class:`.ProjectPointToCurve`, a
+    projection is only successful if the point has an orthogonal projection
+    within the curve bounds.
+
+    :param pnts: Points to project.
+    :type pnts: collections.Sequence(point_like) or numpy.ndarray
+    :param crv: Curve to project to.
+    :type crv: afem.adaptor.entities.AdaptorCurve or
+        afem.geometry.entities.Curve or afem.topology.entities.Edge or
+        afem.topology.entities.Wire
+    :param vector_like direction: Direction of projection. If *None* then a
+        normal projection will be performed. If provided, the points and the
+        curve are projected to a plane normal to the direction and the
+        distance is measured in that plane, which gives the same result as
+        the line-curve intersection of :class:`.ProjectPointToCurve`.
+    :param int npts: Number of polyline points used to seed the parameters.
+    :param float tol: Parameter tolerance of the Newton iterations.
+    :param int max_iter: Maximum number of Newton iterations.
+
+    Usage:
+
+    >>> from afem.geometry import LineByVector, ProjectPointsToCurve
+    >>> line = LineByVector((0., 0., 0.), (1., 0., 0.)).line
+    >>> proj = ProjectPointsToCurve([(1., 1., 0.), (2., 0., 3.)], line)
+    >>> proj.parameters
+    array([1., 2.])
+    """
+
+    def __init__(self, pnts, crv, direction=None, npts=100, tol=1.0e-10,
+                 max_iter=20):
+        self._adp = AdaptorCurve.to_adaptor(crv)
+        self._direction = CheckGeom.to_direction(direction)
+        self._d = None
+        if self._direction is not None:
+            self._d = array(self._direction.xyz, dtype=float64)
+
+        xyz = _to_xyz_array(pnts)
+        n = xyz.shape[0]
+        self._pnts = xyz
+        self._params = zeros(n)
+        self._dists = zeros(n)
+        self._xyz = zeros((n, 3))
+        self._success = zeros(n, dtype=bool)
+        if n == 0:
+            return
+
+        adp = self._adp
+        u1, u2 = adp.u1, adp.u2
+        if max(abs(u1), abs(u2)) >= 1.0e100:
+            # Unbounded curves cannot be seeded by a polyline
+            self._project_each(arange(n))
+            return
+
+        # Starting parameters from the nearest polyline segment
+        us = linspace(u1, u2, max(npts, 2))
+        u = self._seed(xyz, us, _eval_curve(adp, us)[0])
+
+        # Newton iterations on the points that have not converged yet
+        periodic = adp.is_periodic
+        active = arange(n)
+        converged = zeros(n, dtype=bool)
+        for _ in range(max_iter):
+            if active.size == 0:
+                break
+            c, d1, d2 = _eval_curve(adp, u[active], 2)
+            r = self._flatten(c - xyz[active])
+            d1 = self._flatten(d1)
+            d2 = self._flatten(d2)
+            f = einsum('ij,ij->i', d1, r)
+            dd1 = einsum('ij,ij->i', d1, d1)
+            # Use a Gauss-Newton step where the second derivative term makes
+            # the Newton step ascend
+            df = einsum('ij,ij->i', d2, r) + dd1
+            df = where(df > 0., df, dd1)
+            ok = df > 0.
+            du = where(ok, -f / where(ok, df, 1.), 0.)
+            unew = u[active] + du
+            if not periodic:
+                unew = clip(unew, u1, u2)
+            step = np_abs(unew - u[active])
+            u[active] = unew
+            done = step <= tol
+            converged[active[done]] = True
+            active = active[~done]
+
+        if periodic:
+            u = u1 + mod(u - u1, u2 - u1)
+
+        # Points and distances. Points stopped at a curve bound without an
+        # orthogonal projection are not successful.
+        c, d1 = _eval_curve(adp, u, 1)[:2]
+        r = self._flatten(c - xyz)
+        d1 = self._flatten(d1)
+        dists = norm(r, axis=1)
+        scale = norm(d1, axis=1) * dists
+        on_crv = dists <= 1.0e-9
+        cosa = np_abs(einsum('ij,ij->i', d1, r)) / where(on_crv, 1., scale)
+        self._params = u
+        self._xyz = c
+        self._dists = dists
+        self._success = converged & isfinite(u) & (on_crv | (cosa <= 1.0e-6))
+
+        # Retry every failure, including points stopped at a curve bound
+        # that may still have an interior projection
+        self._project_each(where(~self._success)[0])
+
+    @property
+    def npts(self):
+        """
+        :return: Number of points.
+        :rtype: int
+        """
+        return self._pnts.shape[0]
+
+    @property
+    def success(self):
+        """
+        :return: Status of each projection.
+        :rtype: numpy.ndarray
+        """
+        return self._success
+
+    @property
+    def parameters(self):
+        """
+        :return: Curve parameter of each projection.
+        :rtype: numpy.ndarray
+        """
+        return self._params
+
+    @property
+    def distances(self):
+        """
+        :return: Projection distance of each point.
+        :rtype: numpy.ndarray
+        """
+        return self._dists
+
+    @property
+    def xyz(self):
+        """
+        :return: Projected points as an array of shape (n, 3).
+        :rtype: numpy.ndarray
+        """
+        return self._xyz
+
+    @property
+    def points(self):
+        """
+        :return: Projected points.
+        :rtype: list(afem.geometry.entities.Point)
+        """
+        return [Point(*p) for p in self._xyz]
+
+    def _flatten(self, v):
+        """
+        Remove the component along the projection direction.
+        """
+        if self._d is None:
+            return v
+        return v - einsum('ij,j->i', v, self._d)[:, None] * self._d
+
+    def _seed(self, xyz, us, pts):
+        """
+        Starting parameters from the nearest polyline segment.
+        """
+        a = self._flatten(pts)
+        p = self._flatten(xyz)
+        _, i = cKDTree(a).query(p)
+        nseg = len(us) - 1
+        best_u = us[i]
+        best_d = norm(p - a[i], axis=1)
+        for j in (minimum(i, nseg - 1), clip(i - 1, 0, nseg - 1)):
+            ab = a[j + 1] - a[j]
+            ap = p - a[j]
+            ll = einsum('ij,ij->i', ab, ab)
+            t = einsum('ij,ij->i', ap, ab) / where(ll > 0., ll, 1.)
+            t = clip(t, 0., 1.)
+            d = norm(ap - t[:, None] * ab, axis=1)
+            better = d < best_d
+            best_d = where(better, d, best_d)
+            best_u = where(better, us[j] + t * (us[j + 1] - us[j]), best_u)
+        return best_u
+
+    def _project_each(self, indices):
+        """
+        Project the points one at a time.
+        """
+        for i in indices:
+            proj = ProjectPointToCurve(self._pnts[i], self._adp,
+                                       self._direction)
+            if not proj.success:
+                self._success[i] = False
+                continue
+            self._params[i] = proj.nearest_param
+            self._xyz[i] = proj.nearest_point.xyz
+            self._dists[i] = proj.dmin
+            self._success[i] = True
+
+
 class ProjectPointToSurface(PointProjector):
     """
     Project a point to a surface.
@@ -321,6 +535,38 @@ class ProjectCurveToSurface(CurveProjector):
         self._crv = Curve(hcrv)
 
 
+def _to_xyz_array(pnts):
+    """
+    Convert points to an array of shape (n, 3).
+    """
+    if isinstance(pnts, (ndarray, PointArray)):
+        return asarray(pnts, dtype=float64).reshape(-1, 3)
+    return array([CheckGeom.to_point(p).xyz for p in pnts],
+                 dtype=float64).reshape(-1, 3)
+
+
+def _eval_curve(adp_crv, us, nderiv=0):
+    """
+    Evaluate the points and derivatives of a curve adaptor. The curve is
+    evaluated at each parameter in turn.
+    """
+    crv = adp_crv.object
+    n = len(us)
+    c, d1, d2 = zeros((n, 3)), zeros((n, 3)), zeros((n, 3))
+    p, v1, v2 = gp_Pnt(), gp_Vec(), gp_Vec()
+    for k, u in enumerate(us):
+        if nderiv == 0:
+            crv.D0(u, p)
+        elif nderiv == 1:
+            crv.D1(u, p, v1)
+        else:
+            crv.D2(u, p, v1, v2)
+        c[k] = p.X(), p.Y(), p.Z()
+        d1[k] = v1.X(), v1.Y(), v1.Z()
+        d2[k] = v2.X(), v2.Y(), v2.Z()
+    return c, d1, d2
+
+
 if __name__ == "__main__":
     import doctest
 
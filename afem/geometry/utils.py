@@ -19,8 +19,11 @@
 from __future__ import division, division
 
 from OCCT.BSplCLib import BSplCLib
-from numpy import array, diff, float64, floor, hstack, sqrt, sum, zeros
+from numpy import (array, asarray, diff, float64, floor, hstack, mean, sqrt,
+                   sum, zeros)
 from numpy.linalg import norm
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import splu
 
 
 def local_to_global_param(a, b, *args):
@@ -243,3 +246,118 @@ def basis_funs(i, u, p, uk):
             saved = left[j - r] * temp
         bf[j] = saved
     return array(bf, dtype=float)
+
+
+def approx_knots(params, n, p):
+    """
+    Compute a knot vector for a least squares approximation.
+
+    :param ndarray params: Parameters of the data points in ascending order.
+    :param int n: Number of control points - 1.
+    :param int p: Degree.
+
+    :return: Knot vector.
+    :rtype: ndarray
+
+    *Reference:* Equations 9.8, 9.68, and 9.69 from "The NURBS Book".
+    """
+    m = len(params) - 1
+    uk = zeros(n + p + 2, dtype=float64)
+    uk[:p + 1] = params[0]
+    uk[n + 1:] = params[-1]
+    if n >= m:
+        # Interpolation so use averaging
+        for j in range(1, n - p + 1):
+            uk[j + p] = mean(params[j:j + p])
+        return uk
+
+    d = (m + 1.) / (n - p + 1.)
+    for j in range(1, n - p + 1):
+        i = int(j * d)
+        alpha = j * d - i
+        uk[j + p] = (1. - alpha) * params[i - 1] + alpha * params[i]
+    return uk
+
+
+def collocation_matrix(params, n, p, uk):
+    """
+    Build the sparse matrix of basis functions evaluated at parameters.
+
+    :param ndarray params: Parameters.
+    :param int n: Number of control points - 1.
+    :param int p: Degree.
+    :param ndarray uk: Knot vector.
+
+    :return: Matrix with one row for each parameter and one column for each
+        control point.
+    :rtype: scipy.sparse.csr_matrix
+    """
+    nrows = len(params)
+    rows = zeros(nrows * (p + 1), dtype=int)
+    cols = zeros(nrows * (p + 1), dtype=int)
+    vals = zeros(nrows * (p + 1), dtype=float64)
+    for k, u in enumerate(params):
+        span = find_span(n, p, u, uk)
+        i1, i2 = k * (p + 1), (k + 1) * (p + 1)
+        rows[i1:i2] = k
+        cols[i1:i2] = range(span - p, span + 1)
+        vals[i1:i2] = basis_funs(span, u, p, uk)
+    return csr_matrix((vals, (rows, cols)), shape=(nrows, n + 1))
+
+
+def lsq_fit(params, qp, n, p):
+    """
+    Fit control points to data by least squares using a sparse system. The
+    data may have any number of trailing dimensions so that many curves with
+    the same parameters are fit at once.
+
+    :param ndarray params: Parameters of the data points.
+    :param ndarray qp: Data with shape (m + 1, ..., dim).
+    :param int n: Number of control points - 1.
+    :param int p: Degree.
+
+    :return: The control points with shape (n + 1, ..., dim), the knot
+        vector, and the maximum distance between the data and the fit.
+    :rtype: tuple(ndarray, ndarray, float)
+    """
+    qp = asarray(qp, dtype=float64)
+    uk = approx_knots(params, n, p)
+    a = collocation_matrix(params, n, p, uk)
+    rhs = qp.reshape(qp.shape[0], -1)
+
+    # Solve the normal equations, which are banded and positive definite
+    ata = a.T.dot(a).tocsc()
+    cp = splu(ata).solve(a.T.dot(rhs))
+
+    resid = (a.dot(cp) - rhs).reshape(qp.shape)
+    err = norm(resid, axis=-1).max() if resid.size else 0.
+    return cp.reshape((n + 1,) + qp.shape[1:]), uk, err
+
+
+def lsq_fit_min(params, qp, p, tol):
+    """
+    Fit control points to data by least squares using the fewest control
+    points that reach the tolerance. The number of control points is found
+    by bisection between a single Bezier segment and interpolation.
+
+    :param ndarray params: Parameters of the data points.
+    :param ndarray qp: Data with shape (m + 1, ..., dim).
+    :param int p: Degree.
+    :param float tol: Maximum allowed distance between the data and the fit.
+
+    :return: The control points, the knot vector, and the maximum distance
+        between the data and the fit.
+    :rtype: tuple(ndarray, ndarray, float)
+    """
+    m = len(params) - 1
+    lo, hi = p, m
+    best = lsq_fit(params, qp, hi, p)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        result = lsq_fit(params, qp, mid, p)
+        if result[2] <= tol:
+            hi = mid
+            best = result
+        else:
+            lo = mid + 1
+    return best
@@ -23,7 +23,7 @@ from OCCT.TColgp import (TColgp_Array1OfPnt, TColgp_Array1OfPnt2d,
                          TColgp_HArray1OfPnt2d)
 from OCCT.TopoDS import TopoDS_ListOfShape
 from OCCT.gp import gp_Pnt, gp_Pnt2d
-from numpy import array as np_array, zeros
+from numpy import array as np_array, asarray, ndarray
 
 from afem.misc.utils import is_array_like
 
@@ -50,6 +50,28 @@ def to_gp_pnt2d(p):
     return None
 
 
+def to_np_xyz(pnts, dim=3):
+    """
+    Get the coordinates of an array-backed collection of points without
+    converting each point.
+
+    :param pnts: The points.
+    :param int dim: Number of coordinates for each point.
+
+    :return: Array of shape (n, dim) if *pnts* is a NumPy array or an array
+        container like :class:`.PointArray`, otherwise *None*.
+    :rtype: numpy.ndarray or None
+    """
+    if isinstance(pnts, (list, tuple, gp_Pnt, gp_Pnt2d)):
+        return None
+    if not isinstance(pnts, ndarray) and not hasattr(pnts, '__array__'):
+        return None
+    xyz = asarray(pnts, dtype=float)
+    if xyz.ndim != 2 or xyz.shape[1] != dim:
+        return None
+    return xyz
+
+
 def to_tcolgp_array1_pnt(pnts):
     """
     Convert the 1-D array of point_like entities to OCC data.
@@ -59,6 +81,11 @@ def to_tcolgp_array1_pnt(pnts):
     :return: OCC array of points.
     :rtype: TColgp_Array1OfPnt
     """
+    xyz = to_np_xyz(pnts, 3)
+    if xyz is not None:
+        tcol_array = TColgp_Array1OfPnt(1, xyz.shape[0])
+        return _fill_pnt_array1(tcol_array, xyz, gp_Pnt)
+
     gp_pnts = []
     for gp in pnts:
         gp = to_gp_pnt(gp)
@@ -83,6 +110,11 @@ def to_tcolgp_array1_pnt2d(pnts):
     :return: OCC array of points.
     :rtype: TColgp_Array1OfPnt2d
     """
+    xyz = to_np_xyz(pnts, 2)
+    if xyz is not None:
+        tcol_array = TColgp_Array1OfPnt2d(1, xyz.shape[0])
+        return _fill_pnt_array1(tcol_array, xyz, gp_Pnt2d)
+
     gp_pnts = []
     for gp in pnts:
         gp = to_gp_pnt2d(gp)
@@ -107,6 +139,11 @@ def to_tcolgp_harray1_pnt(pnts):
     :return: OCC array of points.
     :rtype: TColgp_HArray1OfPnt
     """
+    xyz = to_np_xyz(pnts, 3)
+    if xyz is not None:
+        tcol_array = TColgp_HArray1OfPnt(1, xyz.shape[0])
+        return _fill_pnt_array1(tcol_array, xyz, gp_Pnt)
+
     gp_pnts = []
     for gp in pnts:
         gp = to_gp_pnt(gp)
@@ -131,6 +168,11 @@ def to_tcolgp_harray1_pnt2d(pnts):
     :return: OCC array of points.
     :rtype: TColgp_HArray1OfPnt2d
     """
+    xyz = to_np_xyz(pnts, 2)
+    if xyz is not None:
+        tcol_array = TColgp_HArray1OfPnt2d(1, xyz.shape[0])
+        return _fill_pnt_array1(tcol_array, xyz, gp_Pnt2d)
+
     gp_pnts = []
     for gp in pnts:
         gp = to_gp_pnt2d(gp)
@@ -155,13 +197,8 @@ def to_tcolstd_array1_real(array):
     :return: OCC array of floats.
     :rtype: TColStd_Array1OfReal
     """
-    flts = [float(x) for x in array]
-    n = len(flts)
-    array = TColStd_Array1OfReal(1, n)
-    for i, x in enumerate(flts, 1):
-        array.SetValue(i, x)
-
-    return array
+    flts = _to_np(array, float)
+    return _fill_array1(TColStd_Array1OfReal(1, flts.size), flts)
 
 
 def to_tcolstd_array1_integer(array):
@@ -173,13 +210,8 @@ def to_tcolstd_array1_integer(array):
     :return: OCC array of integers.
     :rtype: TColStd_Array1OfInteger
     """
-    ints = [int(x) for x in array]
-    n = len(ints)
-    array = TColStd_Array1OfInteger(1, n)
-    for i, x in enumerate(ints, 1):
-        array.SetValue(i, x)
-
-    return array
+    ints = _to_np(array, int)
+    return _fill_array1(TColStd_Array1OfInteger(1, ints.size), ints)
 
 
 def to_tcolgp_array2_pnt(pnts):
@@ -191,22 +223,9 @@ def to_tcolgp_array2_pnt(pnts):
     :return: OCC array of points.
     :rtype: TColgp_Array2OfPnt
     """
-    pnts = np_array(pnts, dtype=float)
-    n, m = pnts.shape[0:2]
-    gp_pnts = []
-    for i in range(0, n):
-        row = []
-        for j in range(0, m):
-            gp = to_gp_pnt(pnts[i, j])
-            row.append(gp)
-        gp_pnts.append(row)
-
-    array = TColgp_Array2OfPnt(1, n, 1, m)
-    for i, row in enumerate(gp_pnts, 1):
-        for j, gp in enumerate(row, 1):
-            array.SetValue(i, j, gp)
-
-    return array
+    xyz = np_array(pnts, dtype=float)
+    n, m = xyz.shape[0:2]
+    return _fill_pnt_array2(TColgp_Array2OfPnt(1, n, 1, m), xyz, gp_Pnt)
 
 
 def to_tcolstd_hseq_real(array):
@@ -235,13 +254,7 @@ def to_tcolstd_array2_real(array):
     """
     flts = np_array(array, dtype=float)
     n, m = flts.shape
-    array = TColStd_Array2OfReal(1, n, 1, m)
-    for i in range(1, n + 1):
-        for j in range(1, m + 1):
-            x = float(flts[i - 1, j - 1])
-            array.SetValue(i, j, x)
-
-    return array
+    return _fill_array2(TColStd_Array2OfReal(1, n, 1, m), flts)
 
 
 def to_np_from_tcolstd_array1_real(tcol_array):
@@ -254,12 +267,7 @@ def to_np_from_tcolstd_array1_real(tcol_array):
     :return: NumPy array of floats.
     :rtype: ndarray
     """
-    n = tcol_array.Length()
-    array = zeros(n, dtype=float)
-    for i in range(n):
-        x = tcol_array.Value(i + 1)
-        array[i] = x
-    return array
+    return np_array(_read_array1(tcol_array), dtype=float)
 
 
 def to_np_from_tcolstd_array1_integer(tcol_array):
@@ -272,12 +280,7 @@ def to_np_from_tcolstd_array1_integer(tcol_array):
     :return: NumPy array of integers.
     :rtype: ndarray
     """
-    n = tcol_array.Length()
-    array = zeros(n, dtype=int)
-    for i in range(n):
-        x = tcol_array.Value(i + 1)
-        array[i] = x
-    return array
+    return np_array(_read_array1(tcol_array), dtype=int)
 
 
 def to_np_from_tcolgp_array1_pnt(tcol_array):
@@ -290,12 +293,22 @@ def to_np_from_tcolgp_array1_pnt(tcol_array):
     :return: NumPy array of points.
     :rtype: ndarray
     """
-    n = tcol_array.Length()
-    array = zeros((n, 3), dtype=float)
-    for i in range(n):
-        p = tcol_array.Value(i + 1)
-        array[i, :] = p.X(), p.Y(), p.Z()
-    return array
+    xyz = [(p.X(), p.Y(), p.Z()) for p in _read_array1(tcol_array)]
+    return np_array(xyz, dtype=float).reshape(-1, 3)
+
+
+def to_np_from_tcolgp_array1_pnt2d(tcol_array):
+    """
+    Convert OCC data to NumPy array.
+
+    :param tcol_array: OCC array of 2-D points.
+    :type tcol_array: TColgp_Array1OfPnt2d
+
+    :return: NumPy array of 2-D points.
+    :rtype: ndarray
+    """
+    xy = [(p.X(), p.Y()) for p in _read_array1(tcol_array)]
+    return np_array(xy, dtype=float).reshape(-1, 2)
 
 
 def to_np_from_tcolgp_array2_pnt(tcol_array):
@@ -309,12 +322,8 @@ def to_np_from_tcolgp_array2_pnt(tcol_array):
     :rtype: ndarray
     """
     n, m = tcol_array.ColLength(), tcol_array.RowLength()
-    array = zeros((n, m, 3), dtype=float)
-    for i in range(n):
-        for j in range(m):
-            p = tcol_array.Value(i + 1, j + 1)
-            array[i, j, :] = p.X(), p.Y(), p.Z()
-    return array
+    xyz = [(p.X(), p.Y(), p.Z()) for p in _read_array2(tcol_array)]
+    return np_array(xyz, dtype=float).reshape(n, m, 3)
 
 
 def to_np_from_tcolstd_array2_real(tcol_array):
@@ -328,12 +337,7 @@ def to_np_from_tcolstd_array2_real(tcol_array):
     :rtype: ndarray
     """
     n, m = tcol_array.ColLength(), tcol_array.RowLength()
-    array = zeros((n, m), dtype=float)
-    for i in range(n):
-        for j in range(m):
-            x = tcol_array.Value(i + 1, j + 1)
-            array[i, j] = x
-    return array
+    return np_array(_read_array2(tcol_array), dtype=float).reshape(n, m)
 
 
 def to_topods_list(shapes):
@@ -349,3 +353,77 @@ def to_topods_list(shapes):
     for s in shapes:
         topods_list.Append(s.object)
     return topods_list
+
+
+def _to_np(values, dtype):
+    """
+    Convert values to a NumPy array without converting an existing array
+    element by element.
+    """
+    if not isinstance(values, ndarray):
+        values = list(values)
+    return np_array(values, dtype=dtype)
+
+
+def _fill_array1(tcol_array, values):
+    """
+    Fill a 1-D OCC array from a NumPy array of scalars.
+    """
+    set_value = tcol_array.SetValue
+    for i, x in enumerate(values.tolist(), tcol_array.Lower()):
+        set_value(i, x)
+    return tcol_array
+
+
+def _fill_array2(tcol_array, values):
+    """
+    Fill a 2-D OCC array from a NumPy array of scalars.
+    """
+    set_value = tcol_array.SetValue
+    j0 = tcol_array.LowerCol()
+    for i, row in enumerate(values.tolist(), tcol_array.LowerRow()):
+        for j, x in enumerate(row, j0):
+            set_value(i, j, x)
+    return tcol_array
+
+
+def _fill_pnt_array1(tcol_array, xyz, pnt_type):
+    """
+    Fill a 1-D OCC array of points from a NumPy array of coordinates.
+    """
+    set_value = tcol_array.SetValue
+    for i, p in enumerate(xyz.tolist(), tcol_array.Lower()):
+        set_value(i, pnt_type(*p))
+    return tcol_array
+
+
+def _fill_pnt_array2(tcol_array, xyz, pnt_type):
+    """
+    Fill a 2-D OCC array of points from a NumPy array of coordinates.
+    """
+    set_value = tcol_array.SetValue
+    j0 = tcol_array.LowerCol()
+    for i, row in enumerate(xyz.tolist(), tcol_array.LowerRow()):
+        for j, p in enumerate(row, j0):
+            set_value(i, j, pnt_type(*p))
+    return tcol_array
+
+
+def _read_array1(tcol_array):
+    """
+    Read the values of a 1-D OCC array into a list.
+    """
+    value = tcol_array.Value
+    return [value(i) for i in range(tcol_array.Lower(),
+                                    tcol_array.Upper() + 1)]
+
+
+def _read_array2(tcol_array):
+    """
+    Read the values of a 2-D OCC array into a flat list by row.
+    """
+    value = tcol_array.Value
+    cols = range(tcol_array.LowerCol(), tcol_array.UpperCol() + 1)
+    return [value(i, j) for i in range(tcol_array.LowerRow(),
+                                       tcol_array.UpperRow() + 1)
+            for j in cols]
@@ -19,10 +19,11 @@
 from afem.base.entities import ShapeHolder, NamedItem
 from afem.geometry.create import PlaneByPoints
 from afem.geometry.entities import Surface, TrimmedCurve
+from afem.geometry.intersect import CurveSetIndex
 from afem.geometry.project import ProjectPointToCurve, ProjectPointToSurface
 from afem.topology.bop import IntersectShapes
-from afem.topology.create import FaceBySurface, WiresByConnectedEdges
-from afem.topology.distance import DistancePointToShapes
+from afem.topology.create import (FaceBySurface, SectionShapeByPlanes,
+                                  WiresByConnectedEdges)
 from afem.topology.entities import Shape, Solid, BBox
 from afem.topology.modify import DivideC0Shape, DivideClosedShape
 from afem.topology.transform import mirror_shape
@@ -241,8 +242,7 @@ class Body(NamedItem, ShapeHolder):
         if builder.nwires == 1:
             wire = builder.wires[0]
         else:
-            dist = DistancePointToShapes(p1, builder.wires)
-            wire = dist.nearest_shape
+            wire = CurveSetIndex(builder.wires).nearest_curve(p1)
         crv = wire.curve
 
         proj = ProjectPointToCurve(p1, crv)
@@ -279,6 +279,36 @@ class Body(NamedItem, ShapeHolder):
             bbox.enlarge(tol)
         return bbox
 
+    def sections(self, planes, sref=False, tol=None, parallel=False):
+        """
+        Section the body with many planes in one call. The face bounding boxes
+        are shared by all planes and faces a plane cannot intersect are
+        skipped.
+
+        :param collections.Sequence(afem.geometry.entities.Plane) planes: The
+            planes.
+        :param bool sref: Option to section the reference surface shape
+            rather than the solid.
+        :param float tol: The tolerance used to enlarge the face bounding
+            boxes. If *None* then the maximum tolerance of the shape is used.
+        :param bool parallel: Option to section by all planes in a single
+            Boolean operation that runs in parallel threads.
+
+        :return: The section tool containing the edges, wires, and faces of
+            each plane.
+        :rtype: afem.topology.create.SectionShapeByPlanes
+
+        :raise ValueError: If *sref* is *True* and the body has no reference
+            surface.
+        """
+        if not sref:
+            shape = self._shape
+        elif self._sref_shape is None:
+            raise ValueError('No reference surface is set.')
+        else:
+            shape = self._sref_shape
+        return SectionShapeByPlanes(shape, planes, tol, parallel)
+
     def mirrored(self, pln, name=None):
         """
         Mirror this Body using the plane.
@@ -368,18 +398,25 @@ class Body(NamedItem, ShapeHolder):
         return doc.save_as(fn)
 
     @staticmethod
-    def load_bodies(fn):
+    def load_bodies(fn, names=None, lazy=False):
         """
         Load saved Body instances.
 
         :param str fn: The filename. The extension should be either ".xbf" for
             a binary file or ".xml" for an XML file.
+        :param collections.Sequence(str) names: The names of the bodies to
+            load. If *None* then all bodies are loaded. If provided, the first
+            body with each name is loaded.
+        :param bool lazy: Option to defer loading the shape of each body until
+            it is first accessed. The document stays open until all deferred
+            shapes are loaded or the bodies are destroyed.
 
         :return: A dictionary where the key is the name and the value is the
             Body instance.
         :rtype: dict(str, afem.oml.entities.Body)
 
         :raise TypeError: If the file extension type is not supported.
+        :raise KeyError: If a requested body name is not found.
         """
         from afem.exchange.xde import XdeDocument
 
@@ -390,44 +427,77 @@ class Body(NamedItem, ShapeHolder):
         else:
             raise TypeError('Document type not supported.')
 
-        # Open document
+        # Open document and index the top-level labels by name and type
         doc = XdeDocument(binary)
         doc.open(fn)
+        index = doc.index
+
+        if names is None:
+            body_data = _all_body_labels(index)
+        else:
+            body_data = [_body_label(index, name) for name in names]
 
-        # Get the main label and iterate on top-level children which
-        # should be parts
-        label = doc.shapes_label
-        body_data = []
-        sref_to_body = {}
-        for current in label.children_iter:
-            name = current.name
-            shape = current.shape
-            type_ = current.string
-            color = current.color
-
-            if None in [name, shape, type_]:
-                continue
-
-            # Check for reference geometry
-            if type_ == 'SREF' and shape.is_face:
-                sref_to_body[name] = shape.surface
-                continue
-
-            # Add part data
-            body_data.append((name, shape, color))
-
-        # Create bodies
         label_to_bodies = {}
-        for label, shape, color in body_data:
-            sref = None
-            if label in sref_to_body:
-                sref = sref_to_body[label]
-            body = Body(shape, label)
+        for name, body_label, sref in body_data:
+            # Create body
+            if lazy:
+                body = Body(None, name)
+                body.set_shape_loader(doc.shape_loader(body_label))
+            else:
+                shape = body_label.shape
+                if shape is None:
+                    continue
+                body = Body(shape, name)
             if sref is not None:
                 body.set_sref(sref)
+            color = body_label.color
             if color is not None:
                 r, g, b = color.Red(), color.Green(), color.Blue()
                 body.set_color(r, g, b)
-            label_to_bodies[label] = body
+            label_to_bodies[name] = body
 
         return label_to_bodies
+
+
+def _all_body_labels(index):
+    """
+    Get the name, label, and reference surface of every body label in the
+    index. Reference surfaces are matched to bodies by name.
+    """
+    srefs = {}
+    body_data = []
+    for name, type_, label in index.records:
+        if name is None or type_ is None:
+            continue
+        # Check for reference geometry
+        if type_ == 'SREF':
+            shape = label.shape
+            if shape is not None and shape.is_face:
+                srefs[name] = shape.surface
+            continue
+        body_data.append((name, label))
+    return [(name, label, srefs.get(name)) for name, label in body_data]
+
+
+def _body_label(index, name):
+    """
+    Get the name, label, and reference surface of the first body label with
+    the given name.
+    """
+    body_label, sref = None, None
+    for type_, label in index.by_name(name):
+        if type_ is None:
+            continue
+        # Check for reference geometry
+        if type_ == 'SREF':
+            shape = label.shape
+            if shape is not None and shape.is_face:
+                sref = shape.surface
+            continue
+        if body_label is None:
+            body_label = label
+
+    if body_label is None:
+        msg = 'Body not found in document: {}'.format(name)
+        raise KeyError(msg)
+    return name, body_label, sref
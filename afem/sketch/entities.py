@@ -16,6 +16,13 @@
 # You should have received a copy of the GNU Lesser General Public
 # License along with this library; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+from math import radians
+from numbers import Number
+
+from OCCT.BRepBuilderAPI import BRepBuilderAPI_Transform
+from OCCT.gp import gp_Trsf
+from numpy import array, float64
+
 from afem.geometry import *
 from afem.topology import *
 
@@ -37,7 +44,7 @@ class CrossSection(object):
         self._pln = pln
         self._crvs = []
         self._shape = None
-        self._wire_tool = None
+        self._wires = []
         self._face = None
 
     @property
@@ -56,7 +63,7 @@ class CrossSection(object):
         :return: Number of wires after building.
         :rtype: int
         """
-        return self._wire_tool.nwires
+        return len(self._wires)
 
     @property
     def wires(self):
@@ -64,7 +71,7 @@ class CrossSection(object):
         :return: The wires after building.
         :rtype: list(afem.topology.entities.Wire)
         """
-        return self._wire_tool.wires
+        return self._wires
 
     @property
     def has_face(self):
@@ -242,7 +249,7 @@ class CrossSection(object):
             edges = fuse.edges
 
         # Try and make wire(s)
-        self._wire_tool = WiresByConnectedEdges(edges)
+        self._wires = WiresByConnectedEdges(edges).wires
 
         # Try to make a face if one wire was created
         if self.nwires == 1:
@@ -250,6 +257,72 @@ class CrossSection(object):
 
         return True
 
+    def build_many(self, plns, scales=None, rotations=None):
+        """
+        Build the cross section on many planes. The shape, wires, and face
+        are built once on the global xy-plane and then moved onto each plane
+        by an affine transformation that combines the plane placement with
+        the scale and rotation. This gives the same result as calling
+        :meth:`.build` for each plane but repeats none of the construction.
+        Planes with a left-handed coordinate system are built directly.
+
+        :param collections.Sequence(afem.geometry.entities.Plane) plns: The
+            planes.
+        :param scales: The scale for each plane or a single scale for all.
+            The reference point is the plane origin.
+        :type scales: float or collections.Sequence(float) or None
+        :param rotations: The rotation in degrees for each plane or a single
+            rotation for all. The reference axis is the plane normal.
+        :type rotations: float or collections.Sequence(float) or None
+
+        :return: A built copy of the cross section for each plane.
+        :rtype: list(afem.sketch.entities.CrossSection)
+
+        :raise ValueError: If the number of scales or rotations does not
+            match the number of planes.
+        """
+        plns = list(plns)
+        scales = _per_plane(scales, len(plns))
+        rotations = _per_plane(rotations, len(plns))
+
+        ref_pln = PlaneByAxes(axes='xy').plane
+        ref = self.copy(ref_pln)
+        if not ref.build(ref_pln):
+            return []
+        ref_ax3 = ref_pln.gp_pln.Position()
+
+        # Transform the reference shape, wires, and face together so that the
+        # face and wires still share edges
+        shapes = [ref.shape] + ref.wires
+        if ref.has_face:
+            shapes.append(ref.face)
+        compound = CompoundByShapes(shapes).compound
+
+        sections = []
+        for pln, scale, rotate in zip(plns, scales, rotations):
+            cs = self.copy(pln)
+            sections.append(cs)
+            ax3 = pln.gp_pln.Position()
+            if not ax3.Direct():
+                cs.build(pln, scale, rotate)
+                continue
+
+            trsf = _placement(ref_ax3, pln, scale, rotate)
+            builder = BRepBuilderAPI_Transform(compound.object, trsf, False)
+            if not builder.IsDone():
+                cs.build(pln, scale, rotate)
+                continue
+
+            def _moved(shape):
+                return Shape.wrap(builder.ModifiedShape(shape.object))
+
+            cs._shape = _moved(ref.shape)
+            cs._wires = [_moved(w) for w in ref.wires]
+            if ref.has_face:
+                cs._face = _moved(ref.face)
+
+        return sections
+
 
 class Airfoil(CrossSection):
     """
@@ -325,29 +398,93 @@ class Airfoil(CrossSection):
             the lower surface.
         """
         with open(fn, 'r') as fin:
-            content = fin.read().splitlines()
+            upr, lwr = Airfoil.parse_uiuc(fin.read())
+
+        return self.approx_points(upr, lwr, close)
+
+    def copy(self, pln=None):
+        """
+        Copy the airfoil, its underlying 2-D curves, and its leading and
+        trailing edge points.
+
+        :param afem.geometry.entities.Plane pln: The default plane for the
+            new airfoil. If *None*, then the default plane for this airfoil
+            is used.
+
+        :return: A new airfoil.
+        :rtype: afem.sketch.entities.Airfoil
+        """
+        if pln is None:
+            pln = self._pln
+
+        new_foil = Airfoil(pln)
+        for c in self._crvs:
+            new_foil._crvs.append(c.copy())
+        new_foil._le2d = self._le2d
+        new_foil._upr_te2d = self._upr_te2d
+        new_foil._lwr_te2d = self._lwr_te2d
+
+        return new_foil
+
+    @staticmethod
+    def parse_uiuc(text):
+        """
+        Parse the contents of an airfoil file from the UIUC database. The
+        first three lines are the airfoil name, the number of points, and a
+        blank line. The upper and lower points follow in two blocks that are
+        separated by a blank line.
+
+        :param str text: The file contents.
+
+        :return: The upper and lower points as arrays of shape (n, 2).
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
 
-        upr, lwr = [], []
+        :raise ValueError: If the points cannot be read.
+        """
+        lines = text.splitlines()
+
+        blocks = []
         i = 3
-        while i < len(content):
-            line = content[i].strip().split()
-            i += 1
-            if not line:
-                break
-            x = float(line[0])
-            z = float(line[1])
-            upr.append(Point2D(x, z))
-
-        while i < len(content):
-            line = content[i].strip().split()
-            i += 1
-            if not line:
-                break
-            x = float(line[0])
-            z = float(line[1])
-            lwr.append(Point2D(x, z))
+        for _ in range(2):
+            j = i
+            while j < len(lines) and lines[j].strip():
+                j += 1
+            xz = [line.split()[:2] for line in lines[i:j]]
+            blocks.append(array(xz, dtype=float64).reshape(-1, 2))
+            i = j + 1
+
+        upr, lwr = blocks
+        if upr.shape[0] < 2 or lwr.shape[0] < 2:
+            msg = 'Not enough upper and lower airfoil points.'
+            raise ValueError(msg)
+        return upr, lwr
+
+    @classmethod
+    def by_curve(cls, c, le, upr_te, lwr_te, pln=None, close=True):
+        """
+        Create an airfoil from an existing 2-D curve, for example one that was
+        previously created by :meth:`.approx_points`.
+
+        :param afem.geometry.entities.NurbsCurve2D c: The 2-D curve. It is
+            not copied.
+        :param point2d_like le: The 2-D leading edge point.
+        :param point2d_like upr_te: The 2-D upper trailing edge point.
+        :param point2d_like lwr_te: The 2-D lower trailing edge point.
+        :param afem.geometry.entities.Plane pln: The default construction
+            plane.
+        :param bool close: Option to close the airfoil by adding a segment.
 
-        return self.approx_points(upr, lwr, close)
+        :return: The airfoil.
+        :rtype: afem.sketch.entities.Airfoil
+        """
+        foil = cls(pln)
+        foil._le2d = CheckGeom.to_point2d(le)
+        foil._upr_te2d = CheckGeom.to_point2d(upr_te)
+        foil._lwr_te2d = CheckGeom.to_point2d(lwr_te)
+        foil._crvs.append(c)
+        if close:
+            foil._close(c)
+        return foil
 
     def build_chord(self, pln=None, scale=None, rotate=None):
         """
@@ -391,3 +528,74 @@ class Airfoil(CrossSection):
             c3d.rotate(axis, rotate)
 
         return c3d
+
+    def build_chords(self, plns, scales=None, rotations=None):
+        """
+        Build chord lines on many planes. The chord line is built once on
+        the global xy-plane and then moved onto each plane by an affine
+        transformation. See :meth:`.CrossSection.build_many`.
+
+        :param collections.Sequence(afem.geometry.entities.Plane) plns: The
+            planes.
+        :param scales: The scale for each plane or a single scale for all.
+        :type scales: float or collections.Sequence(float) or None
+        :param rotations: The rotation in degrees for each plane or a single
+            rotation for all.
+        :type rotations: float or collections.Sequence(float) or None
+
+        :return: The 3-D chord lines.
+        :rtype: list(afem.geometry.entities.NurbsCurve)
+
+        :raise ValueError: If the number of scales or rotations does not
+            match the number of planes.
+        """
+        plns = list(plns)
+        scales = _per_plane(scales, len(plns))
+        rotations = _per_plane(rotations, len(plns))
+
+        ref_pln = PlaneByAxes(axes='xy').plane
+        ref_chord = self.build_chord(ref_pln)
+        ref_ax3 = ref_pln.gp_pln.Position()
+
+        chords = []
+        for pln, scale, rotate in zip(plns, scales, rotations):
+            if not pln.gp_pln.Position().Direct():
+                chords.append(self.build_chord(pln, scale, rotate))
+                continue
+            c3d = ref_chord.copy()
+            c3d.object.Transform(_placement(ref_ax3, pln, scale, rotate))
+            chords.append(c3d)
+        return chords
+
+
+def _per_plane(values, n):
+    """
+    Expand a single value or a sequence of values to one value per plane.
+    """
+    if values is None or isinstance(values, Number):
+        return [values] * n
+    values = list(values)
+    if len(values) != n:
+        msg = 'Number of values does not match the number of planes.'
+        raise ValueError(msg)
+    return values
+
+
+def _placement(ref_ax3, pln, scale=None, rotate=None):
+    """
+    Transformation from the reference coordinate system onto a plane
+    followed by the scale about the plane origin and the rotation about the
+    plane normal.
+    """
+    disp = gp_Trsf()
+    disp.SetDisplacement(ref_ax3, pln.gp_pln.Position())
+
+    trsf = gp_Trsf()
+    if rotate is not None:
+        trsf.SetRotation(pln.axis, radians(rotate))
+    if scale is not None:
+        scl = gp_Trsf()
+        scl.SetScale(pln.origin, scale)
+        trsf.Multiply(scl)
+    trsf.Multiply(disp)
+    return trsf
@@ -0,0 +1,342 @@
+# This file is part of AFEM which provides an engineering toolkit for airframe
+# finite element modeling during conceptual design.
+#
+# Copyright (C) 2016-2018  Laughlin Research, LLC (info@laughlinresearch.com)
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+import json
+import os
+import tarfile
+import zipfile
+from collections import OrderedDict
+from hashlib import md5
+
+from OCCT.Approx import Approx_ChordLength
+
+from afem.config import logger
+from afem.geometry.create import NurbsCurve2DByApprox
+from afem.geometry.entities import Geometry, NurbsCurve2D
+from afem.sketch.entities import Airfoil
+
+__all__ = ["AirfoilLibrary"]
+
+
+class AirfoilLibrary(object):
+    """
+    Airfoil library loaded in bulk from UIUC airfoil files. The points of
+    each airfoil are stored as arrays. The 2-D curve of an airfoil is only
+    fit when it is first needed. Fitted curves are cached in memory and, if a
+    cache directory is given, on disk so that later runs can skip the fit.
+    Cache entries are keyed by the file content and the fit parameters.
+
+    :param str cache: The cache directory for fitted curves. It is created if
+        it does not exist. If *None* then curves are only cached in memory.
+    :param int dmin: Minimum degree of the fit.
+    :param int dmax: Maximum degree of the fit.
+    :param OCCT.GeomAbs.GeomAbs_Shape continuity: Desired continuity of the
+        fit.
+    :param OCCT.Approx.Approx_ParametrizationType parm_type: Parametrization
+        type of the fit.
+    :param float tol: Tolerance of the fit.
+
+    Usage:
+
+    >>> from afem.sketch import AirfoilLibrary
+    >>> lib = AirfoilLibrary('./airfoil_cache')
+    >>> names = lib.load('./uiuc_airfoils.zip')
+    >>> foil = lib.airfoil('naca0012')
+    """
+
+    _version = 1
+
+    def __init__(self, cache=None, dmin=3, dmax=8, continuity=Geometry.C2,
+                 parm_type=Approx_ChordLength, tol=1.0e-6):
+        self._airfoils = OrderedDict()
+        self._curves = {}
+        self._cache = cache
+        if cache is not None and not os.path.isdir(cache):
+            os.makedirs(cache)
+
+        self._fit_args = (int(dmin), int(dmax), continuity, parm_type,
+                          float(tol))
+        options = [self._version, int(dmin), int(dmax), str(continuity),
+                   str(parm_type), float(tol)]
+        self._options = json.dumps(options)
+
+    def __contains__(self, name):
+        return name in self._airfoils
+
+    def __len__(self):
+        return len(self._airfoils)
+
+    @property
+    def names(self):
+        """
+        :return: The airfoil names in the order they were loaded.
+        :rtype: list(str)
+        """
+        return list(self._airfoils.keys())
+
+    @property
+    def cache(self):
+        """
+        :return: The cache directory.
+        :rtype: str or None
+        """
+        return self._cache
+
+    def load(self, source, ext='.dat'):
+        """
+        Load the airfoil files from a directory, a zip or tar archive, or a
+        single file. The airfoil name is the file name without the extension.
+        Files that cannot be read are skipped with a warning.
+
+        :param str source: The directory, archive, or file.
+        :param str ext: The extension of the airfoil files.
+
+        :return: The names of the loaded airfoils.
+        :rtype: list(str)
+
+        :raise ValueError: If the source is not a directory, an archive, or a
+            file.
+        """
+        ext = ext.lower()
+        names = []
+        for fn, content in self._iter_files(source, ext):
+            name = os.path.splitext(os.path.basename(fn))[0]
+            if self.add(name, content):
+                names.append(name)
+        return names
+
+    def add(self, name, content):
+        """
+        Add an airfoil from the contents of a UIUC airfoil file.
+
+        :param str name: The airfoil name. An existing airfoil with the same
+            name is replaced.
+        :param content: The file contents.
+        :type content: str or bytes
+
+        :return: *True* if added, *False* if the contents could not be read.
+        :rtype: bool
+        """
+        if isinstance(content, bytes):
+            data = content
+            content = content.decode('utf-8', 'replace')
+        else:
+            data = content.encode('utf-8')
+
+        try:
+            upr, lwr = Airfoil.parse_uiuc(content)
+        except (ValueError, IndexError):
+            logger.warning('Could not read airfoil: {}'.format(name))
+            return False
+
+        self._airfoils[name] = (upr, lwr, md5(data).hexdigest())
+        return True
+
+    def points(self, name):
+        """
+        Get the points of an airfoil.
+
+        :param str name: The airfoil name.
+
+        :return: The upper and lower points as arrays of shape (n, 2). Both
+            start at the leading edge.
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+
+        :raise KeyError: If the airfoil is not in the library.
+        """
+        upr, lwr, _ = self._airfoils[name]
+        return upr, lwr
+
+    def curve(self, name):
+        """
+        Get a copy of the fitted 2-D curve of an airfoil.
+
+        :param str name: The airfoil name.
+
+        :return: The 2-D curve.
+        :rtype: afem.geometry.entities.NurbsCurve2D
+
+        :raise KeyError: If the airfoil is not in the library.
+        """
+        return self._fitted(name)[0].copy()
+
+    def airfoil(self, name, pln=None, close=True):
+        """
+        Create an airfoil using the fitted 2-D curve.
+
+        :param str name: The airfoil name.
+        :param afem.geometry.entities.Plane pln: The default construction
+            plane of the airfoil.
+        :param bool close: Option to close the airfoil by adding a segment.
+
+        :return: The airfoil.
+        :rtype: afem.sketch.entities.Airfoil
+
+        :raise KeyError: If the airfoil is not in the library.
+        """
+        c, le, upr_te, lwr_te = self._fitted(name)
+        return Airfoil.by_curve(c.copy(), le, upr_te, lwr_te, pln, close)
+
+    def airfoils(self, names=None, pln=None, close=True):
+        """
+        Create many airfoils.
+
+        :param collections.Sequence(str) names: The airfoil names. If *None*
+            then all airfoils are created.
+        :param afem.geometry.entities.Plane pln: The default construction
+            plane of the airfoils.
+        :param bool close: Option to close the airfoils by adding a segment.
+
+        :return: The airfoils by name.
+        :rtype: collections.OrderedDict
+
+        :raise KeyError: If an airfoil is not in the library.
+        """
+        if names is None:
+            names = self.names
+        return OrderedDict([(name, self.airfoil(name, pln, close))
+                            for name in names])
+
+    def build(self, name, plns, scales=None, rotations=None, close=True):
+        """
+        Build an airfoil on many planes. The 2-D curve is only fit once and
+        the airfoil is only built once. See
+        :meth:`.CrossSection.build_many`.
+
+        :param str name: The airfoil name.
+        :param collections.Sequence(afem.geometry.entities.Plane) plns: The
+            planes.
+        :param scales: The scale for each plane or a single scale for all.
+        :type scales: float or collections.Sequence(float) or None
+        :param rotations: The rotation in degrees for each plane or a single
+            rotation for all.
+        :type rotations: float or collections.Sequence(float) or None
+        :param bool close: Option to close the airfoils by adding a segment.
+
+        :return: The built airfoils, one for each plane.
+        :rtype: list(afem.sketch.entities.Airfoil)
+
+        :raise KeyError: If the airfoil is not in the library.
+        :raise ValueError: If the number of scales or rotations does not
+            match the number of planes.
+        """
+        foil = self.airfoil(name, close=close)
+        return foil.build_many(plns, scales, rotations)
+
+    def clear_cache(self):
+        """
+        Remove all fitted curves from memory and from the cache directory.
+
+        :return: None.
+        """
+        self._curves.clear()
+        if self._cache is None:
+            return None
+        for fn in os.listdir(self._cache):
+            if fn.endswith('.json'):
+                os.remove(os.path.join(self._cache, fn))
+
+    def _key(self, name):
+        """
+        Key of the fitted curve of an airfoil.
+        """
+        digest = self._airfoils[name][2]
+        txt = digest + self._options
+        return md5(txt.encode('utf-8')).hexdigest()
+
+    def _fitted(self, name):
+        """
+        Get the fitted curve and the leading and trailing edge points.
+        """
+        key = self._key(name)
+        if key in self._curves:
+            return self._curves[key]
+
+        data = self._read_cache(key)
+        if data is None:
+            upr, lwr = self.points(name)
+            pnts = list(upr[::-1]) + list(lwr[1:])
+            c = NurbsCurve2DByApprox(pnts, *self._fit_args).curve
+            data = (c, upr[0], upr[-1], lwr[-1])
+            self._write_cache(key, data)
+        self._curves[key] = data
+        return data
+
+    def _read_cache(self, key):
+        """
+        Read a fitted curve from the cache directory.
+        """
+        if self._cache is None:
+            return None
+        fn = os.path.join(self._cache, key + '.json')
+        if not os.path.isfile(fn):
+            return None
+        with open(fn, 'r') as fin:
+            entry = json.load(fin)
+        c = NurbsCurve2D.by_data(entry['cp'], entry['knots'], entry['mult'],
+                                 entry['p'], entry['w'], entry['periodic'])
+        return c, entry['le'], entry['upr_te'], entry['lwr_te']
+
+    def _write_cache(self, key, data):
+        """
+        Write a fitted curve to the cache directory.
+        """
+        if self._cache is None:
+            return None
+        c, le, upr_te, lwr_te = data
+        entry = {'p': c.p,
+                 'cp': c.cp.tolist(),
+                 'w': c.w.tolist(),
+                 'knots': c.knots.tolist(),
+                 'mult': c.mult.tolist(),
+                 'periodic': bool(c.is_periodic),
+                 'le': list(le),
+                 'upr_te': list(upr_te),
+                 'lwr_te': list(lwr_te)}
+        fn = os.path.join(self._cache, key + '.json')
+        with open(fn, 'w') as fout:
+            json.dump(entry, fout)
+
+    @staticmethod
+    def _iter_files(source, ext):
+        """
+        Iterate over the file names and contents of a source.
+        """
+        if os.path.isdir(source):
+            for fn in sorted(os.listdir(source)):
+                path = os.path.join(source, fn)
+                if fn.lower().endswith(ext) and os.path.isfile(path):
+                    with open(path, 'rb') as fin:
+                        yield fn, fin.read()
+        elif zipfile.is_zipfile(source):
+            with zipfile.ZipFile(source) as zf:
+                for fn in sorted(zf.namelist()):
+                    if fn.lower().endswith(ext):
+                        yield fn, zf.read(fn)
+        elif os.path.isfile(source) and tarfile.is_tarfile(source):
+            with tarfile.open(source) as tf:
+                members = [m for m in tf.getmembers() if m.isfile()]
+                for m in sorted(members, key=lambda m: m.name):
+                    if m.name.lower().endswith(ext):
+                        yield m.name, tf.extractfile(m).read()
+        elif os.path.isfile(source):
+            with open(source, 'rb') as fin:
+                yield source, fin.read()
+        else:
+            msg = 'Airfoil source not found: {}'.format(source)
+            raise ValueError(msg)
@@ -18,4 +18,5 @@
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
 from afem.smesh.hypotheses import *
 from afem.smesh.meshes import *
+from afem.smesh.quality import *
 from afem.smesh.utils import *
@@ -21,6 +21,7 @@ from __future__ import division
 from numpy import array, cross, linalg
 
 from afem.geometry.entities import Point
+from afem.smesh.quality import quality_metrics
 from afem.topology.entities import Shape
 
 __all__ = ["Node", "Element", "FaceSide"]
@@ -295,7 +296,7 @@ class Element(object):
         :return: The minimum element angle in degrees.
         :rtype: float
         """
-        raise NotImplementedError()
+        return self._quality('min_angle')
 
     @property
     def max_angle(self):
@@ -303,7 +304,7 @@ class Element(object):
         :return: The maximum element angle in degrees.
         :rtype: float
         """
-        raise NotImplementedError()
+        return self._quality('max_angle')
 
     @property
     def aspect_ratio(self):
@@ -311,7 +312,7 @@ class Element(object):
         :return: The element aspect ratio.
         :rtype: float
         """
-        raise NotImplementedError()
+        return self._quality('aspect_ratio')
 
     @property
     def warp_angle(self):
@@ -319,7 +320,7 @@ class Element(object):
         :return: The element warping in degrees.
         :rtype: float
         """
-        raise NotImplementedError()
+        return self._quality('warp_angle')
 
     @property
     def taper_ratio(self):
@@ -327,23 +328,36 @@ class Element(object):
         :return: The element taper ratio.
         :rtype: float
         """
-        raise NotImplementedError()
+        return self._quality('taper_ratio')
 
     @property
     def skew_angle(self):
         """
-        :return: The element skew angle.
+        :return: The element skew angle in degrees.
         :rtype: float
         """
-        raise NotImplementedError()
+        return self._quality('skew_angle')
 
     @property
     def jacobian(self):
         """
-        :return: The element Jacobian.
+        :return: The element Jacobian ratio.
         :rtype: float
         """
-        raise NotImplementedError()
+        return self._quality('jacobian')
+
+    def _quality(self, name):
+        """
+        Evaluate a quality metric of a triangle or quadrangle. Returns zero
+        for other element types.
+        """
+        num_nodes = self.num_corner_nodes
+        if num_nodes not in [3, 4]:
+            return 0.
+        pnts = [self.get_node(i).xyz for i in range(num_nodes)]
+        if num_nodes == 3:
+            pnts.append(pnts[0])
+        return float(quality_metrics([pnts], [num_nodes == 4])[name][0])
 
     def is_medium_node(self, node):
         """
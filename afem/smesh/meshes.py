@@ -16,12 +16,29 @@
 # You should have received a copy of the GNU Lesser General Public
 # License along with this library; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
-from OCCT.SMESH import SMESH_Gen, SMESH_subMesh
-
+from __future__ import division
+
+import os
+import shutil
+import tempfile
+from hashlib import md5
+from math import log10
+from multiprocessing import Pool
+
+from OCCT.BRep import BRep_Builder
+from OCCT.BRepTools import BRepTools
+from OCCT.SMESH import SMESH_Gen, SMESH_MesherHelper, SMESH_subMesh
+from OCCT.TopoDS import TopoDS_Shape
+from numpy import (abs as np_abs, array, concatenate, isin, ones, unique,
+                   zeros)
+from scipy.spatial import cKDTree
+
+from afem.config import logger
 from afem.smesh.entities import Node, Element
-from afem.topology.entities import Shape
+from afem.topology.entities import BBox, Shape
+from afem.topology.props import SurfaceProps
 
-__all__ = ["MeshGen", "Mesh", "MeshDS", "SubMesh", "SubMeshDS"]
+__all__ = ["MeshGen", "MeshCache", "Mesh", "MeshDS", "SubMesh", "SubMeshDS"]
 
 
 class MeshGen(object):
@@ -110,6 +127,328 @@ class MeshGen(object):
                 raise ValueError('No shape could be found.')
         return self._gen.Compute(mesh.object, shape.object)
 
+    def compute_parallel(self, mesh, recipe, shape=None, nprocs=None):
+        """
+        Compute a mesh on a shape by meshing all of its edges once in this
+        process and then meshing each face independently in a pool of worker
+        processes. Each worker is given the global discretization of the
+        edges and vertices of its face, so the face meshes are merged back
+        into the mesh sharing the nodes along common edges.
+
+        :param afem.smesh.meshes.Mesh mesh: A mesh.
+        :param recipe: A function ``recipe(gen, mesh, shape)`` that creates
+            and adds the algorithms and hypotheses to a mesh. It is applied to
+            the shape in this process and to each face in the workers, so it
+            must be a module-level function that can be pickled.
+        :type recipe: collections.Callable
+        :param afem.topology.entities.Shape shape: The shape to compute mesh
+            on. If not provided then the shape associated to the mesh is used.
+        :param int nprocs: Number of worker processes. If *None* then the
+            number of CPUs is used. If 1 then the faces are meshed in this
+            process.
+
+        :return: *True* if all faces were computed, *False* if not.
+        :rtype: bool
+
+        :raise ValueError: If no shape is available to compute the mesh on.
+        :raise RuntimeError: If a face mesh has boundary nodes that are not
+            part of the global edge discretization.
+        """
+        if shape is None:
+            if mesh.has_shape:
+                shape = mesh.shape
+            else:
+                raise ValueError('No shape could be found.')
+
+        recipe(self, mesh, shape)
+
+        # Compute the 1-D mesh of all edges only once
+        for edge in shape.edges:
+            self._gen.Compute(mesh.object, edge.object)
+
+        # Write each face so it can be read by a worker process along with
+        # the mesh of its edges and vertices
+        faces = shape.faces
+        helper = SMESH_MesherHelper(mesh.object)
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            args = []
+            for i, face in enumerate(faces):
+                fn = os.path.join(tmp_dir, 'face{}.brep'.format(i))
+                BRepTools.Write_(face.object, fn)
+                bnd_mesh = _boundary_mesh_arrays(mesh, helper, face)
+                args.append((fn, recipe, bnd_mesh))
+            if nprocs == 1:
+                results = [_compute_face(arg) for arg in args]
+            else:
+                pool = Pool(nprocs)
+                try:
+                    results = pool.map(_compute_face, args)
+                finally:
+                    pool.close()
+                    pool.join()
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        # Merge face meshes using the nodes of the edge discretization
+        is_done = True
+        for i, (face, result) in enumerate(zip(faces, results)):
+            status, fnids, fxyz, fuv, gids, conn = result
+            if not status:
+                logger.warning('Failed to compute mesh on face {}.'.format(i))
+                is_done = False
+                continue
+            if gids is None or not _merge_face_mesh(mesh, face, fnids, fxyz,
+                                                    fuv, gids, conn):
+                msg = ('Face boundary nodes do not match the global edge '
+                       'discretization.')
+                raise RuntimeError(msg)
+
+        return is_done
+
+    def compute_incremental(self, mesh, cache, shape=None):
+        """
+        Compute a mesh on a shape reusing the face meshes stored in the cache
+        from a previous computation. Faces whose content is found in the cache
+        are filled with the cached mesh and only the remaining faces are
+        computed. If the cache is not empty, faces of the mesh that were
+        already computed but do not match the cache are considered modified
+        and are cleared along with their edges before computing. The cache is
+        updated with the face meshes after computing. Faces that were already
+        computed and unchanged are kept and are not counted in the cache
+        statistics.
+
+        :param afem.smesh.meshes.Mesh mesh: A mesh.
+        :param afem.smesh.meshes.MeshCache cache: The face mesh cache.
+        :param afem.topology.entities.Shape shape: The shape to compute mesh
+            on. If not provided then the shape associated to the mesh is used.
+
+        :return: *True* if computed, *False* if not.
+        :rtype: bool
+
+        :raise ValueError: If no shape is available to compute the mesh on.
+        """
+        if shape is None:
+            if mesh.has_shape:
+                shape = mesh.shape
+            else:
+                raise ValueError('No shape could be found.')
+
+        if cache.size is None:
+            bbox = BBox()
+            bbox.add_shape(shape)
+            corners = concatenate([bbox.pmin.xyz, bbox.pmax.xyz])
+            cache.set_size(max(bbox.diagonal, np_abs(corners).max()))
+
+        cache.reset_stats()
+        faces = shape.faces
+        keys = [cache.face_key(face) for face in faces]
+
+        # Invalidate modified faces and their edges
+        for face, key in zip(faces, keys):
+            if len(cache) == 0 or key in cache:
+                continue
+            if mesh.get_submesh(face).is_computed:
+                mesh.clear_submesh(face)
+                for edge in face.edges:
+                    mesh.clear_submesh(edge)
+
+        # Compute the 1-D mesh so reused faces can be stitched to it
+        for edge in shape.edges:
+            self._gen.Compute(mesh.object, edge.object)
+        nids, xyz = mesh.ds.node_arrays()
+        tree = cKDTree(xyz) if nids.size > 0 else None
+
+        # Fill unchanged faces from the cache
+        reused = set()
+        kept = set()
+        for i, (face, key) in enumerate(zip(faces, keys)):
+            sub_mesh = mesh.get_submesh(face)
+            if sub_mesh.is_computed:
+                kept.add(i)
+                continue
+            data = cache.get(key)
+            if data is None:
+                continue
+            fnids, fxyz, fuv, is_bnd, conn = data
+            gids = _match_nodes(tree, nids, fxyz, is_bnd, cache.tol)
+            if gids is None:
+                continue
+            if _merge_face_mesh(mesh, face, fnids, fxyz, fuv, gids, conn):
+                reused.add(i)
+
+        status = self.compute(mesh, shape)
+
+        # Update cache and statistics. Faces that failed to mesh are skipped.
+        for i, (face, key) in enumerate(zip(faces, keys)):
+            if not mesh.get_submesh(face).is_computed:
+                continue
+            data = _face_mesh_arrays(mesh, face)
+            if data[4].shape[0] == 0:
+                continue
+            is_reused = None if i in kept else i in reused
+            cache.add(key, data, is_reused)
+
+        return status
+
+
+class MeshCache(object):
+    """
+    Cache of face meshes keyed by the content of each face. It is used with
+    :meth:`.MeshGen.compute_incremental` to reuse the meshes of unchanged
+    faces when a modified model is meshed again.
+
+    :param float tol: Tolerance used to compare face content and to match the
+        boundary nodes of a cached face mesh to the edge discretization.
+    :param float size: The size of the model. Face content is compared
+        relative to this size. If *None* then it is set from the first
+        shape meshed with the cache.
+    """
+
+    def __init__(self, tol=1.0e-7, size=None):
+        self._tol = tol
+        self._digits = max(0, int(-log10(tol)))
+        self._size = size
+        self._data = {}
+        self._stats = {}
+        self.reset_stats()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    @property
+    def tol(self):
+        """
+        :return: The tolerance.
+        :rtype: float
+        """
+        return self._tol
+
+    @property
+    def size(self):
+        """
+        :return: The size of the model.
+        :rtype: float or None
+        """
+        return self._size
+
+    @property
+    def stats(self):
+        """
+        :return: Statistics of the last computation. The keys are
+            'reused faces', 'computed faces', 'reused elements', and
+            'computed elements'.
+        :rtype: dict
+        """
+        return dict(self._stats)
+
+    @property
+    def reuse_ratio(self):
+        """
+        :return: The fraction of elements that were reused in the last
+            computation.
+        :rtype: float
+        """
+        nreused = self._stats['reused elements']
+        ntotal = nreused + self._stats['computed elements']
+        if ntotal == 0:
+            return 0.
+        return nreused / ntotal
+
+    def face_key(self, face):
+        """
+        Generate a key from the content of a face. The key is built from the
+        surface properties of the face and the location of its vertices so
+        that it is independent of the shape identity. The values are scaled
+        by the model size before they are rounded so the key is stable for
+        models of any size and location.
+
+        :param afem.topology.entities.Face face: The face.
+
+        :return: The key.
+        :rtype: str
+        """
+        props = SurfaceProps(face)
+        size = self._size if self._size else 1.
+        values = [props.area / size ** 2]
+        values += list(props.cg.xyz / size)
+        values += list(props.matrix_of_inertia.ravel() / size ** 4)
+        for v in face.vertices:
+            values += list(v.point.xyz / size)
+        d = self._digits
+        data = ','.join(['{0:.{1}f}'.format(x, d) for x in values])
+        return md5(data.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        Get the cached face mesh data.
+
+        :param str key: The face key.
+
+        :return: The node ID's, node locations, node parameters, boundary
+            node flags, and element connectivity. Returns *None* if not
+            found.
+        :rtype: tuple(numpy.ndarray) or None
+        """
+        return self._data.get(key, None)
+
+    def set_size(self, size):
+        """
+        Set the size of the model. This changes the keys of all faces so the
+        cache is cleared.
+
+        :param float size: The size.
+
+        :return: None.
+        """
+        self._size = size
+        self.clear()
+
+    def add(self, key, data, is_reused=False):
+        """
+        Add face mesh data to the cache and update the statistics.
+
+        :param str key: The face key.
+        :param tuple(numpy.ndarray) data: The node ID's, node locations,
+            node parameters, boundary node flags, and element connectivity.
+        :param is_reused: Option to count the face as reused rather than
+            computed. If *None* then the statistics are not updated.
+        :type is_reused: bool or None
+
+        :return: None.
+        """
+        self._data[key] = data
+        if is_reused is None:
+            return
+        nelms = data[4].shape[0]
+        if is_reused:
+            self._stats['reused faces'] += 1
+            self._stats['reused elements'] += nelms
+        else:
+            self._stats['computed faces'] += 1
+            self._stats['computed elements'] += nelms
+
+    def reset_stats(self):
+        """
+        Reset the statistics.
+
+        :return: None.
+        """
+        self._stats = {'reused faces': 0, 'computed faces': 0,
+                       'reused elements': 0, 'computed elements': 0}
+
+    def clear(self):
+        """
+        Clear the cache and statistics.
+
+        :return: None.
+        """
+        self._data.clear()
+        self.reset_stats()
+
 
 class Mesh(object):
     """
@@ -493,6 +832,26 @@ class MeshDS(object):
         while iter_.more():
             yield Element(iter_.next())
 
+    def node_arrays(self):
+        """
+        Get the node ID's and locations of the mesh as arrays.
+
+        :return: Array of node ID's and (n, 3) array of node locations.
+        :rtype: tuple(numpy.ndarray)
+        """
+        return _node_arrays(self._ds.nodesIterator(True))
+
+    def face_arrays(self):
+        """
+        Get the ID's and connectivity of the 2-D elements of the mesh as
+        arrays. The connectivity contains the corner nodes of each element
+        and is padded with zeros for triangles.
+
+        :return: Array of element ID's and (m, 4) array of node ID's.
+        :rtype: tuple(numpy.ndarray)
+        """
+        return _face_arrays(self._ds.facesIterator(True))
+
     def move_node(self, node, x, y, z):
         """
         Move node to given location.
@@ -753,6 +1112,26 @@ class SubMeshDS(object):
         while iter_.more():
             yield Element(iter_.next())
 
+    def node_arrays(self):
+        """
+        Get the node ID's and locations of the sub-mesh as arrays.
+
+        :return: Array of node ID's and (n, 3) array of node locations.
+        :rtype: tuple(numpy.ndarray)
+        """
+        return _node_arrays(self._ds.GetNodes())
+
+    def face_arrays(self):
+        """
+        Get the ID's and connectivity of the 2-D elements of the sub-mesh as
+        arrays. The connectivity contains the corner nodes of each element
+        and is padded with zeros for triangles.
+
+        :return: Array of element ID's and (m, 4) array of node ID's.
+        :rtype: tuple(numpy.ndarray)
+        """
+        return _face_arrays(self._ds.GetElements())
+
     @classmethod
     def wrap(cls, sub_meshds):
         """
@@ -809,3 +1188,227 @@ class SubMeshDS(object):
         :return: None.
         """
         self._ds.Clear()
+
+
+def _node_arrays(iter_):
+    """
+    Gather node ID's and locations from an SMDS node iterator.
+    """
+    nids, xyz = [], []
+    while iter_.more():
+        n = iter_.next()
+        nids.append(n.GetID())
+        xyz.append((n.X(), n.Y(), n.Z()))
+    return array(nids, dtype=int), array(xyz, dtype=float).reshape(-1, 3)
+
+
+def _face_arrays(iter_):
+    """
+    Gather element ID's and corner node connectivity of 2-D elements from an
+    SMDS element iterator.
+    """
+    eids, conn = [], []
+    while iter_.more():
+        e = iter_.next()
+        n = e.NbCornerNodes()
+        if n not in (3, 4):
+            continue
+        row = [e.GetNode(i).GetID() for i in range(n)]
+        if n == 3:
+            row.append(0)
+        eids.append(e.GetID())
+        conn.append(row)
+    return array(eids, dtype=int), array(conn, dtype=int).reshape(-1, 4)
+
+
+def _elm_arrays(iter_, width):
+    """
+    Gather element ID's and the full node connectivity, including the medium
+    nodes of quadratic elements, from an SMDS element iterator. Rows are
+    padded with zeros to the given width.
+    """
+    eids, conn = [], []
+    while iter_.more():
+        e = iter_.next()
+        row = [e.GetNode(i).GetID() for i in range(e.NbNodes())]
+        row += [0] * (width - len(row))
+        eids.append(e.GetID())
+        conn.append(row)
+    return (array(eids, dtype=int),
+            array(conn, dtype=int).reshape(-1, width))
+
+
+def _sub_mesh_arrays(mesh, sub_shape, width):
+    """
+    Gather the node ID's, node locations, element ID's, and full element
+    connectivity of the sub-mesh of a sub-shape. The arrays are empty if the
+    sub-shape has no mesh.
+    """
+    sub_ds = mesh.get_submesh(sub_shape).ds.object
+    if sub_ds is None:
+        return (zeros(0, dtype=int), zeros((0, 3)), zeros(0, dtype=int),
+                zeros((0, width), dtype=int))
+    nids, xyz = _node_arrays(sub_ds.GetNodes())
+    eids, conn = _elm_arrays(sub_ds.GetElements(), width)
+    return nids, xyz, eids, conn
+
+
+def _boundary_mesh_arrays(mesh, helper, face):
+    """
+    Gather the mesh of the vertices and edges of a face. For each vertex the
+    node ID's and locations are given, and for each edge the node ID's,
+    locations, edge parameters, and element connectivity.
+    """
+    ds = mesh.ds.object
+    verts = []
+    for v in face.vertices:
+        nids, xyz = _sub_mesh_arrays(mesh, v, 1)[0:2]
+        verts.append((nids, xyz))
+    edges = []
+    for e in face.edges:
+        nids, xyz, _, conn = _sub_mesh_arrays(mesh, e, 3)
+        us = array([helper.GetNodeU(e.object, ds.FindNode(int(nid)))
+                    for nid in nids], dtype=float)
+        edges.append((nids, xyz, us, conn))
+    return verts, edges
+
+
+def _add_boundary_mesh(mesh, face, bnd_mesh):
+    """
+    Add the mesh of the vertices and edges of a face gathered by
+    _boundary_mesh_arrays and mark their sub-meshes as computed. Returns a
+    dictionary mapping the new node ID's to the original node ID's.
+    """
+    ds = mesh.ds.object
+    verts, edges = bnd_mesh
+    node_map = {}
+    id_map = {}
+    for v, (nids, xyz) in zip(face.vertices, verts):
+        vindx = mesh.ds.shape_to_index(v)
+        for nid, (x, y, z) in zip(nids, xyz):
+            node = ds.AddNode(x, y, z)
+            ds.SetNodeOnVertex(node, vindx)
+            node_map[nid] = node
+            id_map[node.GetID()] = nid
+    for e, (nids, xyz, us, conn) in zip(face.edges, edges):
+        eindx = mesh.ds.shape_to_index(e)
+        for nid, (x, y, z), u in zip(nids, xyz, us):
+            node = ds.AddNode(x, y, z)
+            ds.SetNodeOnEdge(node, eindx, u)
+            node_map[nid] = node
+            id_map[node.GetID()] = nid
+        for row in conn:
+            nodes = [node_map[nid] for nid in row if nid > 0]
+            elm = ds.AddEdge(*nodes)
+            ds.SetMeshElementOnShape(elm, eindx)
+    for sub_shape in face.vertices + face.edges:
+        mesh.get_submesh(sub_shape).object.ComputeStateEngine(
+            SMESH_subMesh.CHECK_COMPUTE_STATE)
+    return id_map
+
+
+def _match_nodes(tree, nids, xyz, is_bnd, tol):
+    """
+    Find the existing node ID's of the boundary nodes of a face mesh using
+    the KD-tree of the edge discretization. Interior nodes are given a zero
+    ID. Returns *None* if any boundary node cannot be matched.
+    """
+    gids = zeros(xyz.shape[0], dtype=int)
+    if is_bnd.any():
+        if tree is None:
+            return None
+        dist, indx = tree.query(xyz[is_bnd])
+        if (dist > tol).any():
+            return None
+        gids[is_bnd] = nids[indx]
+    return gids
+
+
+def _merge_face_mesh(mesh, face, fnids, fxyz, fuv, gids, conn):
+    """
+    Add the nodes and elements of a face mesh to the mesh and mark the face
+    sub-mesh as computed. Nodes with a nonzero ID in *gids* are replaced by
+    those existing nodes and the others are added on the face at their
+    parameters. Returns *False* without modifying the mesh if an existing
+    node cannot be found.
+    """
+    ds = mesh.ds.object
+    node_map = {}
+    for nid, gid in zip(fnids, gids):
+        if gid > 0:
+            node = ds.FindNode(int(gid))
+            if node is None:
+                return False
+            node_map[nid] = node
+
+    findx = mesh.ds.shape_to_index(face)
+    is_new = gids == 0
+    for nid, (x, y, z), (u, v) in zip(fnids[is_new], fxyz[is_new],
+                                      fuv[is_new]):
+        node = ds.AddNode(x, y, z)
+        ds.SetNodeOnFace(node, findx, u, v)
+        node_map[nid] = node
+
+    for row in conn:
+        nodes = [node_map[nid] for nid in row if nid > 0]
+        elm = ds.AddFace(*nodes)
+        ds.SetMeshElementOnShape(elm, findx)
+
+    mesh.get_submesh(face).object.ComputeStateEngine(
+        SMESH_subMesh.CHECK_COMPUTE_STATE)
+    return True
+
+
+def _face_mesh_arrays(mesh, face):
+    """
+    Gather the node ID's, node locations, node parameters, boundary node
+    flags, and full element connectivity of the mesh on a face. The
+    parameters of boundary nodes are not used and set to zero.
+    """
+    inner_nids, inner_xyz, _, conn = _sub_mesh_arrays(mesh, face, 9)
+    all_nids = unique(conn[conn > 0])
+    bnd_nids = all_nids[~isin(all_nids, inner_nids)]
+
+    ds = mesh.ds.object
+    helper = SMESH_MesherHelper(mesh.object)
+    inner_uv = zeros((inner_nids.size, 2))
+    for k, nid in enumerate(inner_nids):
+        uv = helper.GetNodeUV(face.object, ds.FindNode(int(nid)))
+        inner_uv[k] = uv.X(), uv.Y()
+    bnd_xyz = []
+    for nid in bnd_nids:
+        n = ds.FindNode(int(nid))
+        bnd_xyz.append((n.X(), n.Y(), n.Z()))
+    bnd_xyz = array(bnd_xyz, dtype=float).reshape(-1, 3)
+
+    fnids = concatenate([inner_nids, bnd_nids])
+    fxyz = concatenate([inner_xyz, bnd_xyz])
+    fuv = concatenate([inner_uv, zeros((bnd_nids.size, 2))])
+    is_bnd = concatenate([zeros(inner_nids.size, dtype=bool),
+                          ones(bnd_nids.size, dtype=bool)])
+    return fnids, fxyz, fuv, is_bnd, conn
+
+
+def _compute_face(args):
+    """
+    Mesh a single face read from a BREP file using the given mesh of its
+    edges and vertices. Used by the worker processes of
+    MeshGen.compute_parallel.
+    """
+    fn, recipe, bnd_mesh = args
+    shape = TopoDS_Shape()
+    BRepTools.Read_(shape, fn, BRep_Builder())
+    face = Shape.wrap(shape)
+
+    gen = MeshGen()
+    mesh = gen.create_mesh(face)
+    recipe(gen, mesh, face)
+    id_map = _add_boundary_mesh(mesh, face, bnd_mesh)
+    status = gen.compute(mesh, face)
+
+    fnids, fxyz, fuv, is_bnd, conn = _face_mesh_arrays(mesh, face)
+    gids = array([id_map.get(nid, 0) for nid in fnids], dtype=int)
+    if (gids[is_bnd] == 0).any():
+        # The face algorithm created new nodes on the boundary
+        gids = None
+    return status, fnids, fxyz, fuv, gids, conn
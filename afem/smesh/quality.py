@@ -0,0 +1,399 @@
+# This file is part of AFEM which provides an engineering toolkit for airframe
+# finite element modeling during conceptual design.
+#
+# Copyright (C) 2016-2018  Laughlin Research, LLC (info@laughlinresearch.com)
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+from __future__ import division
+
+from OCCT.SMESH import SMESH_subMesh
+from numpy import (arange, arccos, array, clip, cross, degrees, einsum,
+                   errstate, histogram, sqrt, unique, zeros, argsort, ones)
+from numpy.linalg import norm
+
+__all__ = ["MeshQuality", "quality_metrics"]
+
+# Metric names and whether larger values are worse
+_larger_is_worse = {'area': False,
+                    'min_angle': False,
+                    'max_angle': True,
+                    'aspect_ratio': True,
+                    'warp_angle': True,
+                    'taper_ratio': True,
+                    'skew_angle': False,
+                    'jacobian': False}
+
+
+class MeshQuality(object):
+    """
+    Quality metrics of the 2-D elements of a mesh or sub-mesh. The metrics
+    are evaluated for all elements at once using the Nastran-style
+    definitions of :func:`quality_metrics`.
+
+    :param mesh: The mesh or sub-mesh. A sub-mesh that is not computed has
+        no elements.
+    :type mesh: afem.smesh.meshes.Mesh or afem.smesh.meshes.SubMesh
+    """
+
+    def __init__(self, mesh):
+        is_sub_mesh = isinstance(mesh.object, SMESH_subMesh)
+        if is_sub_mesh and mesh.ds.object is None:
+            # Sub-meshes without a data structure have not been computed
+            eids, conn = zeros(0, dtype=int), zeros((0, 4), dtype=int)
+        else:
+            eids, conn = mesh.ds.face_arrays()
+
+        if is_sub_mesh:
+            # Only gather the nodes used by the sub-mesh elements
+            ds = mesh.object.GetFather().GetMeshDS()
+            nids = unique(conn[conn > 0])
+            xyz = []
+            for nid in nids:
+                n = ds.FindNode(int(nid))
+                xyz.append((n.X(), n.Y(), n.Z()))
+            xyz = array(xyz, dtype=float).reshape(-1, 3)
+        else:
+            nids, xyz = mesh.ds.node_arrays()
+
+        is_quad = conn[:, 3] > 0
+        indx = conn.copy()
+        indx[~is_quad, 3] = indx[~is_quad, 0]
+        if nids.size > 0:
+            lookup = zeros(nids.max() + 1, dtype=int)
+            lookup[nids] = arange(nids.size)
+            pnts = xyz[lookup[indx]]
+        else:
+            pnts = zeros((0, 4, 3), dtype=float)
+
+        self._eids = eids
+        self._is_quad = is_quad
+        self._metrics = quality_metrics(pnts, is_quad)
+
+    @property
+    def num_elms(self):
+        """
+        :return: Number of elements.
+        :rtype: int
+        """
+        return self._eids.size
+
+    @property
+    def eids(self):
+        """
+        :return: The element ID's.
+        :rtype: numpy.ndarray
+        """
+        return self._eids
+
+    @property
+    def is_quad(self):
+        """
+        :return: Array indicating whether each element is a quadrangle.
+        :rtype: numpy.ndarray
+        """
+        return self._is_quad
+
+    @property
+    def area(self):
+        """
+        :return: Element areas.
+        :rtype: numpy.ndarray
+        """
+        return self._metrics['area']
+
+    @property
+    def min_angle(self):
+        """
+        :return: Minimum element angles in degrees.
+        :rtype: numpy.ndarray
+        """
+        return self._metrics['min_angle']
+
+    @property
+    def max_angle(self):
+        """
+        :return: Maximum element angles in degrees.
+        :rtype: numpy.ndarray
+        """
+        return self._metrics['max_angle']
+
+    @property
+    def aspect_ratio(self):
+        """
+        :return: Element aspect ratios.
+        :rtype: numpy.ndarray
+        """
+        return self._metrics['aspect_ratio']
+
+    @property
+    def warp_angle(self):
+        """
+        :return: Element warping in degrees.
+        :rtype: numpy.ndarray
+        """
+        return self._metrics['warp_angle']
+
+    @property
+    def taper_ratio(self):
+        """
+        :return: Element taper ratios.
+        :rtype: numpy.ndarray
+        """
+        return self._metrics['taper_ratio']
+
+    @property
+    def skew_angle(self):
+        """
+        :return: Element skew angles in degrees.
+        :rtype: numpy.ndarray
+        """
+        return self._metrics['skew_angle']
+
+    @property
+    def jacobian(self):
+        """
+        :return: Element Jacobian ratios.
+        :rtype: numpy.ndarray
+        """
+        return self._metrics['jacobian']
+
+    @property
+    def stats(self):
+        """
+        :return: Summary statistics of each metric. The key is the metric
+            name and the value is a dictionary with the 'min', 'max', and
+            'mean' values.
+        :rtype: dict
+        """
+        stats = {}
+        for name, values in self._metrics.items():
+            if values.size == 0:
+                stats[name] = {'min': 0., 'max': 0., 'mean': 0.}
+            else:
+                stats[name] = {'min': values.min(), 'max': values.max(),
+                               'mean': values.mean()}
+        return stats
+
+    @staticmethod
+    def by_parts(parts):
+        """
+        Evaluate the element quality of each part using its sub-mesh.
+
+        :param collections.Sequence(afem.structure.entities.Part) parts: The
+            parts.
+
+        :return: Dictionary where the key is the part and the value is the
+            quality of the part elements.
+        :rtype: dict
+        """
+        return dict([(part, MeshQuality(part.submesh)) for part in parts])
+
+    def metric(self, name):
+        """
+        Get the values of a metric by name.
+
+        :param str name: The metric name (e.g., 'aspect_ratio').
+
+        :return: The metric values.
+        :rtype: numpy.ndarray
+
+        :raise KeyError: If the metric name is not recognized.
+        """
+        try:
+            return self._metrics[name]
+        except KeyError:
+            raise KeyError('Unrecognized metric name: {}'.format(name))
+
+    def histogram(self, name, bins=10):
+        """
+        Compute a histogram of a metric.
+
+        :param str name: The metric name.
+        :param int bins: The number of bins.
+
+        :return: The number of elements in each bin and the bin edges.
+        :rtype: tuple(numpy.ndarray)
+        """
+        return histogram(self.metric(name), bins)
+
+    def worst(self, name, n=10):
+        """
+        Get the elements with the worst values of a metric.
+
+        :param str name: The metric name.
+        :param int n: The number of elements.
+
+        :return: List of (element ID, value) tuples sorted from worst.
+        :rtype: list(tuple(int, float))
+        """
+        values = self.metric(name)
+        indx = argsort(values)
+        if _larger_is_worse[name]:
+            indx = indx[::-1]
+        indx = indx[:n]
+        return list(zip(self._eids[indx].tolist(), values[indx].tolist()))
+
+
+def quality_metrics(pnts, is_quad):
+    """
+    Compute quality metrics for triangle and quadrangle elements using
+    Nastran-style definitions:
+
+    * Aspect ratio: For triangles, the longest edge over the shortest
+      altitude normalized to one for an equilateral triangle. For
+      quadrangles, the ratio of the longer to the shorter line joining the
+      midpoints of opposite edges.
+    * Skew angle: For triangles, the minimum angle between the median of a
+      vertex and the line joining the midpoints of its adjacent edges. For
+      quadrangles, the acute angle between the lines joining the midpoints of
+      opposite edges.
+    * Taper ratio: For quadrangles, the largest area of the triangles formed
+      at each corner over one-half the element area, minus one. Zero for
+      triangles.
+    * Warp angle: For quadrangles, the largest angle between the normals of
+      the two triangles formed by splitting the element along either
+      diagonal. Zero for triangles.
+    * Jacobian: For quadrangles, the ratio of the minimum to maximum corner
+      Jacobian determinant. One for triangles.
+
+    :param numpy.ndarray pnts: Array of shape (m, 4, 3) containing the corner
+        node locations of each element. The fourth point is ignored for
+        triangles.
+    :param numpy.ndarray is_quad: Boolean array of shape (m,) indicating
+        which elements are quadrangles.
+
+    :return: Dictionary where the key is the metric name and the value is an
+        array of shape (m,).
+    :rtype: dict
+    """
+    pnts = array(pnts, dtype=float).reshape(-1, 4, 3)
+    is_quad = array(is_quad, dtype=bool).reshape(-1)
+    m = pnts.shape[0]
+
+    metrics = {}
+    for name in _larger_is_worse:
+        metrics[name] = zeros(m, dtype=float)
+    metrics['jacobian'] = ones(m, dtype=float)
+
+    with errstate(divide='ignore', invalid='ignore'):
+        is_tri = ~is_quad
+        if is_tri.any():
+            _tri_metrics(pnts[is_tri, :3], is_tri, metrics)
+        if is_quad.any():
+            _quad_metrics(pnts[is_quad], is_quad, metrics)
+
+    return metrics
+
+
+def _dot(v1, v2):
+    """
+    Row-wise dot product.
+    """
+    return einsum('ij,ij->i', v1, v2)
+
+
+def _angle(v1, v2):
+    """
+    Row-wise angle between vectors in degrees.
+    """
+    c = _dot(v1, v2) / (norm(v1, axis=1) * norm(v2, axis=1))
+    return degrees(arccos(clip(c, -1., 1.)))
+
+
+def _acute_angle(v1, v2):
+    """
+    Row-wise acute angle between lines in degrees.
+    """
+    c = abs(_dot(v1, v2)) / (norm(v1, axis=1) * norm(v2, axis=1))
+    return degrees(arccos(clip(c, 0., 1.)))
+
+
+def _tri_metrics(p, mask, metrics):
+    """
+    Compute metrics of triangles with corner points of shape (k, 3, 3).
+    """
+    nxt = [1, 2, 0]
+    prv = [2, 0, 1]
+
+    area = 0.5 * norm(cross(p[:, 1] - p[:, 0], p[:, 2] - p[:, 0]), axis=1)
+    lengths = norm(p[:, nxt] - p, axis=2)
+
+    angles = array([_angle(p[:, nxt[i]] - p[:, i], p[:, prv[i]] - p[:, i])
+                    for i in range(3)]).T
+
+    skew = []
+    for i in range(3):
+        median = 0.5 * (p[:, nxt[i]] + p[:, prv[i]]) - p[:, i]
+        midline = 0.5 * (p[:, nxt[i]] - p[:, prv[i]])
+        skew.append(_acute_angle(median, midline))
+    skew = array(skew).T
+
+    metrics['area'][mask] = area
+    metrics['min_angle'][mask] = angles.min(axis=1)
+    metrics['max_angle'][mask] = angles.max(axis=1)
+    metrics['aspect_ratio'][mask] = (sqrt(3.) * lengths.max(axis=1) ** 2 /
+                                     (4. * area))
+    metrics['skew_angle'][mask] = skew.min(axis=1)
+
+
+def _quad_metrics(p, mask, metrics):
+    """
+    Compute metrics of quadrangles with corner points of shape (k, 4, 3).
+    """
+    nxt = [1, 2, 3, 0]
+    prv = [3, 0, 1, 2]
+
+    normal = cross(p[:, 2] - p[:, 0], p[:, 3] - p[:, 1])
+    area = 0.5 * norm(normal, axis=1)
+    unit_normal = normal / norm(normal, axis=1)[:, None]
+
+    angles = []
+    corner_areas = []
+    jacobians = []
+    for i in range(4):
+        v1 = p[:, nxt[i]] - p[:, i]
+        v2 = p[:, prv[i]] - p[:, i]
+        angles.append(_angle(v1, v2))
+        vn = cross(v1, v2)
+        corner_areas.append(0.5 * norm(vn, axis=1))
+        jacobians.append(_dot(vn, unit_normal))
+    angles = array(angles).T
+    corner_areas = array(corner_areas).T
+    jacobians = array(jacobians).T
+
+    # Lines joining the midpoints of opposite edges
+    mid = 0.5 * (p + p[:, nxt])
+    l1 = mid[:, 2] - mid[:, 0]
+    l2 = mid[:, 3] - mid[:, 1]
+    d1 = norm(l1, axis=1)
+    d2 = norm(l2, axis=1)
+
+    # Split along each diagonal
+    n1 = cross(p[:, 1] - p[:, 0], p[:, 2] - p[:, 0])
+    n2 = cross(p[:, 2] - p[:, 0], p[:, 3] - p[:, 0])
+    n3 = cross(p[:, 2] - p[:, 1], p[:, 3] - p[:, 1])
+    n4 = cross(p[:, 3] - p[:, 1], p[:, 0] - p[:, 1])
+    warp = array([_angle(n1, n2), _angle(n3, n4)]).T
+
+    metrics['area'][mask] = area
+    metrics['min_angle'][mask] = angles.min(axis=1)
+    metrics['max_angle'][mask] = angles.max(axis=1)
+    metrics['aspect_ratio'][mask] = (array([d1, d2]).max(axis=0) /
+                                     array([d1, d2]).min(axis=0))
+    metrics['skew_angle'][mask] = _acute_angle(l1, l2)
+    metrics['taper_ratio'][mask] = corner_areas.max(axis=1) / (0.5 * area) - 1.
+    metrics['warp_angle'][mask] = warp.max(axis=1)
+    metrics['jacobian'][mask] = (jacobians.min(axis=1) /
+                                 jacobians.max(axis=1))
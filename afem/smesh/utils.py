@@ -19,12 +19,18 @@
 from OCCT.gp import gp_Trsf
 from OCCT.SMDS import SMDS_ListOfNodes, SMDS_ListOfElements
 from OCCT.SMESH import SMESH_MeshEditor, SMESH_MesherHelper
+from numpy import (arange, argmax, array, full, iinfo, minimum, ones, roll,
+                   sort, unique, where, zeros)
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
 
 from afem.geometry.check import CheckGeom
 from afem.smesh.entities import Element, Node
 from afem.topology.entities import Shape
 
-__all__ = ["MeshEditor", "MeshHelper"]
+__all__ = ["MeshEditor", "MeshHelper", "coincident_node_map",
+           "merge_node_arrays"]
 
 
 class MeshEditor(object):
@@ -36,6 +42,7 @@ class MeshEditor(object):
 
     def __init__(self, mesh):
         self._editor = SMESH_MeshEditor(mesh.object)
+        self._mesh = mesh
 
     @property
     def object(self):
@@ -129,6 +136,73 @@ class MeshEditor(object):
 
         self._editor.MergeNodes(smesh_list, avoid_making_holes)
 
+    def coincident_node_map(self, nodes=(), tol=1.0e-7):
+        """
+        Find coincident nodes using a KD-tree of the node locations. Nodes
+        are clustered if they are within the tolerance of any other node in
+        the cluster and the node with the smallest ID in each cluster is kept.
+
+        :param collections.Sequence(afem.smesh.entities.Node) nodes: The nodes
+            to search. If not provided then the whole mesh will be searched.
+        :param float tol: Search tolerance.
+
+        :return: Dictionary where the key is the ID of a node to be replaced
+            and the value is the ID of the node that replaces it.
+        :rtype: dict
+        """
+        if nodes:
+            nids = array([n.id for n in nodes], dtype=int)
+            xyz = array([n.xyz for n in nodes], dtype=float).reshape(-1, 3)
+        else:
+            nids, xyz = self._mesh.ds.node_arrays()
+
+        target = coincident_node_map(nids, xyz, tol)
+        indx = (target != nids).nonzero()[0]
+        return dict(zip(nids[indx].tolist(), target[indx].tolist()))
+
+    def merge_nodes_by_map(self, node_map, avoid_making_holes=False):
+        """
+        Merge nodes using a node map. The map is applied to the elements of
+        the mesh in a single operation.
+
+        :param dict node_map: Dictionary where the key is the ID of a node to
+            be replaced and the value is the ID of the node that replaces it.
+        :param bool avoid_making_holes: Avoid modifications that may spoil mesh
+            topology.
+
+        :return: None.
+        """
+        groups = {}
+        for nid, kept_id in node_map.items():
+            groups.setdefault(kept_id, []).append(nid)
+
+        ds = self._editor.GetMeshDS()
+        smesh_list = self._editor.TListOfListOfNodes()
+        for kept_id in sorted(groups):
+            row = [kept_id] + sorted(groups[kept_id])
+            smesh_list.push_back([ds.FindNode(nid) for nid in row])
+
+        self._editor.MergeNodes(smesh_list, avoid_making_holes)
+
+    def merge_coincident_nodes(self, nodes=(), avoid_making_holes=False,
+                               tol=1.0e-7):
+        """
+        Find coincident nodes using a KD-tree and merge them.
+
+        :param collections.Sequence(afem.smesh.entities.Node) nodes: The nodes
+            to search. If not provided then the whole mesh will be searched.
+        :param bool avoid_making_holes: Avoid modifications that may spoil mesh
+            topology.
+        :param float tol: Search tolerance.
+
+        :return: The node map that was applied.
+        :rtype: dict
+        """
+        node_map = self.coincident_node_map(nodes, tol)
+        if node_map:
+            self.merge_nodes_by_map(node_map, avoid_making_holes)
+        return node_map
+
     def find_equal_elements(self, elements=()):
         """
         Find equal elements.
@@ -590,3 +664,105 @@ class MeshHelper(object):
             smesh_elm = self._helper.AddFace(n1.object, n2.object, n3.object,
                                              n4.object, id_, force3d)
         return Element(smesh_elm)
+
+
+def coincident_node_map(nids, xyz, tol=1.0e-7):
+    """
+    Find coincident nodes using a KD-tree of the node locations. Nodes are
+    clustered if they are within the tolerance of any other node in the
+    cluster and the node with the smallest ID in each cluster is kept.
+
+    :param numpy.ndarray nids: Array of node ID's.
+    :param numpy.ndarray xyz: Array of shape (n, 3) of node locations.
+    :param float tol: Search tolerance.
+
+    :return: Array of shape (n,) containing the ID of the node that replaces
+        each node. Nodes that are kept map to themselves.
+    :rtype: numpy.ndarray
+    """
+    nids = array(nids, dtype=int)
+    n = nids.size
+    if n < 2:
+        return nids.copy()
+
+    tree = cKDTree(xyz)
+    pairs = array(list(tree.query_pairs(tol)), dtype=int).reshape(-1, 2)
+    if pairs.shape[0] == 0:
+        return nids.copy()
+
+    graph = coo_matrix((ones(pairs.shape[0]), (pairs[:, 0], pairs[:, 1])),
+                       shape=(n, n))
+    nclusters, labels = connected_components(graph, directed=False)
+
+    kept = full(nclusters, iinfo(nids.dtype).max, dtype=nids.dtype)
+    minimum.at(kept, labels, nids)
+    return kept[labels]
+
+
+def merge_node_arrays(nids, xyz, conn, tol=1.0e-7):
+    """
+    Merge coincident nodes of an array mesh and apply the merge to the
+    element connectivity. As in :meth:`.MeshEditor.merge_nodes`, a
+    quadrilateral that loses one corner because two adjacent nodes are
+    merged becomes a triangle. Other elements that use the same node more
+    than once are degenerate and are removed from the connectivity.
+
+    :param numpy.ndarray nids: Array of node ID's.
+    :param numpy.ndarray xyz: Array of shape (n, 3) of node locations.
+    :param numpy.ndarray conn: Array of shape (m, k) of element connectivity
+        using node ID's. Entries less than one are treated as padding and are
+        not changed.
+    :param float tol: Search tolerance.
+
+    :return: The remaining node ID's, their locations, the updated
+        connectivity, and the row indices of the degenerate elements that
+        were removed from the connectivity. Triangles made from
+        quadrilaterals keep their row and are padded with zero.
+    :rtype: tuple(numpy.ndarray)
+    """
+    nids = array(nids, dtype=int)
+    xyz = array(xyz, dtype=float).reshape(-1, 3)
+    conn = array(conn, dtype=int)
+    collapsed = zeros(0, dtype=int)
+
+    target = coincident_node_map(nids, xyz, tol)
+    if nids.size == 0:
+        return nids, xyz, conn.copy(), collapsed
+
+    is_kept = target == nids
+    kept_nids, indx = unique(nids[is_kept], return_index=True)
+    kept_xyz = xyz[is_kept][indx]
+    if conn.size == 0:
+        return kept_nids, kept_xyz, conn.copy(), collapsed
+
+    # Map every node ID to the ID of the node that replaces it
+    lookup = arange(max(nids.max(), conn.max()) + 1)
+    lookup[nids] = target
+    new_conn = conn.copy()
+    mask = conn > 0
+    new_conn[mask] = lookup[conn[mask]]
+
+    # Find elements that now use the same node more than once
+    new_conn = new_conn.reshape(new_conn.shape[0], -1)
+    srt = sort(new_conn, axis=1)
+    is_dup = ((srt[:, 1:] == srt[:, :-1]) & (srt[:, 1:] > 0)).any(axis=1)
+
+    # Quadrilaterals with one pair of merged adjacent nodes become triangles
+    if new_conn.shape[1] >= 4:
+        quad = new_conn[:, :4]
+        is_quad = (quad > 0).all(axis=1) & ((new_conn > 0).sum(axis=1) == 4)
+        is_adj = quad == roll(quad, -1, axis=1)
+        srt = sort(quad, axis=1)
+        ndistinct = 1 + (srt[:, 1:] != srt[:, :-1]).sum(axis=1)
+        to_tri = where(is_dup & is_quad & (ndistinct == 3) &
+                       (is_adj.sum(axis=1) == 1))[0]
+        if to_tri.size > 0:
+            drop = (argmax(is_adj[to_tri], axis=1) + 1) % 4
+            keep = arange(4)[None, :] != drop[:, None]
+            new_conn[to_tri, :3] = quad[to_tri][keep].reshape(-1, 3)
+            new_conn[to_tri, 3] = 0
+            is_dup[to_tri] = False
+
+    # Remove degenerate elements
+    collapsed = where(is_dup)[0]
+    return kept_nids, kept_xyz, new_conn[~is_dup], collapsed
@@ -18,13 +18,15 @@
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
 from numpy import mean
 
+from afem.adaptor.entities import AdaptorSurface
 from afem.base.entities import ShapeHolder, NamedItem
 from afem.config import logger
 from afem.geometry.check import CheckGeom
 from afem.geometry.create import (PlaneByNormal, PlaneFromParameter,
                                   PointFromParameter, PointsAlongCurveByNumber)
-from afem.geometry.entities import Axis1, Plane, TrimmedCurve
+from afem.geometry.entities import Axis1, Plane, PointArray, TrimmedCurve
 from afem.geometry.project import (ProjectPointToCurve,
+                                   ProjectPointsToCurve,
                                    ProjectPointToSurface)
 from afem.structure.group import GroupAPI
 from afem.topology.bop import (CutCylindricalHole, CutShapes, FuseShapes,
@@ -605,7 +607,7 @@ class Part(NamedItem, ShapeHolder):
         return PointFromParameter(self._cref, u0, ds).point
 
     def points_by_number(self, n, d1=None, d2=None, shape1=None,
-                         shape2=None):
+                         shape2=None, as_array=False):
         """
         Create a specified number of points along the reference curve.
 
@@ -620,9 +622,12 @@ class Part(NamedItem, ShapeHolder):
             point. This shape is intersected with the edge or wire.
         :param afem.topology.entities.Shape shape2: A shape to define the last
             point. This shape is intersected with the edge or wire.
+        :param bool as_array: Option to return the points as a
+            :class:`.PointArray` instead of a list.
 
         :return: The points.
-        :rtype: list(afem.geometry.entities.Point)
+        :rtype: list(afem.geometry.entities.Point) or
+            afem.geometry.entities.PointArray
 
         :raise AttributeError: If part does not have a reference curve.
         """
@@ -632,10 +637,12 @@ class Part(NamedItem, ShapeHolder):
 
         edge = Edge.by_curve(self._cref)
         builder = PointsAlongShapeByNumber(edge, n, d1, d2, shape1, shape2)
+        if as_array:
+            return builder.point_array
         return builder.points
 
     def points_by_distance(self, maxd, nmin=0, d1=None, d2=None, shape1=None,
-                           shape2=None):
+                           shape2=None, as_array=False):
         """
         Create a points along the reference curve by distance.
 
@@ -652,9 +659,12 @@ class Part(NamedItem, ShapeHolder):
             point. This shape is intersected with the edge or wire.
         :param afem.topology.entities.Shape shape2: A shape to define the last
             point. This shape is intersected with the edge or wire.
+        :param bool as_array: Option to return the points as a
+            :class:`.PointArray` instead of a list.
 
         :return: The points.
-        :rtype: list(afem.geometry.entities.Point)
+        :rtype: list(afem.geometry.entities.Point) or
+            afem.geometry.entities.PointArray
 
         :raise AttributeError: If part does not have a reference curve.
         """
@@ -665,6 +675,8 @@ class Part(NamedItem, ShapeHolder):
         edge = Edge.by_curve(self._cref)
         builder = PointsAlongShapeByDistance(edge, maxd, d1, d2, shape1,
                                              shape2, nmin)
+        if as_array:
+            return builder.point_array
         return builder.points
 
     def point_to_cref(self, pnt, direction=None):
@@ -693,8 +705,9 @@ class Part(NamedItem, ShapeHolder):
         """
         Project points to the reference curve.
 
-        :param list(afem.geometry.entities.Point) pnts: The points. Position
-            will be updated.
+        :param pnts: The points. Position will be updated.
+        :type pnts: list(afem.geometry.entities.Point) or
+            afem.geometry.entities.PointArray
         :param vector_like direction: Projection direction.
 
         :return: List of status for each point.
@@ -706,11 +719,17 @@ class Part(NamedItem, ShapeHolder):
             msg = 'Part does not have a reference curve.'
             raise AttributeError(msg)
 
-        success = []
-        for p in pnts:
-            status = self.point_to_cref(p, direction)
-            success.append(status)
-        return success
+        if isinstance(pnts, PointArray):
+            proj = ProjectPointsToCurve(pnts, self._cref, direction)
+            pnts.xyz[proj.success] = proj.xyz[proj.success]
+            return [bool(status) for status in proj.success]
+
+        pnts = list(pnts)
+        proj = ProjectPointsToCurve(pnts, self._cref, direction)
+        for p, xyz, status in zip(pnts, proj.xyz, proj.success):
+            if status:
+                p.set_xyz(xyz)
+        return [bool(status) for status in proj.success]
 
     def point_to_sref(self, pnt, direction=None):
         """
@@ -754,10 +773,16 @@ class Part(NamedItem, ShapeHolder):
             msg = 'Part does not have a reference surface.'
             raise AttributeError(msg)
 
+        # Prepare the surface adaptor once for all the points
+        adp_srf = AdaptorSurface.to_adaptor(self._sref)
         success = []
         for p in pnts:
-            status = self.point_to_sref(p, direction)
-            success.append(status)
+            proj = ProjectPointToSurface(p, adp_srf, direction)
+            if not proj.success:
+                success.append(False)
+                continue
+            p.set_xyz(proj.nearest_point.xyz)
+            success.append(True)
         return success
 
     def plane_from_parameter(self, ds, u0=None, is_rel=False, ref_pln=None,
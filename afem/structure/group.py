@@ -16,12 +16,29 @@
 # You should have received a copy of the GNU Lesser General Public
 # License along with this library; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+from hashlib import md5
+from multiprocessing import Pool
+
+from OCCT.BinTools import BinTools
+from OCCT.TopoDS import TopoDS_Shape
+
 from afem.base.entities import NamedItem
+from afem.config import logger
+from afem.exchange.brep import read_brep, write_brep
 from afem.exchange.xde import XdeDocument
+from afem.fem.materials import Material, Isotropic
+from afem.fem.properties import Property, Shell
 from afem.structure.utils import order_parts_by_id
 from afem.topology.create import CompoundByShapes, EdgeByCurve, FaceBySurface
+from afem.topology.entities import Shape
 
-__all__ = ["Group", "GroupAPI"]
+__all__ = ["Group", "GroupAPI", "Checkpoint"]
 
 
 class Group(NamedItem):
@@ -174,6 +191,7 @@ class GroupAPI(object):
     _master = Group('_master', None)
     _all = {'_master': _master}
     _active = _master
+    _saved = {}
 
     @classmethod
     def reset(cls):
@@ -187,6 +205,7 @@ class GroupAPI(object):
         cls._master = Group('_master', None)
         cls._all = {'_master': cls._master}
         cls._active = cls._master
+        cls._saved = {}
 
         from afem.structure.entities import Part
 
@@ -388,58 +407,223 @@ class GroupAPI(object):
         return group.as_compound(include_subgroup)
 
     @classmethod
-    def save_model(cls, fn, binary=True):
+    def export_groups(cls, files, nprocs=None, schema='AP203', units=None):
+        """
+        Export the parts of each group to its own STEP or IGES file. The files
+        are written in a pool of worker processes, each with its own writer.
+        The file format is determined by the file extension and each part is
+        named in the file using its name.
+
+        :param files: Mapping of groups to filenames. The parts of each group
+            and its subgroups are exported.
+        :type files: dict(str or afem.structure.group.Group, str)
+        :param int nprocs: Number of worker processes. If *None* then the
+            number of CPUs is used. If 1 then the files are written in this
+            process.
+        :param str schema: Schema for STEP files ('AP203', or 'AP214').
+        :param units: Units to convert the files to.
+        :type units: str or None
+
+        :return: Dictionary where the key is the filename and the value is a
+            dictionary with the group name ('group'), number of parts
+            ('parts'), if the file was written ('status'), the time in
+            seconds to transfer and write the file ('time'), and the file size
+            in bytes ('size').
+        :rtype: collections.OrderedDict
+
+        :raise TypeError: If a file extension is not supported.
+        """
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            args = []
+            for i, (group, fn) in enumerate(files.items()):
+                group = cls.get_group(group)
+                ext = os.path.splitext(fn)[1].lower()
+                if ext in ['.stp', '.step']:
+                    fmt = 'step'
+                elif ext in ['.igs', '.iges']:
+                    fmt = 'iges'
+                else:
+                    raise TypeError('File extension not supported.')
+
+                # Write the part shapes so they can be read by a worker
+                shapes, names = [], []
+                for part in group.get_parts(order=True):
+                    if part.is_null:
+                        continue
+                    shapes.append(part.shape)
+                    names.append(part.name)
+                brep_fn = os.path.join(tmp_dir, 'group{}.brep'.format(i))
+                write_brep(CompoundByShapes(shapes).compound, brep_fn)
+                args.append((fmt, fn, brep_fn, names, schema, units,
+                             group.name))
+
+            if nprocs == 1:
+                results = [_export_file(arg) for arg in args]
+            else:
+                pool = Pool(nprocs)
+                try:
+                    results = pool.map(_export_file, args)
+                finally:
+                    pool.close()
+                    pool.join()
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        reports = OrderedDict()
+        for arg, (status, dt, size) in zip(args, results):
+            fn, names, group_name = arg[1], arg[3], arg[6]
+            reports[fn] = {'group': group_name,
+                           'parts': len(names),
+                           'status': status,
+                           'time': dt,
+                           'size': size}
+            msg = 'Exported group {} to {} ({} parts, {:.2f} s, {} bytes).'
+            logger.info(msg.format(group_name, fn, len(names), dt, size))
+        return reports
+
+    @classmethod
+    def save_model(cls, fn, binary=True, incremental=False):
         """
-        Save the model.
+        Save the model. The group hierarchy, the group and part metadata, and
+        the reference geometry of the parts are saved. Metadata values are
+        saved if they can be serialized to JSON or if they are materials or
+        properties from the ``afem.fem`` package. Other metadata values are
+        skipped.
 
         :param str fn: The filename.
         :param bool binary: If *True*, the document will be saved in a binary
             format. If *False*, the document will be saved in an XML format.
+        :param bool incremental: If *True* and the file was previously saved
+            by this method in the current session, the existing document is
+            opened and only the labels of the parts that were added, removed,
+            or changed since that save are rebuilt. Parts are compared by the
+            content of their shapes and reference geometry, their metadata,
+            and their color. The whole document is still written to the
+            file.
 
         :return: *True* if saved, *False* otherwise.
         :rtype: bool
         """
-        group = cls.get_master()
-
-        # Create document and application
         doc = XdeDocument(binary)
+        key = os.path.abspath(fn)
+
+        # Gather the current state of the parts and groups
+        groups = cls._ordered_groups()
+        part_to_group = {}
+        for group in groups:
+            for part in group.parts:
+                part_to_group[part] = group
+        parts = cls.get_master().get_parts(order=True)
+
+        records = {}
+        for part in parts:
+            record = {'id': part.id,
+                      'group': part_to_group[part].name,
+                      'metadata': _encode_metadata(part.metadata)}
+            records[part] = json.dumps(record, sort_keys=True)
+
+        signatures = {}
+        if incremental:
+            signatures = dict([(part, _part_signature(part, records[part]))
+                               for part in parts])
+
+        # Remove the labels of parts that changed since the previous save
+        saved = {}
+        previous = cls._saved.get(key)
+        if (incremental and previous is not None and os.path.isfile(fn) and
+                doc.open(fn)):
+            unchanged = set([part.id for part in parts if
+                             part.id in previous and
+                             previous[part.id][0] == signatures[part]])
+            labels = dict([(label.entry, label) for _, _, label in
+                           doc.index.records])
+            for part_id, (_, entries) in previous.items():
+                if part_id in unchanged:
+                    saved[part_id] = previous[part_id]
+                    continue
+                for entry in entries:
+                    if entry in labels:
+                        doc.remove_shape(labels[entry])
+            parts = [part for part in parts if part.id not in unchanged]
 
         # Store parts as top-level shapes
-        # TODO Support group hierarchy
-        parts = group.get_parts()
         for part in parts:
-            name = doc.add_shape(part.shape, part.name, False)
-            name.set_string(part.type)
-            name.set_color(part.color)
+            label = doc.add_shape(part.shape, part.name, False)
+            label.set_string(part.type)
+            label.set_color(part.color)
+            label.set_comment(records[part])
+            entries = [label.entry]
 
             # Reference curve
             if part.has_cref:
                 edge = EdgeByCurve(part.cref).edge
-                name = doc.add_shape(edge, part.name, False)
-                name.set_string('CREF')
+                label = doc.add_shape(edge, part.name, False)
+                label.set_string('CREF')
+                entries.append(label.entry)
 
             # Reference surface
             if part.has_sref:
                 face = FaceBySurface(part.sref).face
-                name = doc.add_shape(face, part.name, False)
-                name.set_string('SREF')
+                label = doc.add_shape(face, part.name, False)
+                label.set_string('SREF')
+                entries.append(label.entry)
+
+            saved[part.id] = (signatures.get(part), entries)
+
+        # Store the group hierarchy on the main label
+        group_data = []
+        for group in groups[1:]:
+            group_data.append({'name': group.name,
+                               'parent': group.parent.name,
+                               'metadata': _encode_metadata(group.metadata)})
+        model = {'version': 1,
+                 'groups': group_data,
+                 'active': cls.get_active().name}
+        doc.main_label.set_comment(json.dumps(model, sort_keys=True))
+
+        status = doc.save_as(fn)
+        if status:
+            cls._saved[key] = saved
+        return status
 
-        return doc.save_as(fn)
+    @classmethod
+    def _ordered_groups(cls):
+        """
+        Get all groups with each parent before its children, starting with
+        the master group.
+        """
+        groups = [cls.get_master()]
+        i = 0
+        while i < len(groups):
+            children = sorted(groups[i]._children, key=lambda g: g.name)
+            groups += children
+            i += 1
+        return groups
 
     @classmethod
-    def load_model(cls, fn, group=None):
+    def load_model(cls, fn, group=None, names=None, lazy=False):
         """
-        Load a model.
+        Load a model. If the model was saved with its group hierarchy, the
+        saved groups are created below *group* and the parts and metadata are
+        restored into them.
 
         :param str fn: The filename. The extension should be either ".xbf" for
             a binary file or ".xml" for an XML file.
         :param afem.structure.group.Group group: The group to load the parts
             into. If *None* then the active group is used.
+        :param collections.Sequence(str) names: The names of the parts to
+            load. If *None* then all parts are loaded. If provided, the first
+            part with each name is loaded.
+        :param bool lazy: Option to defer loading the shape of each part until
+            it is first accessed. The document stays open until all deferred
+            shapes are loaded or the parts are destroyed.
 
         :return: *True* if loaded, *False* otherwise.
         :rtype: bool
 
         :raise TypeError: If the file extension type is not supported.
+        :raise KeyError: If a requested part name is not found.
         """
         from afem.structure.create import CreatePartByName
 
@@ -452,50 +636,468 @@ class GroupAPI(object):
 
         group = cls.get_group(group)
 
-        # Open document
+        # Open document and index the top-level labels by name and type
         doc = XdeDocument(binary)
         doc.open(fn)
+        index = doc.index
+
+        # Create the saved group hierarchy below the group
+        name_to_group = {'_master': group}
+        model = doc.main_label.comment
+        if model:
+            for data in json.loads(model)['groups']:
+                parent = name_to_group.get(data['parent'], group)
+                sub_group = cls.create_group(data['name'], parent, False)
+                if sub_group is None:
+                    msg = ('A group named {} already exists. Its parts will '
+                           'be loaded into {}.'.format(data['name'],
+                                                       parent.name))
+                    logger.warning(msg)
+                    name_to_group[data['name']] = parent
+                    continue
+                sub_group.metadata.update(_decode_metadata(data['metadata']))
+                name_to_group[data['name']] = sub_group
+
+        if names is None:
+            part_data = _all_part_labels(index)
+        else:
+            part_data = [_part_label(index, name) for name in names]
+
+        # Create parts
+        for name, part_type, part_label, cref, sref in part_data:
+            if lazy:
+                shape = None
+            else:
+                shape = part_label.shape
+                if shape is None:
+                    continue
+
+            # Saved group and metadata
+            part_group, metadata = group, {}
+            record = part_label.comment
+            if record:
+                record = json.loads(record)
+                part_group = name_to_group.get(record['group'], group)
+                metadata = _decode_metadata(record['metadata'])
+
+            part = CreatePartByName(part_type, name=name, shape=shape,
+                                    group=part_group, cref=cref,
+                                    sref=sref).part
+            part.metadata.update(metadata)
+            if lazy:
+                part.set_shape_loader(doc.shape_loader(part_label))
+            color = part_label.color
+            if color is not None:
+                r, g, b = color.Red(), color.Green(), color.Blue()
+                part.set_color(r, g, b)
+
+        return True
+
+
+class Checkpoint(object):
+    """
+    Checkpoint store for the state of the :class:`.GroupAPI` model. The
+    groups, parts, shapes, reference geometry, and metadata are saved at
+    named stages so that a long process can resume from the last completed
+    stage. Shapes are stored once in a binary format using their content
+    hash as the filename, so shapes that did not change between stages are
+    not stored again.
+
+    :param str path: The directory of the store. It is created if it does not
+        exist.
+
+    Usage:
+
+    >>> cp = Checkpoint('wing.ckpt')
+    >>> stage = cp.resume()
+    >>> if stage is None:
+    >>>     # Build spars...
+    >>>     cp.save('spars')
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._shape_path = os.path.join(path, 'shapes')
+        if not os.path.isdir(self._shape_path):
+            os.makedirs(self._shape_path)
+        self._manifest_fn = os.path.join(path, 'manifest.json')
+
+        if os.path.isfile(self._manifest_fn):
+            with open(self._manifest_fn, 'r') as fin:
+                self._stages = json.load(fin)['stages']
+        else:
+            self._stages = []
 
-        # Get the main name and iterate on top-level children which
-        # should be parts
-        name = doc.shapes_label
+    @property
+    def path(self):
+        """
+        :return: The directory of the store.
+        :rtype: str
+        """
+        return self._path
+
+    @property
+    def stages(self):
+        """
+        :return: The names of the saved stages in order.
+        :rtype: list(str)
+        """
+        return [stage['name'] for stage in self._stages]
+
+    @property
+    def last_stage(self):
+        """
+        :return: The name of the last saved stage or *None* if there are no
+            stages.
+        :rtype: str or None
+        """
+        if not self._stages:
+            return None
+        return self._stages[-1]['name']
+
+    def has_stage(self, name):
+        """
+        Check if a stage has been saved.
+
+        :param str name: The stage name.
+
+        :return: *True* if saved, *False* if not.
+        :rtype: bool
+        """
+        return name in self.stages
+
+    def save(self, name):
+        """
+        Save the current model as a stage. If the stage already exists then it
+        is replaced and any stages saved after it are discarded.
+
+        :param str name: The stage name.
+
+        :return: None.
+        """
+        groups = GroupAPI._ordered_groups()
+        group_data = []
         part_data = []
-        cref_to_part = {}
-        sref_to_part = {}
-        for current in name.children_iter:
-            name = current.name
-            shape = current.shape
-            type_ = current.string
-            color = current.color
-
-            if None in [name, shape, type_]:
-                continue
+        for group in groups:
+            if group is not groups[0]:
+                group_data.append({'name': group.name,
+                                   'parent': group.parent.name,
+                                   'metadata': _encode_metadata(
+                                       group.metadata)})
+            for part in order_parts_by_id(group.parts):
+                data = {'name': part.name,
+                        'type': part.type,
+                        'id': part.id,
+                        'group': group.name,
+                        'metadata': _encode_metadata(part.metadata),
+                        'shape': self._write_shape(part.shape),
+                        'cref': None,
+                        'sref': None,
+                        'color': None}
+                if part.has_cref:
+                    data['cref'] = self._write_shape(
+                        EdgeByCurve(part.cref).edge)
+                if part.has_sref:
+                    data['sref'] = self._write_shape(
+                        FaceBySurface(part.sref).face)
+                if part.color is not None:
+                    c = part.color
+                    data['color'] = [c.Red(), c.Green(), c.Blue()]
+                part_data.append(data)
+
+        stage = {'name': name,
+                 'groups': group_data,
+                 'parts': part_data,
+                 'active': GroupAPI.get_active().name}
+
+        names = self.stages
+        if name in names:
+            self._stages = self._stages[:names.index(name)]
+        self._stages.append(stage)
+        self._write_manifest()
+
+    def restore(self, name=None):
+        """
+        Restore the model from a stage. The :class:`.GroupAPI` is reset and
+        the saved groups and parts are created again.
 
-            # Check for reference geometry
-            if type_ == 'CREF':
-                cref_to_part[name] = shape.curve
-                continue
+        :param str name: The stage name. If *None* then the last stage is
+            used.
 
-            if type_ == 'SREF':
-                sref_to_part[name] = shape.surface
-                continue
+        :return: None.
 
-            # Add part data
-            part_data.append((type_, name, shape, color))
+        :raise KeyError: If the stage is not found.
+        """
+        from afem.structure.create import CreatePartByName
 
-        # Create parts
-        # TODO Support group hierarchy
-        for type_, name, shape, color in part_data:
+        if name is None:
+            name = self.last_stage
+        names = self.stages
+        if name not in names:
+            raise KeyError('Stage not found: {}'.format(name))
+        stage = self._stages[names.index(name)]
+
+        GroupAPI.reset()
+        name_to_group = {'_master': GroupAPI.get_master()}
+        for data in stage['groups']:
+            parent = name_to_group[data['parent']]
+            group = GroupAPI.create_group(data['name'], parent, False)
+            group.metadata.update(_decode_metadata(data['metadata']))
+            name_to_group[data['name']] = group
+
+        for data in sorted(stage['parts'], key=lambda d: d['id']):
+            shape = self._read_shape(data['shape'])
             cref, sref = None, None
-            if name in cref_to_part:
-                cref = cref_to_part[name]
-            if name in sref_to_part:
-                sref = sref_to_part[name]
+            if data['cref'] is not None:
+                cref = self._read_shape(data['cref']).curve
+            if data['sref'] is not None:
+                sref = self._read_shape(data['sref']).surface
+            part = CreatePartByName(data['type'], name=data['name'],
+                                    shape=shape,
+                                    group=name_to_group[data['group']],
+                                    cref=cref, sref=sref).part
+            part.metadata.update(_decode_metadata(data['metadata']))
+            if data['color'] is not None:
+                part.set_color(*data['color'])
+
+        GroupAPI.make_active(name_to_group.get(stage['active']))
+
+    def resume(self):
+        """
+        Restore the model from the last saved stage, if any.
 
-            part = CreatePartByName(type_, name=name, shape=shape,
-                                    group=group, cref=cref, sref=sref).part
-            if color is not None:
-                r, g, b = color.Red(), color.Green(), color.Blue()
-                part.set_color(r, g, b)
+        :return: The name of the restored stage or *None* if there are no
+            saved stages.
+        :rtype: str or None
+        """
+        name = self.last_stage
+        if name is not None:
+            self.restore(name)
+        return name
 
-        return True
+    def clear(self):
+        """
+        Remove all stages and stored shapes.
+
+        :return: None.
+        """
+        self._stages = []
+        for fn in os.listdir(self._shape_path):
+            os.remove(os.path.join(self._shape_path, fn))
+        self._write_manifest()
+
+    def _write_manifest(self):
+        """
+        Write the manifest using a temporary file so it is not left
+        incomplete if the process fails.
+        """
+        tmp_fn = self._manifest_fn + '.tmp'
+        with open(tmp_fn, 'w') as fout:
+            json.dump({'version': 1, 'stages': self._stages}, fout)
+        if os.path.isfile(self._manifest_fn):
+            os.remove(self._manifest_fn)
+        os.rename(tmp_fn, self._manifest_fn)
+
+    def _write_shape(self, shape):
+        """
+        Write a shape and return its content hash. The shape is always
+        serialized so that changes made in place are not missed, but it is
+        only stored if no shape with the same content exists.
+        """
+        if shape is None:
+            return None
+
+        digest, tmp_fn = _write_shape_file(shape, self._shape_path)
+        fn = os.path.join(self._shape_path, digest + '.bin')
+        if os.path.isfile(fn):
+            os.remove(tmp_fn)
+            return digest
+        try:
+            os.rename(tmp_fn, fn)
+        except OSError:
+            # Another process stored the same content first
+            os.remove(tmp_fn)
+        return digest
+
+    def _read_shape(self, digest):
+        """
+        Read a shape by its content hash.
+        """
+        if digest is None:
+            return None
+        shape = TopoDS_Shape()
+        BinTools.Read_(shape, os.path.join(self._shape_path, digest + '.bin'))
+        return Shape.wrap(shape)
+
+
+def _export_file(args):
+    """
+    Write the shapes read from a BREP file to a STEP or IGES file. Used by
+    the worker processes of GroupAPI.export_groups.
+    """
+    from afem.exchange.iges import IgesWrite
+    from afem.exchange.step import StepWrite
+
+    fmt, fn, brep_fn, names, schema, units, _ = args
+    t0 = time.time()
+    shapes = list(read_brep(brep_fn).shape_iter)
+    if fmt == 'step':
+        writer = StepWrite(schema, units)
+        writer.transfer(*shapes)
+    else:
+        if units is None:
+            writer = IgesWrite()
+        else:
+            writer = IgesWrite(units)
+        for shape in shapes:
+            writer.add_shape(shape)
+    for shape, name in zip(shapes, names):
+        writer.set_name(shape, name)
+    status = writer.write(fn)
+    dt = time.time() - t0
+
+    size = os.path.getsize(fn) if os.path.isfile(fn) else 0
+    return bool(status), dt, size
+
+
+# Types that can be saved in metadata
+_metadata_types = {'Material': Material,
+                   'Isotropic': Isotropic,
+                   'Property': Property,
+                   'Shell': Shell}
+
+
+def _encode_metadata(metadata):
+    """
+    Convert metadata to a dictionary that can be serialized to JSON.
+    Materials and properties are stored by their type name and data. Other
+    values that cannot be serialized are skipped.
+    """
+    data = {}
+    for key, value in metadata.items():
+        if isinstance(value, (Material, Property)):
+            attrs = dict([(k.lstrip('_'), v) for k, v in vars(value).items()
+                          if k not in ['_name', '_metadata']])
+            value = {'__type__': value.__class__.__name__,
+                     'name': value.name,
+                     'data': attrs}
+        try:
+            json.dumps({key: value})
+        except (TypeError, ValueError):
+            logger.info('Skipping metadata that cannot be saved: '
+                        '{}'.format(key))
+            continue
+        data[key] = value
+    return data
+
+
+def _decode_metadata(data):
+    """
+    Convert saved metadata back to values.
+    """
+    metadata = {}
+    for key, value in data.items():
+        if isinstance(value, dict) and '__type__' in value:
+            type_ = _metadata_types.get(value['__type__'])
+            if type_ is None:
+                continue
+            value = type_(value['name'], **value['data'])
+        metadata[key] = value
+    return metadata
+
+
+def _part_signature(part, record):
+    """
+    Signature used to detect if a part changed between saves. Shapes and
+    reference geometry are compared by the content of their binary format.
+    """
+    color = part.color
+    if color is not None:
+        color = (color.Red(), color.Green(), color.Blue())
+    cref, sref = None, None
+    if part.has_cref:
+        cref = _shape_digest(EdgeByCurve(part.cref).edge)
+    if part.has_sref:
+        sref = _shape_digest(FaceBySurface(part.sref).face)
+    return (part.name, part.type, _shape_digest(part.shape), cref, sref,
+            record, color)
+
+
+def _shape_digest(shape):
+    """
+    Content hash of a shape in binary format.
+    """
+    if shape is None:
+        return None
+    digest, tmp_fn = _write_shape_file(shape)
+    os.remove(tmp_fn)
+    return digest
+
+
+def _write_shape_file(shape, path=None):
+    """
+    Write a shape in binary format to a new temporary file in the directory
+    and return the content hash and the filename.
+    """
+    fd, tmp_fn = tempfile.mkstemp('.tmp', dir=path)
+    os.close(fd)
+    BinTools.Write_(shape.object, tmp_fn)
+    with open(tmp_fn, 'rb') as fin:
+        digest = md5(fin.read()).hexdigest()
+    return digest, tmp_fn
+
+
+def _all_part_labels(index):
+    """
+    Get the name, type, label, and reference geometry of every part label in
+    the index. Reference geometry is matched to parts by name.
+    """
+    crefs, srefs = {}, {}
+    part_data = []
+    for name, type_, label in index.records:
+        if name is None or type_ is None:
+            continue
+        # Check for reference geometry
+        if type_ == 'CREF':
+            shape = label.shape
+            if shape is not None:
+                crefs[name] = shape.curve
+            continue
+        if type_ == 'SREF':
+            shape = label.shape
+            if shape is not None:
+                srefs[name] = shape.surface
+            continue
+        part_data.append((name, type_, label))
+    return [(name, type_, label, crefs.get(name), srefs.get(name))
+            for name, type_, label in part_data]
+
+
+def _part_label(index, name):
+    """
+    Get the name, type, label, and reference geometry of the first part label
+    with the given name.
+    """
+    part_type, part_label = None, None
+    cref, sref = None, None
+    for type_, label in index.by_name(name):
+        if type_ is None:
+            continue
+        # Check for reference geometry
+        if type_ == 'CREF':
+            shape = label.shape
+            if shape is not None:
+                cref = shape.curve
+            continue
+        if type_ == 'SREF':
+            shape = label.shape
+            if shape is not None:
+                sref = shape.surface
+            continue
+        if part_label is None:
+            part_type, part_label = type_, label
+
+    if part_label is None:
+        msg = 'Part not found in document: {}'.format(name)
+        raise KeyError(msg)
+    return name, part_type, part_label, cref, sref
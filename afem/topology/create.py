@@ -34,6 +34,7 @@ from OCCT.ShapeAnalysis import ShapeAnalysis_FreeBounds
 from OCCT.TopLoc import TopLoc_Location
 from OCCT.TopTools import TopTools_HSequenceOfShape
 from OCCT.TopoDS import TopoDS_Compound, TopoDS_Shell
+from numpy import array, dot
 
 from afem.adaptor.entities import AdaptorCurve
 from afem.geometry.check import CheckGeom
@@ -44,7 +45,7 @@ from afem.geometry.entities import Geometry, Curve, Plane
 from afem.geometry.project import ProjectPointToCurve
 from afem.topology.bop import IntersectShapes
 from afem.topology.entities import (Shape, Vertex, Edge, Wire, Face, Shell,
-                                    Solid, Compound)
+                                    Solid, Compound, BBox)
 
 __all__ = ["VertexByPoint",
            "EdgeByPoints", "EdgeByVertices", "EdgeByCurve", "EdgeByDrag",
@@ -62,7 +63,8 @@ __all__ = ["VertexByPoint",
            "SphereByRadius", "SphereBy3Points",
            "PointAlongShape", "PointsAlongShapeByNumber",
            "PointsAlongShapeByDistance",
-           "PlaneByEdges", "PlaneByIntersectingShapes"]
+           "PlaneByEdges", "PlaneByIntersectingShapes",
+           "SectionShapeByPlanes"]
 
 
 # VERTEX ----------------------------------------------------------------------
@@ -1750,6 +1752,205 @@ class PlaneByIntersectingShapes(object):
         return self._pln
 
 
+# SECTION ---------------------------------------------------------------------
+
+class SectionShapeByPlanes(object):
+    """
+    Section a shape with many planes. The bounding boxes of the faces of the
+    shape are computed once and shared by all planes, and only the faces
+    whose bounding box is intersected by a plane are sectioned by it. The
+    section edges of each plane are connected into wires, and faces are
+    built from the closed wires.
+
+    :param afem.topology.entities.Shape shape: The shape.
+    :param collections.Sequence(afem.geometry.entities.Plane) planes: The
+        planes.
+    :param float tol: The tolerance used to enlarge the face bounding boxes.
+        If *None* then the maximum tolerance of the shape is used.
+    :param bool parallel: If *True*, then the shape is sectioned by bounded
+        faces of all the planes in a single Boolean operation that runs in
+        parallel threads. If *False*, each plane is sectioned independently.
+    :param bool approximate: Option to approximate intersection curves.
+
+    Usage:
+
+    >>> from afem.geometry import PlaneByAxes
+    >>> from afem.topology import BoxBySize, SectionShapeByPlanes
+    >>> box = BoxBySize(10., 10., 10.).solid
+    >>> planes = [PlaneByAxes((0., 0., z), 'xy').plane for z in (1., 5., 20.)]
+    >>> builder = SectionShapeByPlanes(box, planes)
+    >>> [len(faces) for faces in builder.faces]
+    [1, 1, 0]
+    """
+
+    def __init__(self, shape, planes, tol=None, parallel=False,
+                 approximate=False):
+        if tol is None:
+            tol = shape.tol_max
+
+        faces = shape.faces
+        self._planes = list(planes)
+
+        # Face bounding box corners shared by all planes
+        corners = []
+        for face in faces:
+            bbox = BBox()
+            bbox.add_shape(face)
+            bbox.enlarge(tol)
+            xmin, xmax = bbox.xmin, bbox.xmax
+            ymin, ymax = bbox.ymin, bbox.ymax
+            zmin, zmax = bbox.zmin, bbox.zmax
+            corners.append([(x, y, z) for x in (xmin, xmax)
+                            for y in (ymin, ymax) for z in (zmin, zmax)])
+        corners = array(corners, dtype=float).reshape(-1, 8, 3)
+
+        # Faces that each plane can intersect based on the sign of the
+        # distance from the plane to the bounding box corners
+        candidates = []
+        for pln in self._planes:
+            gp_pln = pln.gp_pln
+            origin = _xyz(gp_pln.Location())
+            normal = _xyz(gp_pln.Axis().Direction())
+            d = dot(corners - origin, normal)
+            indices = ((d.min(axis=1) <= 0.) & (d.max(axis=1) >= 0.))
+            candidates.append([i for i in range(len(faces)) if indices[i]])
+        self._ncandidates = [len(indices) for indices in candidates]
+
+        self._is_done = True
+        if parallel:
+            edges = self._section_all(faces, corners, candidates,
+                                      approximate)
+        else:
+            edges = []
+            for pln, indices in zip(self._planes, candidates):
+                if not indices:
+                    edges.append([])
+                    continue
+                cmp = Compound.by_shapes([faces[i] for i in indices])
+                bop = IntersectShapes(cmp, pln, approximate=approximate)
+                if not bop.is_done:
+                    self._is_done = False
+                    edges.append([])
+                    continue
+                edges.append(bop.edges)
+
+        self._edges = edges
+        self._wires = []
+        self._faces = []
+        for plane_edges in edges:
+            if not plane_edges:
+                self._wires.append([])
+                self._faces.append([])
+                continue
+            wires = WiresByConnectedEdges(plane_edges).wires
+            self._wires.append(wires)
+            self._faces.append([FaceByPlanarWire(w).face for w in wires
+                                if w.closed])
+
+    def _section_all(self, faces, corners, candidates, approximate):
+        """
+        Section all faces by bounded faces of the planes in one operation.
+        """
+        indices = sorted(set([i for plane_indices in candidates
+                              for i in plane_indices]))
+        if not indices:
+            return [[] for _ in self._planes]
+
+        # Bounded plane faces covering the candidate faces of each plane
+        pln_faces = []
+        for pln, plane_indices in zip(self._planes, candidates):
+            if not plane_indices:
+                continue
+            gp_pln = pln.gp_pln
+            pos = gp_pln.Position()
+            origin = _xyz(pos.Location())
+            xdir = _xyz(pos.XDirection())
+            ydir = _xyz(pos.YDirection())
+            pnts = corners[plane_indices].reshape(-1, 3) - origin
+            u, v = dot(pnts, xdir), dot(pnts, ydir)
+            face = FaceByPlane(pln, u.min(), u.max(), v.min(), v.max()).face
+            pln_faces.append((face, len(pln_faces)))
+
+        cmp1 = Compound.by_shapes([faces[i] for i in indices])
+        cmp2 = Compound.by_shapes([f for f, _ in pln_faces])
+        bop = IntersectShapes(cmp1, cmp2, compute_pcurve2=True,
+                              approximate=approximate)
+
+        # Assign section edges to the plane they came from
+        plane_ids = [i for i, plane_indices in enumerate(candidates)
+                     if plane_indices]
+        edges = [[] for _ in self._planes]
+        if not bop.is_done:
+            self._is_done = False
+            return edges
+        for edge in bop.edges:
+            found, face = bop.has_ancestor_face2(edge)
+            if not found:
+                continue
+            for pln_face, i in pln_faces:
+                if face.is_same(pln_face):
+                    edges[plane_ids[i]].append(edge)
+                    break
+        return edges
+
+    @property
+    def is_done(self):
+        """
+        :return: *True* if done, *False* if not.
+        :rtype: bool
+        """
+        return self._is_done
+
+    @property
+    def planes(self):
+        """
+        :return: The planes.
+        :rtype: list(afem.geometry.entities.Plane)
+        """
+        return self._planes
+
+    @property
+    def ncandidates(self):
+        """
+        :return: The number of faces sectioned by each plane after skipping
+            the faces whose bounding box is not intersected by the plane.
+        :rtype: list(int)
+        """
+        return self._ncandidates
+
+    @property
+    def edges(self):
+        """
+        :return: The section edges of each plane.
+        :rtype: list(list(afem.topology.entities.Edge))
+        """
+        return self._edges
+
+    @property
+    def wires(self):
+        """
+        :return: The section wires of each plane.
+        :rtype: list(list(afem.topology.entities.Wire))
+        """
+        return self._wires
+
+    @property
+    def faces(self):
+        """
+        :return: The faces built from the closed section wires of each
+            plane.
+        :rtype: list(list(afem.topology.entities.Face))
+        """
+        return self._faces
+
+
+def _xyz(v):
+    """
+    Get the components of a point or direction as an array.
+    """
+    return array([v.X(), v.Y(), v.Z()], dtype=float)
+
+
 if __name__ == "__main__":
     import doctest
 
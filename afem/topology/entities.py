@@ -528,6 +528,25 @@ class Shape(ViewableItem):
 
         return shared_edges
 
+    def sections(self, planes, tol=None, parallel=False):
+        """
+        Section this shape with many planes in one call.
+
+        :param collections.Sequence(afem.geometry.entities.Plane) planes: The
+            planes.
+        :param float tol: The tolerance used to enlarge the face bounding
+            boxes. If *None* then the maximum tolerance of the shape is used.
+        :param bool parallel: Option to section by all planes in a single
+            Boolean operation that runs in parallel threads.
+
+        :return: The section tool containing the edges, wires, and faces of
+            each plane.
+        :rtype: afem.topology.create.SectionShapeByPlanes
+        """
+        from afem.topology.create import SectionShapeByPlanes
+
+        return SectionShapeByPlanes(self, planes, tol, parallel)
+
     @staticmethod
     def wrap(shape):
         """
@@ -26,11 +26,18 @@ from OCCT.BRepOffsetAPI import (BRepOffsetAPI_MakeOffsetShape,
                                 BRepOffsetAPI_NormalProjection,
                                 BRepOffsetAPI_ThruSections)
 
+from numpy import array
+from numpy.linalg import norm
+
+from afem.geometry.create import NurbsSurfaceByFit
 from afem.geometry.entities import Geometry, Curve
+from afem.topology.create import (FaceByPlanarWire, FaceBySurface,
+                                  PointsAlongShapeByNumber, ShellBySewing,
+                                  SolidByShell)
 from afem.topology.entities import Shape, Wire
 
-__all__ = ["ProjectShape", "OffsetShape", "LoftShape", "SweepShape",
-           "SweepShapeWithNormal"]
+__all__ = ["ProjectShape", "OffsetShape", "LoftShape", "LoftShapeByFit",
+           "SweepShape", "SweepShapeWithNormal"]
 
 
 class ProjectShape(object):
@@ -205,6 +212,10 @@ class LoftShape(object):
 
     :raise TypeError: If any of the sections cannot be added to the tool
         because they are of the wrong type.
+
+    .. note::
+
+        For a large number of sections consider :class:`.LoftShapeByFit`.
     """
 
     def __init__(self, sections, is_solid=False, make_ruled=False,
@@ -296,6 +307,123 @@ class LoftShape(object):
         return Shape.wrap(self._tool.GeneratedFace(edge.object))
 
 
+class LoftShapeByFit(object):
+    """
+    Loft a shape through many sections by fitting a single surface. Each
+    section is sampled with the same number of points at equal arc length so
+    the sections share one parameterization. The rows of points are then
+    fit by :class:`.NurbsSurfaceByFit`, which uses one knot vector for all
+    the sections and approximates the spanwise direction to the tolerance.
+    The cost grows linearly with the number of sections and points, and the
+    size of the control net only grows as needed to reach the tolerance.
+    This is intended for cases where :class:`.LoftShape` becomes slow or
+    produces very dense surfaces, usually with dozens of sections or more.
+
+    :param sections: The sections of the loft. They should have the same
+        orientation and start at corresponding points.
+    :type sections: collections.Sequence(afem.topology.entities.Edge or
+        afem.topology.entities.Wire)
+    :param bool is_solid: If *True* the tool will build a solid, otherwise
+        it will build a shell. The first and last sections must be closed
+        and planar to build a solid.
+    :param int npts: Number of points to sample along each section.
+    :param float tol: The tolerance of the fit.
+    :param int p: Degree along the sections.
+    :param int q: Degree in the spanwise direction.
+
+    :raise TypeError: If any of the sections are not an edge or wire.
+    :raise ValueError: If there are fewer than two sections.
+    :raise RuntimeError: If a solid is requested and the faces cannot be
+        sewn into a single shell.
+    """
+
+    def __init__(self, sections, is_solid=False, npts=100, tol=1.0e-3, p=3,
+                 q=3):
+        wires = []
+        for section in sections:
+            if section.is_edge:
+                wires.append(Wire.by_edge(section))
+            elif section.is_wire:
+                wires.append(section)
+            else:
+                raise TypeError('Invalid shape type in loft.')
+        if len(wires) < 2:
+            raise ValueError('At least two sections are required.')
+
+        # Sample each section at the same number of points
+        pnts = array([PointsAlongShapeByNumber(w, npts).point_array.xyz
+                      for w in wires])
+        fit = NurbsSurfaceByFit(pnts, p, q, tol)
+        srf = fit.surface
+
+        # If the sections are closed then make the surface closed by
+        # averaging the first and last rows of control points and measure
+        # the error of the modified surface again
+        max_error = fit.max_error
+        gaps = norm(pnts[:, 0] - pnts[:, -1], axis=-1)
+        if gaps.max() <= tol:
+            cp = srf.cp
+            nu = cp.shape[0]
+            row = 0.5 * (cp[0] + cp[-1])
+            srf.set_cp_row(1, row)
+            srf.set_cp_row(nu, row)
+            uprms, vprms = fit.parameters
+            max_error = max([norm(srf.eval(u, v).xyz - pnts[i, j])
+                             for i, v in enumerate(vprms)
+                             for j, u in enumerate(uprms)])
+
+        face = FaceBySurface(srf).face
+        if is_solid:
+            cap1 = FaceByPlanarWire(wires[0]).face
+            cap2 = FaceByPlanarWire(wires[-1]).face
+            sew = ShellBySewing([face, cap1, cap2], tol)
+            if sew.nshells != 1:
+                msg = 'Failed to sew the loft into a single shell.'
+                raise RuntimeError(msg)
+            self._shape = SolidByShell(sew.shell).solid
+        else:
+            self._shape = face.to_shell()
+
+        self._srf = srf
+        self._max_error = float(max_error)
+        self._npoles = fit.npoles
+
+    @property
+    def shape(self):
+        """
+        :return: The lofted shape.
+        :rtype: afem.topology.entities.Shell or afem.topology.entities.Solid
+        """
+        return self._shape
+
+    @property
+    def surface(self):
+        """
+        :return: The fitted surface.
+        :rtype: afem.geometry.entities.NurbsSurface
+        """
+        return self._srf
+
+    @property
+    def max_error(self):
+        """
+        :return: Maximum distance between the section points and the
+            surface at the point parameters. For closed sections this is
+            measured after the surface is closed.
+        :rtype: float
+        """
+        return self._max_error
+
+    @property
+    def npoles(self):
+        """
+        :return: Size of the control net as the number of control points
+            along the sections and in the spanwise direction.
+        :rtype: tuple(int)
+        """
+        return self._npoles
+
+
 class SweepShape(object):
     """
     Sweep a profile along a spine.
@@ -0,0 +1,120 @@
+from timeit import repeat
+
+from OCCT.TColStd import TColStd_Array1OfReal, TColStd_Array2OfReal
+from OCCT.TColgp import TColgp_Array1OfPnt, TColgp_Array2OfPnt
+from OCCT.gp import gp_Pnt
+from numpy import random, zeros
+
+from afem.occ import utils as occ_utils
+
+# Size of the point grid. This is a dense grid like the ones used by
+# NurbsSurfaceByApprox.
+N = 200
+NREPEAT = 5
+
+xyz1 = random.rand(N * N, 3)
+xyz2 = random.rand(N, N, 3)
+flts1 = random.rand(N * N)
+flts2 = random.rand(N, N)
+
+
+# The element by element loops used before the bulk conversion paths.
+def loop_to_tcolgp_array1_pnt(pnts):
+    gp_pnts = []
+    for gp in pnts:
+        gp = occ_utils.to_gp_pnt(gp)
+        if not gp:
+            continue
+        gp_pnts.append(gp)
+    array = TColgp_Array1OfPnt(1, len(gp_pnts))
+    for i, gp in enumerate(gp_pnts, 1):
+        array.SetValue(i, gp)
+    return array
+
+
+def loop_to_tcolgp_array2_pnt(pnts):
+    n, m = pnts.shape[0:2]
+    gp_pnts = []
+    for i in range(0, n):
+        row = []
+        for j in range(0, m):
+            row.append(occ_utils.to_gp_pnt(pnts[i, j]))
+        gp_pnts.append(row)
+    array = TColgp_Array2OfPnt(1, n, 1, m)
+    for i, row in enumerate(gp_pnts, 1):
+        for j, gp in enumerate(row, 1):
+            array.SetValue(i, j, gp)
+    return array
+
+
+def loop_to_tcolstd_array1_real(array):
+    flts = [float(x) for x in array]
+    array = TColStd_Array1OfReal(1, len(flts))
+    for i, x in enumerate(flts, 1):
+        array.SetValue(i, x)
+    return array
+
+
+def loop_to_tcolstd_array2_real(flts):
+    n, m = flts.shape
+    array = TColStd_Array2OfReal(1, n, 1, m)
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            array.SetValue(i, j, float(flts[i - 1, j - 1]))
+    return array
+
+
+def loop_to_np_from_tcolgp_array2_pnt(tcol_array):
+    n, m = tcol_array.ColLength(), tcol_array.RowLength()
+    array = zeros((n, m, 3), dtype=float)
+    for i in range(n):
+        for j in range(m):
+            p = tcol_array.Value(i + 1, j + 1)
+            array[i, j, :] = p.X(), p.Y(), p.Z()
+    return array
+
+
+def loop_to_np_from_tcolstd_array1_real(tcol_array):
+    n = tcol_array.Length()
+    array = zeros(n, dtype=float)
+    for i in range(n):
+        array[i] = tcol_array.Value(i + 1)
+    return array
+
+
+def best_time(func, *args):
+    return min(repeat(lambda: func(*args), number=1, repeat=NREPEAT))
+
+
+tcol_pnts2 = occ_utils.to_tcolgp_array2_pnt(xyz2)
+tcol_flts1 = occ_utils.to_tcolstd_array1_real(flts1)
+
+cases = [
+    ('to_tcolgp_array1_pnt', loop_to_tcolgp_array1_pnt,
+     occ_utils.to_tcolgp_array1_pnt, xyz1),
+    ('to_tcolgp_array2_pnt', loop_to_tcolgp_array2_pnt,
+     occ_utils.to_tcolgp_array2_pnt, xyz2),
+    ('to_tcolstd_array1_real', loop_to_tcolstd_array1_real,
+     occ_utils.to_tcolstd_array1_real, flts1),
+    ('to_tcolstd_array2_real', loop_to_tcolstd_array2_real,
+     occ_utils.to_tcolstd_array2_real, flts2),
+    ('to_np_from_tcolgp_array2_pnt', loop_to_np_from_tcolgp_array2_pnt,
+     occ_utils.to_np_from_tcolgp_array2_pnt, tcol_pnts2),
+    ('to_np_from_tcolstd_array1_real', loop_to_np_from_tcolstd_array1_real,
+     occ_utils.to_np_from_tcolstd_array1_real, tcol_flts1),
+]
+
+print('{0} values per conversion, best of {1}'.format(N * N, NREPEAT))
+print('{0:<32} {1:>10} {2:>10} {3:>8}'.format('Converter', 'Loop (s)',
+                                              'Bulk (s)', 'Speedup'))
+for name, loop_func, bulk_func, data in cases:
+    t1 = best_time(loop_func, data)
+    t2 = best_time(bulk_func, data)
+    print('{0:<32} {1:>10.4f} {2:>10.4f} {3:>8.1f}'.format(name, t1, t2,
+                                                           t1 / t2))
+
+# Check the bulk paths give the same values as the loops
+p1 = loop_to_tcolgp_array2_pnt(xyz2).Value(N, N)
+p2 = occ_utils.to_tcolgp_array2_pnt(xyz2).Value(N, N)
+assert p1.IsEqual(p2, 0.)
+assert isinstance(p2, gp_Pnt)
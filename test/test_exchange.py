@@ -0,0 +1,263 @@
+# This file is part of AFEM which provides an engineering toolkit for airframe
+# finite element modeling during conceptual design.
+#
+# Copyright (C) 2016-2018  Laughlin Research, LLC (info@laughlinresearch.com)
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+import os
+import shutil
+import tempfile
+import unittest
+
+from OCCT.TopLoc import TopLoc_Location
+from OCCT.gp import gp_Trsf, gp_Vec
+from numpy import array
+from numpy.testing import assert_array_equal
+
+from afem.exchange import *
+from afem.topology import *
+
+
+class _ArrayDS(object):
+    def __init__(self, nids, xyz, eids, conn):
+        self._nodes = array(nids), array(xyz, dtype=float)
+        self._faces = array(eids), array(conn)
+
+    def node_arrays(self):
+        return self._nodes
+
+    def face_arrays(self):
+        return self._faces
+
+
+class _ArrayMesh(object):
+    def __init__(self, *args):
+        self.ds = _ArrayDS(*args)
+
+
+class _ArrayPart(object):
+    def __init__(self, name, eids, conn):
+        self.name = name
+        self.metadata = {'thickness': 0.1, 'not json': object()}
+        self.submesh = _ArrayMesh([], [], eids, conn)
+
+
+class _ShapePart(object):
+    def __init__(self, name, shape):
+        self.name = name
+        self.shape = shape
+
+
+class TestExchangeAbm(unittest.TestCase):
+    """
+    Test cases for afem.exchange.abm.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.fn = os.path.join(self.tmp_dir, 'mesh.abm')
+        nids = [1, 2, 3, 4, 5]
+        xyz = [(0., 0., 0.), (1., 0., 0.), (1., 1., 0.), (0., 1., 0.),
+               (2., 0., 0.)]
+        self.mesh = _ArrayMesh(nids, xyz, [20, 10],
+                               [[1, 2, 3, 4], [2, 5, 3, 0]])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_round_trip(self):
+        part = _ArrayPart('skin', [10], [[2, 5, 3, 0]])
+        self.assertTrue(export_abm(self.mesh, self.fn, [part], {'a': 1}))
+
+        bmesh = BinaryMesh(self.fn)
+        self.assertEqual(bmesh.num_nodes, 5)
+        self.assertEqual(bmesh.num_elms, 2)
+        assert_array_equal(bmesh.eids, [20, 10])
+        assert_array_equal(bmesh.pids, [0, 1])
+        assert_array_equal(bmesh.groups['skin'], [10])
+        self.assertEqual(bmesh.properties('skin'), {'thickness': 0.1})
+        self.assertEqual(bmesh.metadata, {'a': 1})
+
+        bmesh = BinaryMesh(self.fn, mmap=False)
+        assert_array_equal(bmesh.conn, [[1, 2, 3, 4], [2, 5, 3, 0]])
+
+    def test_missing_part_elements(self):
+        part = _ArrayPart('skin', [10, 30], [[2, 5, 3, 0], [1, 2, 3, 0]])
+        self.assertRaises(ValueError, export_abm, self.mesh, self.fn, [part])
+        part = _ArrayPart('skin', [5], [[2, 5, 3, 0]])
+        self.assertRaises(ValueError, export_abm, self.mesh, self.fn, [part])
+
+
+class TestExchangeStep(unittest.TestCase):
+    """
+    Test cases for afem.exchange.step.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_named_shapes_location(self):
+        trsf = gp_Trsf()
+        trsf.SetTranslation(gp_Vec(20., 0., 0.))
+        box = BoxBySize(10., 10., 10.).solid
+        box = Shape.wrap(box.object.Located(TopLoc_Location(trsf)))
+        compound = CompoundByShapes([box]).compound
+
+        fn = os.path.join(self.tmp_dir, 'box.stp')
+        writer = StepWrite(assembly_mode=1)
+        self.assertTrue(writer.transfer(compound))
+        self.assertTrue(writer.set_name(box, 'box'))
+        self.assertTrue(writer.write(fn))
+
+        reader = StepRead(fn)
+        named = list(reader.named_shapes(Shape.SOLID))
+        self.assertEqual(len(named), 1)
+        shape, name = named[0]
+        self.assertEqual(name, 'box')
+        self.assertEqual(reader.name_from_shape(shape), 'box')
+        p = VolumeProps(shape).cg
+        self.assertAlmostEqual(p.x, 25.)
+        self.assertAlmostEqual(p.y, 5.)
+        self.assertAlmostEqual(p.z, 5.)
+
+
+class TestExchangeStl(unittest.TestCase):
+    """
+    Test cases for afem.exchange.stl.
+    """
+
+    def test_tessellate_parts(self):
+        box1 = BoxBySize(1., 1., 1.).solid
+        box2 = BoxBy2Points((2., 0., 0.), (3., 1., 1.)).solid
+        part1 = _ShapePart('box', box1)
+        part2 = _ShapePart('box', box2)
+        results = tessellate_parts([part1, part2], parallel=False)
+        self.assertEqual(list(results.keys()), [part1, part2])
+        for part in (part1, part2):
+            xyz, tri = results[part]
+            self.assertEqual(tri.shape, (12, 3))
+            self.assertLess(tri.max(), xyz.shape[0])
+        self.assertGreaterEqual(results[part2][0][:, 0].min(), 2.)
+
+    def test_write_binary_stl(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            fn = os.path.join(tmp_dir, 'tri.stl')
+            xyz = [(0., 0., 0.), (1., 0., 0.), (0., 1., 0.)]
+            write_binary_stl(fn, xyz, [(0, 1, 2)], 'tri')
+            self.assertEqual(os.path.getsize(fn), 80 + 4 + 50)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+class TestExchangeVsp(unittest.TestCase):
+    """
+    Test cases for afem.exchange.vsp.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_import_cache(self):
+        fn = './test_io/777-200LR.stp'
+        cache = ImportVSPCache(self.tmp_dir)
+        vsp1 = ImportVSP(fn, cache=cache)
+        self.assertEqual(len(cache), 1)
+        ninvalid = len(vsp1.invalid_shapes)
+
+        # Second import from the cache
+        vsp2 = ImportVSP(fn, cache=cache)
+        self.assertEqual(sorted(vsp2.bodies), sorted(vsp1.bodies))
+        self.assertEqual(len(vsp2.invalid_shapes), ninvalid)
+
+        # Invalid shapes are only added once per import
+        vsp2.import_step(fn)
+        self.assertEqual(len(vsp2.invalid_shapes), 2 * ninvalid)
+
+
+class TestExchangeXde(unittest.TestCase):
+    """
+    Test cases for afem.exchange.xde.
+    """
+
+    def setUp(self):
+        self.box1 = BoxBySize(1., 1., 1.).solid
+        self.box2 = BoxBy2Points((2., 0., 0.), (3., 1., 1.)).solid
+        self.compound = CompoundByShapes([self.box1, self.box2]).compound
+
+    def test_index_names(self):
+        doc = XdeDocument()
+        doc.add_shape(self.box1, 'a', False)
+        doc.add_shape(self.box2, 'b', False)
+        doc.add_shape(self.compound, 'a', False)
+        self.assertEqual(doc.index.names, ['a', 'b'])
+        self.assertEqual(len(doc.index.by_name('a')), 2)
+
+    def test_find_shape_sub_shape(self):
+        doc = XdeDocument()
+        self.assertEqual(len(doc.index), 0)
+        doc.add_shape(self.compound, 'assy')
+        self.assertIsNotNone(doc.find_shape(self.compound))
+        self.assertIsNotNone(doc.find_shape(self.box1))
+        self.assertIsNotNone(doc.find_shape(self.box2))
+
+    def test_index_rename_untracked(self):
+        doc = XdeDocument()
+        label = doc.add_shape(self.box1, 'a', False)
+        self.assertIsNotNone(doc.get_shape_by_name('a'))
+
+        label.set_name('b')
+        self.assertIsNone(doc.get_shape_by_name('a'))
+        self.assertTrue(doc.get_shape_by_name('b').is_equal(label))
+
+        XdeLabel(label.object).set_name('c')
+        self.assertIsNone(doc.get_shape_by_name('b'))
+        self.assertIsNotNone(doc.get_shape_by_name('c'))
+
+    def test_index_sub_shape_name(self):
+        doc = XdeDocument()
+        label = doc.add_shape(self.box1, 'box', False)
+        self.assertEqual(doc.index.names, ['box'])
+        face = self.box1.faces[0]
+        sub_label = doc.add_subshape(label, face, 'face')
+        self.assertIsNotNone(sub_label)
+        found = doc.find_subshape(label, face)
+        found.set_name('face2')
+        self.assertEqual(doc.index.names, ['box'])
+        self.assertEqual(len(doc.index), 1)
+
+    def test_index_same_tag(self):
+        doc = XdeDocument()
+        assy = doc.add_shape(self.compound, 'assy')
+        child = list(assy.children_iter)[0]
+        self.assertNotEqual(child.entry, assy.entry)
+
+        index = XdeLabelIndex()
+        index.add(assy)
+        index.add(child)
+        self.assertEqual(len(index), 2)
+        index.remove(child)
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.records[0][2].entry, assy.entry)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -65,6 +65,13 @@ class TestGeometryCreate(unittest.TestCase):
         self.assertAlmostEqual(u1, 0.)
         self.assertAlmostEqual(u2, 5.)
         self.assertAlmostEqual(u3, 10.)
+        pnts = builder.point_array
+        self.assertIsInstance(pnts, PointArray)
+        self.assertEqual(len(pnts), 3)
+        self.assertAlmostEqual(pnts[1].x, 5.)
+        self.assertAlmostEqual(pnts.xyz[2, 0], 10.)
+        c = NurbsCurveByPoints(pnts).curve
+        self.assertAlmostEqual(c.p2.x, 10.)
 
     def test_points_along_curve_by_distance(self):
         p1 = Point()
@@ -361,6 +368,21 @@ class TestGeometryCreate(unittest.TestCase):
         self.assertAlmostEqual(p.y, 5.)
         self.assertAlmostEqual(p.z, 5.)
 
+    def test_nurbs_surface_by_fit(self):
+        pnts = [[(0.5 * i, float(j), 0.01 * (0.5 * i) ** 2 + 0.1 * j)
+                 for i in range(41)] for j in range(11)]
+        builder = NurbsSurfaceByFit(pnts, tol=1.0e-3)
+        s = builder.surface
+        self.assertIsInstance(s, NurbsSurface)
+        self.assertLessEqual(builder.max_error, 1.0e-3)
+        nu, nv = builder.npoles
+        self.assertLess(nu, 41)
+        self.assertLess(nv, 11)
+        p = s.eval(s.u2, s.v2)
+        self.assertAlmostEqual(p.x, 20., places=2)
+        self.assertAlmostEqual(p.y, 10., places=2)
+        self.assertAlmostEqual(p.z, 5., places=2)
+
 
 class TestGeometryDistance(unittest.TestCase):
     """
@@ -389,6 +411,10 @@ class TestGeometryIntersect(unittest.TestCase):
         self.assertAlmostEqual(p.x, 5.)
         self.assertAlmostEqual(p.y, 0.)
         self.assertAlmostEqual(p.z, 0.)
+        d, i = cci.query_points([(5., 1., 0.), (5., 10., 0.)], 2.)
+        self.assertAlmostEqual(d[0], 1.)
+        self.assertEqual(i[0], 0)
+        self.assertEqual(i[1], cci.npts)
 
     def test_intersect_curve_surface(self):
         c = NurbsCurveByPoints([(5., 5., 10.), (5., 5., -10.)]).curve
@@ -419,6 +445,32 @@ class TestGeometryIntersect(unittest.TestCase):
         self.assertAlmostEqual(p.y, 5., places=3)
         self.assertAlmostEqual(p.z, 5., places=3)
 
+    def test_intersect_surface_surfaces(self):
+        c1 = NurbsCurveByPoints([(0., 0., 0.), (10., 0., 0.)]).curve
+        c2 = NurbsCurveByPoints([(0., 5., 5.), (10., 5., 5.)]).curve
+        c3 = NurbsCurveByPoints([(0., 10., 0.), (10., 10., 0.)]).curve
+        s = NurbsSurfaceByApprox([c1, c2, c3]).surface
+        tools = [PlaneByNormal((x, 5., 0.), (1., 0., 0.)).plane
+                 for x in (2., 5., 20.)]
+        ssi = IntersectSurfaceSurfaces(s, tools, [1.0e-7, 1.0e-5, 1.0e-7])
+        self.assertEqual(ssi.ntools, 3)
+        self.assertEqual(ssi.is_skipped, [False, False, True])
+        self.assertEqual([r.ncrvs for r in ssi.results], [1, 1, 0])
+        p = ssi.curves[1][0].eval(0.5)
+        self.assertAlmostEqual(p.x, 5., places=3)
+
+    def test_curve_set_index(self):
+        c1 = NurbsCurveByPoints([(0., 0., 0.), (10., 0., 0.)]).curve
+        c2 = NurbsCurveByPoints([(0., 5., 0.), (10., 5., 0.)]).curve
+        c3 = NurbsCurveByPoints([(0., 0., 5.), (10., 0., 5.)]).curve
+        index = CurveSetIndex([c1, c2, c3])
+        indices, dists = index.query([(5., 1., 0.), (5., 4., 0.),
+                                      (12., 0., 4.)])
+        self.assertEqual(indices, [0, 1, 2])
+        self.assertAlmostEqual(dists[0], 1.)
+        self.assertAlmostEqual(dists[2], 5. ** 0.5)
+        self.assertIs(index.nearest_curve((5., 4., 0.)), c2)
+
 
 class TestGeometryProject(unittest.TestCase):
     """
@@ -440,6 +492,25 @@ class TestGeometryProject(unittest.TestCase):
         self.assertAlmostEqual(proj.nearest_param, 5.)
         self.assertAlmostEqual(proj.dmin, 5.)
 
+    def test_project_points_to_curve(self):
+        qp = [Point(), Point(5., 5., 1.), Point(10., 5., 1.)]
+        c = NurbsCurveByInterp(qp).curve
+        params = [c.u1 + t * (c.u2 - c.u1) for t in (0.2, 0.5, 0.8)]
+        pnts = [c.eval(u) for u in params]
+        proj = ProjectPointsToCurve(pnts, c)
+        self.assertTrue(proj.success.all())
+        for u, ui, di in zip(params, proj.parameters, proj.distances):
+            self.assertAlmostEqual(ui, u)
+            self.assertAlmostEqual(di, 0.)
+
+        line = LineByVector(Point(), Direction(1., 0., 0.)).line
+        proj = ProjectPointsToCurve([(5., 5., 0.), (2., 0., 3.)], line,
+                                    [0., 0., 1.])
+        self.assertTrue(proj.success.all())
+        self.assertAlmostEqual(proj.parameters[0], 5.)
+        self.assertAlmostEqual(proj.distances[0], 5.)
+        self.assertAlmostEqual(proj.distances[1], 0.)
+
     def test_project_point_to_surface(self):
         p0 = Point()
         n = Direction(0., 0., 1.)
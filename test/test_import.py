@@ -0,0 +1,107 @@
+# This file is part of AFEM which provides an engineering toolkit for airframe
+# finite element modeling during conceptual design.
+#
+# Copyright (C) 2016-2018  Laughlin Research, LLC (info@laughlinresearch.com)
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import afem
+
+# Number of runs to take the best import time from
+IMPORT_TIME_RUNS = 3
+
+# Allowed import time of a subpackage relative to importing the OCCT modules
+# it loads directly, plus an absolute margin in seconds for its own modules
+IMPORT_TIME_FACTOR = 1.5
+IMPORT_TIME_MARGIN = 0.5
+
+
+def _run(code, cwd):
+    """
+    Run code in a new interpreter and return its output.
+    """
+    env = os.environ.copy()
+    env.pop('AFEM_LOG_FILE', None)
+    path = os.path.dirname(os.path.dirname(os.path.abspath(afem.__file__)))
+    env['PYTHONPATH'] = os.pathsep.join([path, env.get('PYTHONPATH', '')])
+    out = subprocess.check_output([sys.executable, '-c', code], cwd=cwd,
+                                  env=env)
+    return out.decode('utf-8').strip()
+
+
+def _import_time(modules, cwd):
+    """
+    Best time in seconds to import the modules in a new interpreter and the
+    names of the OCCT modules that were loaded.
+    """
+    code = ('import sys\n'
+            'import time\n'
+            't0 = time.time()\n'
+            'import {}\n'
+            'print(time.time() - t0)\n'
+            'print(" ".join(sorted(m for m in sys.modules\n'
+            '                      if m.startswith("OCCT."))))')
+    code = code.format(', '.join(modules))
+    times = []
+    occt = []
+    for _ in range(IMPORT_TIME_RUNS):
+        lines = _run(code, cwd).splitlines()
+        times.append(float(lines[0]))
+        if len(lines) > 1:
+            occt = lines[1].split()
+    return min(times), occt
+
+
+class TestImport(unittest.TestCase):
+    """
+    Test cases for importing afem.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_import_time(self):
+        dt, occt = _import_time(['afem.geometry'], self.tmp_dir)
+        self.assertTrue(occt)
+        baseline, _ = _import_time(occt, self.tmp_dir)
+        budget = IMPORT_TIME_FACTOR * baseline + IMPORT_TIME_MARGIN
+        self.assertLess(dt, budget)
+
+    def test_lazy_subpackages(self):
+        code = ('import sys\n'
+                'import afem\n'
+                'print(any(m.startswith("afem.") for m in sys.modules))')
+        self.assertEqual(_run(code, self.tmp_dir), 'False')
+
+    def test_lazy_log_file(self):
+        fn = os.path.join(self.tmp_dir, 'afem.log')
+        _run('import afem.config', self.tmp_dir)
+        self.assertFalse(os.path.isfile(fn))
+        _run('from afem.config import logger\nlogger.info("msg")',
+             self.tmp_dir)
+        self.assertTrue(os.path.isfile(fn))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+# This file is part of AFEM which provides an engineering toolkit for airframe
+# finite element modeling during conceptual design.
+#
+# Copyright (C) 2016-2018  Laughlin Research, LLC (info@laughlinresearch.com)
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+from numpy import cos, linspace, pi, sqrt
+from numpy.testing import assert_array_almost_equal
+
+from afem.geometry import *
+from afem.sketch import *
+from afem.topology import *
+
+
+def _naca0012(n=21):
+    """
+    Upper and lower points of a NACA 0012 airfoil starting at the leading
+    edge.
+    """
+    x = (1. - cos(linspace(0., pi, n))) / 2.
+    z = 0.6 * (0.2969 * sqrt(x) - 0.1260 * x - 0.3516 * x ** 2 +
+               0.2843 * x ** 3 - 0.1015 * x ** 4)
+    return list(zip(x, z)), list(zip(x, -z))
+
+
+def _uiuc_text(name, upr, lwr):
+    """
+    Contents of an airfoil file in the UIUC format.
+    """
+    lines = [name, '{}. {}.'.format(len(upr), len(lwr)), '']
+    lines += ['{:.6f} {:.6f}'.format(x, z) for x, z in upr]
+    lines.append('')
+    lines += ['{:.6f} {:.6f}'.format(x, z) for x, z in lwr]
+    return '\n'.join(lines) + '\n'
+
+
+class TestSketchEntities(unittest.TestCase):
+    """
+    Test cases for afem.sketch.entities.
+    """
+
+    def setUp(self):
+        self.foil = Airfoil()
+        self.foil.approx_points(*_naca0012())
+        self.plns = [PlaneByAxes((0., 0., 0.), 'xz').plane,
+                     PlaneByAxes((1., 5., 0.2), 'xz').plane,
+                     PlaneByAxes((2., 10., 0.5), 'yz').plane,
+                     PlaneByAxes((3., 0., 1.), 'xy').plane]
+        self.scales = [1., 0.8, 0.5, 2.]
+        self.rotations = [0., 5., -3., 10.]
+
+    def test_build_many(self):
+        sections = self.foil.build_many(self.plns, self.scales,
+                                        self.rotations)
+        self.assertEqual(len(sections), len(self.plns))
+        for cs, pln, scale, rotate in zip(sections, self.plns, self.scales,
+                                          self.rotations):
+            self.assertTrue(self.foil.build(pln, scale, rotate))
+            self.assertEqual(cs.nwires, self.foil.nwires)
+            self.assertEqual(cs.has_face, self.foil.has_face)
+
+            props1 = LinearProps(cs.shape)
+            props2 = LinearProps(self.foil.shape)
+            self.assertAlmostEqual(props1.length, props2.length)
+            assert_array_almost_equal(props1.cg, props2.cg)
+
+            props1 = SurfaceProps(cs.face)
+            props2 = SurfaceProps(self.foil.face)
+            self.assertAlmostEqual(props1.area, props2.area)
+            assert_array_almost_equal(props1.cg, props2.cg)
+
+    def test_build_many_single_values(self):
+        sections = self.foil.build_many(self.plns, 0.5, 5.)
+        for cs, pln in zip(sections, self.plns):
+            self.assertTrue(self.foil.build(pln, 0.5, 5.))
+            self.assertAlmostEqual(LinearProps(cs.shape).length,
+                                   LinearProps(self.foil.shape).length)
+        self.assertRaises(ValueError, self.foil.build_many, self.plns,
+                          [1., 2.])
+
+    def test_build_chords(self):
+        chords = self.foil.build_chords(self.plns, self.scales,
+                                        self.rotations)
+        self.assertEqual(len(chords), len(self.plns))
+        for c1, pln, scale, rotate in zip(chords, self.plns, self.scales,
+                                          self.rotations):
+            c2 = self.foil.build_chord(pln, scale, rotate)
+            for u in (0., 0.5, 1.):
+                assert_array_almost_equal(c1.eval(u), c2.eval(u))
+
+
+class TestSketchLibrary(unittest.TestCase):
+    """
+    Test cases for afem.sketch.library.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.text = _uiuc_text('NACA 0012', *_naca0012())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_add(self):
+        lib = AirfoilLibrary()
+        self.assertTrue(lib.add('naca0012', self.text))
+        self.assertTrue(lib.add('naca0012b', self.text.encode('utf-8')))
+        self.assertFalse(lib.add('bad', 'bad\n1. 1.\n\n0.0 0.0\n'))
+        self.assertEqual(lib.names, ['naca0012', 'naca0012b'])
+        self.assertTrue('naca0012' in lib)
+        self.assertFalse('bad' in lib)
+
+        upr, lwr = lib.points('naca0012')
+        self.assertEqual(upr.shape, (21, 2))
+        self.assertEqual(lwr.shape, (21, 2))
+        assert_array_almost_equal(upr[0], [0., 0.])
+        assert_array_almost_equal(lwr[-1], [1., -0.00126], 5)
+        self.assertRaises(KeyError, lib.points, 'bad')
+
+    def test_load(self):
+        fn = os.path.join(self.tmp_dir, 'foils.zip')
+        with zipfile.ZipFile(fn, 'w') as zf:
+            zf.writestr('naca0012.dat', self.text)
+            zf.writestr('other.txt', 'not an airfoil')
+        lib = AirfoilLibrary()
+        self.assertEqual(lib.load(fn), ['naca0012'])
+        self.assertEqual(len(lib), 1)
+        self.assertRaises(ValueError, lib.load,
+                          os.path.join(self.tmp_dir, 'missing'))
+
+    def test_cache(self):
+        cache = os.path.join(self.tmp_dir, 'cache')
+        lib = AirfoilLibrary(cache)
+        lib.add('naca0012', self.text)
+        lib.add('copy', self.text)
+        c1 = lib.curve('naca0012')
+
+        # Files with the same content share a cache entry
+        lib.curve('copy')
+        self.assertEqual(len(os.listdir(cache)), 1)
+
+        # A new library reads the curve from the cache
+        lib = AirfoilLibrary(cache)
+        lib.add('naca0012', self.text)
+        c2 = lib.curve('naca0012')
+        self.assertEqual(c2.p, c1.p)
+        assert_array_almost_equal(c2.cp, c1.cp)
+        assert_array_almost_equal(c2.w, c1.w)
+        assert_array_almost_equal(c2.knots, c1.knots)
+        assert_array_almost_equal(c2.mult, c1.mult)
+        foil = lib.airfoil('naca0012')
+        self.assertIsInstance(foil, Airfoil)
+
+        # Different fit parameters are a different entry
+        lib = AirfoilLibrary(cache, tol=1.0e-4)
+        lib.add('naca0012', self.text)
+        lib.curve('naca0012')
+        self.assertEqual(len(os.listdir(cache)), 2)
+
+        lib.clear_cache()
+        self.assertEqual(len(os.listdir(cache)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
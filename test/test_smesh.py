@@ -0,0 +1,173 @@
+# This file is part of AFEM which provides an engineering toolkit for airframe
+# finite element modeling during conceptual design.
+#
+# Copyright (C) 2016-2018  Laughlin Research, LLC (info@laughlinresearch.com)
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+import unittest
+
+from numpy.testing import assert_allclose, assert_array_equal
+from OCCT.SMESH import SMESH_MesherHelper
+
+from afem.smesh import *
+from afem.topology import *
+
+
+def quad_recipe(gen, mesh, shape):
+    alg1d = Regular1D(gen)
+    hyp1d = NumberOfSegments1D(gen, 4)
+    alg2d = QuadrangleAlgo2D(gen)
+    mesh.add_hypotheses([alg1d, hyp1d, alg2d], shape)
+
+
+class TestSmeshMeshes(unittest.TestCase):
+    """
+    Test cases for afem.smesh.meshes.
+    """
+
+    def test_compute_parallel(self):
+        box = BoxBySize(1., 1., 1.).solid
+        gen = MeshGen()
+        mesh = gen.create_mesh(box)
+        self.assertTrue(gen.compute_parallel(mesh, quad_recipe, nprocs=1))
+        self.assertEqual(mesh.num_quads, 96)
+        self.assertEqual(mesh.num_nodes, 98)
+
+        helper = SMESH_MesherHelper(mesh.object)
+        for face in box.faces:
+            sub_mesh = mesh.get_submesh(face)
+            self.assertTrue(sub_mesh.is_computed)
+            uvs = set()
+            for node in sub_mesh.ds.node_iter:
+                uv = helper.GetNodeUV(face.object, node.object)
+                uvs.add((round(uv.X(), 6), round(uv.Y(), 6)))
+            self.assertEqual(len(uvs), 9)
+
+    def test_compute_incremental(self):
+        box = BoxBySize(1., 1., 1.).solid
+        cache = MeshCache()
+
+        gen = MeshGen()
+        mesh = gen.create_mesh(box)
+        quad_recipe(gen, mesh, box)
+        self.assertTrue(gen.compute_incremental(mesh, cache))
+        self.assertEqual(cache.stats['computed faces'], 6)
+        self.assertEqual(cache.stats['reused faces'], 0)
+
+        # Unchanged faces of a new mesh are filled from the cache
+        gen = MeshGen()
+        mesh = gen.create_mesh(box)
+        quad_recipe(gen, mesh, box)
+        self.assertTrue(gen.compute_incremental(mesh, cache))
+        self.assertEqual(cache.stats['reused faces'], 6)
+        self.assertAlmostEqual(cache.reuse_ratio, 1.)
+        self.assertEqual(mesh.num_quads, 96)
+        self.assertEqual(mesh.num_nodes, 98)
+
+        # Faces that are already meshed are neither reused nor computed
+        self.assertTrue(gen.compute_incremental(mesh, cache))
+        self.assertEqual(cache.stats['reused faces'], 0)
+        self.assertEqual(cache.stats['computed faces'], 0)
+
+    def test_face_key_large_model(self):
+        p1, p2 = (1.0e5, 1.0e5, 1.0e5), (1.0e5 + 1., 1.0e5 + 1., 1.0e5 + 1.)
+        box1 = BoxBy2Points(p1, p2).solid
+        box2 = BoxBy2Points(p1, p2).solid
+        cache = MeshCache(size=2.0e5)
+        for f1, f2 in zip(box1.faces, box2.faces):
+            self.assertEqual(cache.face_key(f1), cache.face_key(f2))
+
+
+class TestSmeshQuality(unittest.TestCase):
+    """
+    Test cases for afem.smesh.quality.
+    """
+
+    def test_mesh_quality_not_computed(self):
+        box = BoxBySize(1., 1., 1.).solid
+        gen = MeshGen()
+        mesh = gen.create_mesh(box)
+        quality = MeshQuality(mesh.get_submesh(box.faces[0]))
+        self.assertEqual(quality.num_elms, 0)
+        self.assertEqual(quality.area.size, 0)
+
+    def test_quality_metrics_square(self):
+        pnts = [[(0., 0., 0.), (1., 0., 0.), (1., 1., 0.), (0., 1., 0.)]]
+        metrics = quality_metrics(pnts, [True])
+        self.assertAlmostEqual(metrics['area'][0], 1.)
+        self.assertAlmostEqual(metrics['min_angle'][0], 90.)
+        self.assertAlmostEqual(metrics['max_angle'][0], 90.)
+        self.assertAlmostEqual(metrics['aspect_ratio'][0], 1.)
+        self.assertAlmostEqual(metrics['skew_angle'][0], 90.)
+        self.assertAlmostEqual(metrics['taper_ratio'][0], 0.)
+        self.assertAlmostEqual(metrics['warp_angle'][0], 0.)
+        self.assertAlmostEqual(metrics['jacobian'][0], 1.)
+
+    def test_quality_metrics_skewed(self):
+        pnts = [[(0., 0., 0.), (1., 0., 0.), (1.5, 1., 0.), (0.5, 1., 0.)],
+                [(0., 0., 0.), (1., 0., 0.), (1., 1., 0.), (0., 1., 1.)]]
+        metrics = quality_metrics(pnts, [True, True])
+        assert_allclose(metrics['area'][0], 1.)
+        assert_allclose(metrics['min_angle'][0], 63.434949, rtol=1.0e-6)
+        assert_allclose(metrics['max_angle'][0], 116.565051, rtol=1.0e-6)
+        assert_allclose(metrics['skew_angle'][0], 63.434949, rtol=1.0e-6)
+        assert_allclose(metrics['aspect_ratio'][0], 1.118034, rtol=1.0e-6)
+        assert_allclose(metrics['taper_ratio'][0], 0., atol=1.0e-12)
+        self.assertGreater(metrics['warp_angle'][1], 0.)
+
+
+class TestSmeshUtils(unittest.TestCase):
+    """
+    Test cases for afem.smesh.utils.
+    """
+
+    def test_coincident_node_map(self):
+        nids = [4, 2, 7, 9]
+        xyz = [(0., 0., 0.), (0., 0., 0.), (1., 0., 0.), (1., 1.0e-9, 0.)]
+        target = coincident_node_map(nids, xyz)
+        assert_array_equal(target, [2, 2, 7, 7])
+
+    def test_merge_node_arrays(self):
+        nids = [1, 2, 3, 4, 5]
+        xyz = [(0., 0., 0.), (1., 0., 0.), (1., 1., 0.), (0., 1., 0.),
+               (1., 0., 0.)]
+        conn = [[1, 2, 3, 4], [1, 5, 3, 0], [2, 5, 3, 0]]
+        kept, kept_xyz, new_conn, collapsed = merge_node_arrays(nids, xyz,
+                                                                conn)
+        assert_array_equal(kept, [1, 2, 3, 4])
+        self.assertEqual(kept_xyz.shape, (4, 3))
+        assert_array_equal(new_conn, [[1, 2, 3, 4], [1, 2, 3, 0]])
+        assert_array_equal(collapsed, [2])
+
+    def test_merge_node_arrays_quad_to_tri(self):
+        nids = [1, 2, 3, 4, 5]
+        xyz = [(0., 0., 0.), (1., 0., 0.), (1., 1., 0.), (0., 1., 0.),
+               (1., 0., 0.)]
+        conn = [[2, 5, 3, 4], [5, 3, 4, 2], [4, 2, 3, 5]]
+        _, _, new_conn, collapsed = merge_node_arrays(nids, xyz, conn)
+        assert_array_equal(new_conn, [[2, 3, 4, 0], [3, 4, 2, 0]])
+        assert_array_equal(collapsed, [2])
+
+    def test_merge_node_arrays_no_elements(self):
+        nids = [1, 2]
+        xyz = [(0., 0., 0.), (0., 0., 0.)]
+        kept, _, new_conn, collapsed = merge_node_arrays(nids, xyz, [])
+        assert_array_equal(kept, [1])
+        self.assertEqual(new_conn.size, 0)
+        self.assertEqual(collapsed.size, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -16,6 +16,9 @@
 # You should have received a copy of the GNU Lesser General Public
 # License along with this library; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+import os
+import shutil
+import tempfile
 import unittest
 
 from afem.exchange import brep
@@ -113,6 +116,21 @@ class TestStructureEntities(unittest.TestCase):
             self.assertIsInstance(e, Edge)
         self.assertIsInstance(self.fspar.edge_compound, Compound)
 
+    def test_load_bodies_lazy(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            fn = os.path.join(tmp_dir, 'bodies.xbf')
+            Body.save_bodies(fn, [self.wing, self.fuselage])
+            bodies = Body.load_bodies(fn, ['wing'], lazy=True)
+            self.assertEqual(list(bodies.keys()), ['wing'])
+            wing = bodies['wing']
+            self.assertFalse(wing.is_loaded)
+            self.assertIsInstance(wing.shape, Solid)
+            self.assertTrue(wing.is_loaded)
+            self.assertRaises(KeyError, Body.load_bodies, fn, ['tail'])
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
     def test_part_faces(self):
         self.assertEqual(self.fspar.nfaces, 1)
         for f in self.fspar.faces:
@@ -138,6 +156,94 @@ class TestStructureCreate(unittest.TestCase):
     def tearDown(self):
         GroupAPI.reset()
 
+    def test_checkpoint(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            cp = Checkpoint(tmp_dir)
+            self.assertIsNone(cp.resume())
+            SparByParameters('fspar', 0.15, 0.15, 0.15, 0.5, self.wing)
+            cp.save('spars')
+            RibByParameters('rib', 0.15, 0.5, 0.65, 0.5, self.wing)
+            cp.save('ribs')
+            self.assertEqual(cp.stages, ['spars', 'ribs'])
+
+            cp = Checkpoint(tmp_dir)
+            self.assertEqual(cp.resume(), 'ribs')
+            self.assertEqual(len(GroupAPI.get_parts()), 2)
+            cp.restore('spars')
+            self.assertEqual(len(GroupAPI.get_parts()), 1)
+            self.assertTrue(GroupAPI.get_part('fspar').has_sref)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def test_checkpoint_shapes(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            cp = Checkpoint(tmp_dir)
+            SparByParameters('fspar', 0.15, 0.15, 0.15, 0.5, self.wing)
+            cp.save('first')
+            shape_path = os.path.join(tmp_dir, 'shapes')
+            nfiles = len(os.listdir(shape_path))
+            cp.save('second')
+            files = os.listdir(shape_path)
+            self.assertEqual(len(files), nfiles)
+            self.assertTrue(all([fn.endswith('.bin') for fn in files]))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def test_load_model_duplicate_names(self):
+        SparByParameters('spar', 0.15, 0.15, 0.15, 0.5, self.wing)
+        SparByParameters('spar', 0.65, 0.15, 0.65, 0.5, self.wing)
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            fn = os.path.join(tmp_dir, 'model.xbf')
+            self.assertTrue(GroupAPI.save_model(fn))
+
+            GroupAPI.reset()
+            self.assertTrue(GroupAPI.load_model(fn))
+            self.assertEqual(len(GroupAPI.get_parts()), 2)
+
+            GroupAPI.reset()
+            self.assertTrue(GroupAPI.load_model(fn, names=['spar']))
+            self.assertEqual(len(GroupAPI.get_parts()), 1)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def test_save_model_incremental(self):
+        spar1 = SparByParameters('spar', 0.15, 0.15, 0.15, 0.5, self.wing)
+        spar2 = SparByParameters('spar', 0.65, 0.15, 0.65, 0.5, self.wing)
+        spar1.metadata.set('index', 1)
+        spar2.metadata.set('index', 2)
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            fn = os.path.join(tmp_dir, 'model.xbf')
+            self.assertTrue(GroupAPI.save_model(fn, incremental=True))
+            spar2.metadata.set('index', 3)
+            self.assertTrue(GroupAPI.save_model(fn, incremental=True))
+            self.assertTrue(os.path.isfile(fn))
+
+            GroupAPI.reset()
+            self.assertTrue(GroupAPI.load_model(fn))
+            parts = GroupAPI.get_parts()
+            self.assertEqual(len(parts), 2)
+            indices = sorted([part.metadata['index'] for part in parts])
+            self.assertEqual(indices, [1, 3])
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def test_export_groups(self):
+        GroupAPI.create_group('spars')
+        SparByParameters('fspar', 0.15, 0.15, 0.15, 0.5, self.wing)
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            fn = os.path.join(tmp_dir, 'spars.stp')
+            reports = GroupAPI.export_groups({'spars': fn}, nprocs=1)
+            self.assertTrue(reports[fn]['status'])
+            self.assertEqual(reports[fn]['parts'], 1)
+            self.assertEqual(reports[fn]['size'], os.path.getsize(fn))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
     def test_curve_part_by_shape(self):
         e = EdgeByPoints((0., 0., 0.), (10., 0., 0.)).edge
         builder = CurvePartByShape('part', e)
@@ -72,6 +72,18 @@ class TestTopologyCreate(unittest.TestCase):
         self.assertIsInstance(builder.shell, Shell)
         self.assertIsInstance(builder.solid, Solid)
 
+    def test_section_shape_by_planes(self):
+        box = BoxBySize(10., 10., 10.).solid
+        planes = [PlaneByAxes((0., 0., z), 'xy').plane
+                  for z in (1., 5., 20.)]
+        for parallel in (False, True):
+            builder = SectionShapeByPlanes(box, planes, parallel=parallel)
+            self.assertTrue(builder.is_done)
+            self.assertEqual(builder.ncandidates[2], 0)
+            self.assertEqual([len(w) for w in builder.wires], [1, 1, 0])
+            self.assertEqual([len(f) for f in builder.faces], [1, 1, 0])
+            self.assertAlmostEqual(builder.faces[0][0].area, 100., places=5)
+
 
 class TestTopologyBop(unittest.TestCase):
     """
@@ -364,6 +376,31 @@ class TestTopologyOffset(unittest.TestCase):
         loft = LoftShape([wire1, wire2])
         self.assertTrue(loft.is_done)
 
+    def test_loft_shape_by_fit(self):
+        wires = []
+        for i in range(20):
+            y = float(i)
+            pnts = [(0., y, 0.), (5., y, 5. - 0.25 * y), (10., y, 0.)]
+            wires.append(WireByPoints(pnts).wire)
+        loft = LoftShapeByFit(wires, tol=1.0e-3)
+        self.assertTrue(loft.shape.is_shell)
+        self.assertLessEqual(loft.max_error, 1.0e-3)
+        nu, nv = loft.npoles
+        self.assertLess(nv, 20)
+
+    def test_loft_shape_by_fit_closed(self):
+        wires = []
+        for i in range(10):
+            circle = CircleByNormal((0., float(i), 0.), (0., 1., 0.),
+                                    1. + 0.1 * i).circle
+            wires.append(Wire.by_edge(Edge.by_curve(circle)))
+        loft = LoftShapeByFit(wires, tol=1.0e-3)
+        srf = loft.surface
+        p1 = srf.eval(srf.u1, 0.5)
+        p2 = srf.eval(srf.u2, 0.5)
+        self.assertAlmostEqual(p1.distance(p2), 0.)
+        self.assertLessEqual(loft.max_error, 1.0e-2)
+
 
 class TestTopologyProps(unittest.TestCase):
     """